@@ -0,0 +1,98 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Application, Job, JobStatusCount
+
+
+def _count_moves(rows, status):
+    """Counter deltas for moving ``(id, job id, status)`` rows to ``status``."""
+    deltas = Counter()
+    for _, job_id, previous in rows:
+        deltas[job_id, previous] -= 1
+        deltas[job_id, status] += 1
+    return deltas
+
+
+def update_statuses(employer_id, changes):
+    """
+    Apply ``{application id: status}`` to applications for the employer's
+    jobs, with one UPDATE per distinct target status. Raises
+    ``Application.DoesNotExist`` and changes nothing if any id is unknown or
+    belongs to another employer. Returns the number of rows changed.
+    """
+    with transaction.atomic():
+        current = {
+            row[0]: row for row in Application.objects.select_for_update()
+            .filter(id__in=changes, job__employer_id=employer_id)
+            .values_list('id', 'job_id', 'status')
+        }
+        missing = sorted(set(changes) - set(current))
+        if missing:
+            raise Application.DoesNotExist(f"Applications not found: {', '.join(map(str, missing))}.")
+
+        rows_by_status = {}
+        for application_id, status in changes.items():
+            if current[application_id][2] != status:
+                rows_by_status.setdefault(status, []).append(current[application_id])
+        deltas = Counter()
+        for status, rows in rows_by_status.items():
+            Application.objects.filter(id__in=[row[0] for row in rows]).update(status=status)
+            deltas.update(_count_moves(rows, status))
+        JobStatusCount.objects.adjust(deltas)
+    return sum(len(rows) for rows in rows_by_status.values())
+
+
+def update_matching_statuses(employer_id, status, job_id=None, current_status=None):
+    """Move every matching application for the employer's jobs to ``status`` in one UPDATE."""
+    applications = Application.objects.filter(job__employer_id=employer_id).exclude(status=status)
+    if job_id is not None:
+        applications = applications.filter(job_id=job_id)
+    if current_status is not None:
+        applications = applications.filter(status=current_status)
+    with transaction.atomic():
+        # Lock and read the rows first so the counters move by exactly what
+        # the UPDATE changes.
+        rows = list(applications.select_for_update().values_list('id', 'job_id', 'status'))
+        if not rows:
+            return 0
+        updated = Application.objects.filter(id__in=[row[0] for row in rows]).update(status=status)
+        JobStatusCount.objects.adjust(_count_moves(rows, status))
+    return updated
+
+
+def reconcile_status_counts(batch_size=1000, dry_run=False):
+    """
+    Recount applications per job and status with GROUP BY, a batch of jobs
+    at a time, and correct JobStatusCount rows that have drifted. Returns
+    the number of counters that were (or, with ``dry_run``, would be) fixed.
+    """
+    fixed = 0
+    job_ids = list(Job.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(job_ids), batch_size):
+        batch = job_ids[start:start + batch_size]
+        with transaction.atomic():
+            actual = {
+                (job_id, status): count for job_id, status, count in
+                Application.objects.filter(job_id__in=batch).values_list('job_id', 'status')
+                .annotate(count=Count('id')).order_by()
+            }
+            stored = {
+                (counter.job_id, counter.status): counter
+                for counter in JobStatusCount.objects.select_for_update().filter(job_id__in=batch)
+            }
+            stale = []
+            for key, counter in stored.items():
+                if counter.count != actual.get(key, 0):
+                    counter.count = actual.get(key, 0)
+                    stale.append(counter)
+            missing = [
+                JobStatusCount(job_id=job_id, status=status, count=count)
+                for (job_id, status), count in actual.items() if (job_id, status) not in stored
+            ]
+            fixed += len(stale) + len(missing)
+            if not dry_run:
+                JobStatusCount.objects.bulk_update(stale, ['count'], batch_size=batch_size)
+                JobStatusCount.objects.bulk_create(missing, batch_size=batch_size)
+    return fixed
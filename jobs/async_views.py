@@ -0,0 +1,184 @@
+import asyncio
+import functools
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from .cache import lookup_cache, lookup_cache_keys
+from .fieldsets import JOB_CARD_FIELDS, select_fields
+from .models import Category, JobType, Skill, EducationLevel, Job, CompanyProfile, Employer, JobSeekerProfile, JobSeeker
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .rows import JobRowSerializer
+from .search import JobSearch
+from .serializers import (
+    CategorySerializer, JobTypeSerializer, SkillSerializer, EducationLevelSerializer,
+    JobSerializer, CompanyProfileSerializer, JobSeekerProfileSerializer,
+)
+
+
+def database_sync_to_async(func):
+    """
+    Run ``func`` on a worker thread of the default executor (Django 3.2 has
+    no async ORM), so that calls awaited together, for this request or for
+    others, run their queries concurrently. Each worker thread has its own
+    connection; it is closed after the call according to CONN_MAX_AGE, as
+    at the end of a regular request.
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def set_prefetched(instance, name, objs):
+    """Fill ``instance.<name>.all()`` as prefetch_related() would."""
+    queryset = getattr(instance, name).all()
+    queryset._result_cache = list(objs)
+    queryset._prefetch_done = True
+    instance.__dict__.setdefault('_prefetched_objects_cache', {})[name] = queryset
+
+
+class AsyncReadView(View):
+    """
+    Base for the async versions of the public read endpoints. Responses are
+    rendered with FastJSONRenderer, whose output matches DRF's JSONRenderer,
+    so their bodies are the same as those of the sync views.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Django 3.2 class-based views are sync only; mark the view function
+        # as a coroutine function so the handler awaits it.
+        return markcoroutinefunction(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except APIException as exc:
+            # What DRF's exception handler responds with in the sync views.
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            response = self.json(data, status=exc.status_code)
+        return response
+
+    def json(self, data, status=status.HTTP_200_OK):
+        return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+    def not_found(self, message):
+        return self.json({'detail': message}, status=status.HTTP_404_NOT_FOUND)
+
+
+class AsyncJobDetailView(AsyncReadView):
+    async def get(self, request, pk):
+        fields = select_fields(request.GET, JobSerializer.Meta.fields, JobSerializer.Meta.fields)
+        # Skill ids are fetched alongside the job rather than prefetched after it.
+        job_fields = [name for name in fields if name != 'skills']
+        pending = [database_sync_to_async(Job.objects.for_serializer(job_fields).filter(pk=pk).first)()]
+        if 'skills' in fields:
+            pending.append(database_sync_to_async(lambda: list(
+                Job.skills.through.objects.filter(job_id=pk).values_list('skill_id', flat=True)
+            ))())
+        job, *skill_ids = await asyncio.gather(*pending)
+        if job is None:
+            return self.not_found('No Job matches the given query.')
+        if skill_ids:
+            set_prefetched(job, 'skills', [Skill(id=skill_id) for skill_id in skill_ids[0]])
+        return self.json(JobSerializer(job, fields=fields).data)
+
+
+class AsyncJobSearchView(AsyncReadView):
+    async def get(self, request):
+        fields = select_fields(request.GET, JobSerializer.Meta.fields, JOB_CARD_FIELDS)
+        search = JobSearch(request.GET)
+        paginator = KeysetPagination()
+        pending = [database_sync_to_async(search.page)(paginator, Request(request), JobRowSerializer(fields))]
+        if search.facets:
+            pending.append(database_sync_to_async(search.facet_counts)())
+        page, *facet_counts = await asyncio.gather(*pending)
+        data = paginator.get_paginated_response(page).data
+        if search.facets:
+            data['facets'] = facet_counts[0]
+        return self.json(data)
+
+
+class AsyncLookupListView(AsyncReadView):
+    """Async counterpart of the CachedLookupMixin list views."""
+    model = None
+    serializer_class = None
+    cache_timeout = 60 * 60 * 24
+
+    def paginate(self, request):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(self.model.objects.order_by('name', 'id'), Request(request))
+        return paginator.get_paginated_response(self.serializer_class(page, many=True).data).data
+
+    async def get(self, request):
+        etag, key = lookup_cache_keys(self.model, request)
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache = lookup_cache()
+            data = cache.get(key)
+            if data is None:
+                data = await database_sync_to_async(self.paginate)(request)
+                cache.set(key, data, self.cache_timeout)
+            response = self.json(data)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+class AsyncCategoryListView(AsyncLookupListView):
+    model = Category
+    serializer_class = CategorySerializer
+
+
+class AsyncJobTypeListView(AsyncLookupListView):
+    model = JobType
+    serializer_class = JobTypeSerializer
+
+
+class AsyncSkillListView(AsyncLookupListView):
+    model = Skill
+    serializer_class = SkillSerializer
+
+
+class AsyncEducationLevelListView(AsyncLookupListView):
+    model = EducationLevel
+    serializer_class = EducationLevelSerializer
+
+
+class AsyncEmployerProfileView(AsyncReadView):
+    async def get(self, request, id):
+        profile, employer = await asyncio.gather(
+            database_sync_to_async(CompanyProfile.objects.filter(id=id).first)(),
+            database_sync_to_async(Employer.objects.only('id', 'company_name', 'company_profile_id').filter(company_profile_id=id).first)(),
+        )
+        if profile is None:
+            return self.not_found('Company profile not found for the provided ID.')
+        CompanyProfile.employer.related.set_cached_value(profile, employer)
+        return self.json(CompanyProfileSerializer(profile).data)
+
+
+class AsyncJobSeekerProfileView(AsyncReadView):
+    async def get(self, request, id):
+        profile, jobseeker = await asyncio.gather(
+            database_sync_to_async(JobSeekerProfile.objects.filter(id=id).first)(),
+            database_sync_to_async(JobSeeker.objects.select_related('user').filter(jobseeker_profile_id=id).first)(),
+        )
+        if profile is None:
+            return self.not_found('Candidate profile not found for the provided ID.')
+        JobSeekerProfile.jobseeker.related.set_cached_value(profile, jobseeker)
+        return self.json(JobSeekerProfileSerializer(profile).data)
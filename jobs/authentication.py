@@ -0,0 +1,54 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser as BaseTokenUser
+
+from .models import User, Employer, JobSeeker
+from .tokens import PROFILE_CLAIMS, profile_claims
+
+
+class TokenUser(BaseTokenUser):
+    """
+    Request user built from the access token's claims, without a query.
+
+    ``employer`` and ``jobseeker`` are still available for views that need
+    the whole row; they are loaded on first access.
+    """
+
+    @cached_property
+    def user_type(self):
+        return self.token.get('user_type')
+
+    @cached_property
+    def employer_id(self):
+        return self.token.get('employer_id')
+
+    @cached_property
+    def jobseeker_id(self):
+        return self.token.get('jobseeker_id')
+
+    @cached_property
+    def employer(self):
+        if self.employer_id is None:
+            raise User.employer.RelatedObjectDoesNotExist('User has no employer.')
+        return Employer.objects.get(pk=self.employer_id)
+
+    @cached_property
+    def jobseeker(self):
+        if self.jobseeker_id is None:
+            raise User.jobseeker.RelatedObjectDoesNotExist('User has no jobseeker.')
+        return JobSeeker.objects.get(pk=self.jobseeker_id)
+
+
+class JWTClaimsAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authenticate from the token alone. The token's revocation check is served
+    from the in-process blacklist in jobs.tokens.
+    """
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in PROFILE_CLAIMS):
+            # Issued before tokens carried the profile claims.
+            user = JWTAuthentication.get_user(self, validated_token)
+            for claim, value in profile_claims(user).items():
+                validated_token[claim] = value
+        return super().get_user(validated_token)
@@ -0,0 +1,274 @@
+"""
+In-memory typeahead over skill names, job titles, job locations and
+category names, ranked by how many active jobs use each value.
+"""
+import bisect
+import heapq
+import time
+import unicodedata
+from collections import Counter
+
+from .indexes import RefreshingIndex
+from .models import Job, Skill, Category
+
+
+AUTOCOMPLETE_TYPES = ('skills', 'titles', 'locations', 'categories')
+
+# Characters after which a new word starts; a prefix may match any word.
+WORD_SEPARATORS = frozenset(' ,/-(')
+
+
+def normalize(value):
+    """Case- and accent-insensitive form, with runs of whitespace collapsed."""
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return ' '.join(value.casefold().split())
+
+
+def word_suffixes(key):
+    """``key`` from the start of each of its words: "senior dev" -> ["senior dev", "dev"]."""
+    return [
+        key[index:] for index, char in enumerate(key)
+        if char not in WORD_SEPARATORS and (index == 0 or key[index - 1] in WORD_SEPARATORS)
+    ]
+
+
+class PrefixIndex:
+    """
+    Sorted array of ``(word suffix, key)`` pairs, searched with bisect, and
+    the frequency of each key. A value stays listed while it has a positive
+    count or is pinned (lookup rows are pinned so they are suggested even
+    when no job uses them yet).
+
+    Prefixes matching more than ``memoize_above`` entries (one or two
+    letters, typically) have their best ``ranked_size`` keys memoized, and
+    ``adjust()`` keeps those rankings current instead of discarding them.
+    """
+    memoize_above = 256
+    max_memoized = 1024
+    ranked_size = 50
+
+    def __init__(self):
+        self._entries = []
+        self._labels = {}
+        self._counts = {}
+        self._pins = Counter()
+        # prefix -> (best keys, whether they are all the matching keys)
+        self._memo = {}
+
+    @classmethod
+    def build(cls, counts, pinned=()):
+        """Build from ``{label: count}`` and labels to pin, sorting once."""
+        index = cls()
+        for label, count in counts.items():
+            index._adjust_state(label, count, 0)
+        for label in pinned:
+            index._adjust_state(label, 0, 1)
+        index._entries = sorted(
+            (suffix, key) for key in index._labels for suffix in word_suffixes(key)
+        )
+        return index
+
+    def __len__(self):
+        return len(self._labels)
+
+    def _rank(self, key):
+        return -self._counts[key], key
+
+    def _adjust_state(self, label, count, pins):
+        key = normalize(label)
+        if not key:
+            return None, False
+        new = key not in self._labels
+        if new:
+            self._labels[key] = label
+            self._counts[key] = 0
+        self._counts[key] += count
+        self._pins[key] += pins
+        return key, new
+
+    def adjust(self, label, count=0, pins=0):
+        key, new = self._adjust_state(label, count, pins)
+        if key is None:
+            return
+        listed = self._counts[key] > 0 or self._pins[key] > 0
+        suffixes = word_suffixes(key)
+        if new and listed:
+            for suffix in suffixes:
+                bisect.insort(self._entries, (suffix, key))
+        elif not listed and not new:
+            for suffix in suffixes:
+                del self._entries[bisect.bisect_left(self._entries, (suffix, key))]
+        if self._memo and (listed or not new):
+            self._rerank(key, suffixes, count, listed)
+        if not listed:
+            del self._labels[key], self._counts[key], self._pins[key]
+
+    def _rerank(self, key, suffixes, count, listed):
+        prefixes = {suffix[:end] for suffix in suffixes for end in range(1, len(suffix) + 1)}
+        for prefix in prefixes & self._memo.keys():
+            ranked, complete = self._memo[prefix]
+            ranked_before = key in ranked
+            if ranked_before:
+                ranked.remove(key)
+            if (not listed or count < 0) and ranked_before and not complete:
+                # A key outside the memoized ranking may now beat it.
+                del self._memo[prefix]
+            elif listed:
+                ranked.append(key)
+                ranked.sort(key=self._rank)
+                if len(ranked) > self.ranked_size:
+                    ranked.pop()
+                    self._memo[prefix] = (ranked, False)
+
+    def suggest(self, prefix, limit):
+        """Up to ``limit`` ``{'value', 'count'}`` dicts, most frequent first."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if prefix in self._memo and limit <= self.ranked_size:
+            ranked = self._memo[prefix][0]
+        else:
+            # Everything starting with prefix sorts before prefix + U+10FFFF.
+            start = bisect.bisect_left(self._entries, (prefix,))
+            end = bisect.bisect_left(self._entries, (prefix + '\U0010ffff',), start)
+            keys = {key for _, key in self._entries[start:end]}
+            ranked = heapq.nsmallest(max(limit, self.ranked_size), keys, key=self._rank)
+            if end - start > self.memoize_above and limit <= self.ranked_size:
+                if len(self._memo) >= self.max_memoized:
+                    self._memo.clear()
+                self._memo[prefix] = (ranked, len(ranked) == len(keys))
+        return [{'value': self._labels[key], 'count': self._counts[key]} for key in ranked[:limit]]
+
+
+class AutocompleteIndex(RefreshingIndex):
+    """
+    A PrefixIndex per suggestion type, counting active jobs: how many use
+    each skill, title, location and category. Skill and category names are
+    listed even when no job uses them.
+
+    Built at startup and kept current as described in RefreshingIndex.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._indexes = {name: PrefixIndex() for name in AUTOCOMPLETE_TYPES}
+        # What each active job contributes: (title, location, category id, skill ids).
+        self._jobs = {}
+        self._skill_names = {}
+        self._category_names = {}
+
+    def rebuild(self):
+        skill_names = dict(Skill.objects.values_list('id', 'name'))
+        category_names = dict(Category.objects.values_list('id', 'name'))
+
+        jobs = {}
+        for job_id, title, location, category_id in Job.objects.filter(active=True).values_list(
+                'id', 'title', 'location', 'category_id').iterator():
+            jobs[job_id] = (title, location, category_id, set())
+        through = Job.skills.through.objects.filter(job__active=True).values_list('job_id', 'skill_id')
+        for job_id, skill_id in through.iterator():
+            jobs[job_id][3].add(skill_id)
+
+        titles, locations, categories, skills = Counter(), Counter(), Counter(), Counter()
+        for title, location, category_id, skill_ids in jobs.values():
+            titles[title] += 1
+            locations[location] += 1
+            if category_id in category_names:
+                categories[category_names[category_id]] += 1
+            skills.update(skill_names[skill_id] for skill_id in skill_ids if skill_id in skill_names)
+
+        indexes = {
+            'skills': PrefixIndex.build(skills, skill_names.values()),
+            'titles': PrefixIndex.build(titles),
+            'locations': PrefixIndex.build(locations),
+            'categories': PrefixIndex.build(categories, category_names.values()),
+        }
+        with self._lock:
+            self._indexes = indexes
+            self._jobs = jobs
+            self._skill_names = skill_names
+            self._category_names = category_names
+            self._built_at = time.monotonic()
+
+    def _count_job(self, job_id, sign):
+        title, location, category_id, skill_ids = self._jobs[job_id]
+        self._indexes['titles'].adjust(title, sign)
+        self._indexes['locations'].adjust(location, sign)
+        if category_id in self._category_names:
+            self._indexes['categories'].adjust(self._category_names[category_id], sign)
+        for skill_id in skill_ids:
+            if skill_id in self._skill_names:
+                self._indexes['skills'].adjust(self._skill_names[skill_id], sign)
+
+    def update_job(self, job, skill_ids=None):
+        with self._lock:
+            current = self._jobs.get(job.pk)
+            if current is None:
+                if not job.active:
+                    return
+                if skill_ids is None:
+                    skill_ids = job.skills.values_list('id', flat=True)
+                skill_ids = set(skill_ids)
+            else:
+                skill_ids = current[3]
+            self.remove_job(job.pk)
+            if job.active:
+                self._jobs[job.pk] = (job.title, job.location, job.category_id, skill_ids)
+                self._count_job(job.pk, 1)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            if job_id in self._jobs:
+                self._count_job(job_id, -1)
+                del self._jobs[job_id]
+
+    def add_job_skills(self, job_id, skill_ids):
+        with self._lock:
+            if job_id not in self._jobs:
+                return
+            current = self._jobs[job_id][3]
+            for skill_id in set(skill_ids) - current:
+                current.add(skill_id)
+                if skill_id in self._skill_names:
+                    self._indexes['skills'].adjust(self._skill_names[skill_id], 1)
+
+    def remove_job_skills(self, job_id, skill_ids=None):
+        with self._lock:
+            if job_id not in self._jobs:
+                return
+            current = self._jobs[job_id][3]
+            for skill_id in current & set(current if skill_ids is None else skill_ids):
+                current.discard(skill_id)
+                if skill_id in self._skill_names:
+                    self._indexes['skills'].adjust(self._skill_names[skill_id], -1)
+
+    def _lookup(self, instance):
+        if isinstance(instance, Skill):
+            return self._indexes['skills'], self._skill_names, lambda job: job[3]
+        return self._indexes['categories'], self._category_names, lambda job: {job[2]}
+
+    def update_lookup(self, instance):
+        """Add or rename a Skill or Category."""
+        with self._lock:
+            self.remove_lookup(instance)
+            index, names, job_ids = self._lookup(instance)
+            names[instance.pk] = instance.name
+            count = sum(1 for job in self._jobs.values() if instance.pk in job_ids(job))
+            index.adjust(instance.name, count, pins=1)
+
+    def remove_lookup(self, instance):
+        with self._lock:
+            index, names, job_ids = self._lookup(instance)
+            name = names.pop(instance.pk, None)
+            if name is not None:
+                count = sum(1 for job in self._jobs.values() if instance.pk in job_ids(job))
+                index.adjust(name, -count, pins=-1)
+
+    def suggest(self, prefix, types=AUTOCOMPLETE_TYPES, limit=10):
+        self.ensure_built()
+        with self._lock:
+            return {name: self._indexes[name].suggest(prefix, limit) for name in types}
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,28 @@
+from django.db import connection, transaction
+
+
+def bulk_create_with_ids(model, objs, batch_size=None):
+    """
+    ``bulk_create`` that always leaves primary keys set on ``objs``.
+
+    Backends that support RETURNING do this natively. On SQLite (Django 3.2)
+    the rows inserted while this transaction holds the write lock receive
+    consecutive rowids, so the keys are recovered from ``last_insert_rowid()``.
+    """
+    objs = list(objs)
+    if not objs:
+        return objs
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objs, batch_size=batch_size)
+
+    with transaction.atomic():
+        model.objects.bulk_create(objs, batch_size=batch_size)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT last_insert_rowid()')
+            last_id = cursor.fetchone()[0]
+    first_id = last_id - len(objs) + 1
+    for offset, obj in enumerate(objs):
+        obj.pk = first_id + offset
+        obj._state.adding = False
+        obj._state.db = connection.alias
+    return objs
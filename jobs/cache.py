@@ -0,0 +1,76 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.response import Response
+
+
+LOOKUP_CACHE_ALIAS = 'lookups'
+
+
+def lookup_cache():
+    return caches[LOOKUP_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return f'lookup-version:{model._meta.label_lower}'
+
+
+def get_lookup_version(model):
+    cache = lookup_cache()
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so that an evicted counter never comes back
+        # at a value whose cached bodies may still be around.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_lookup_version(model):
+    cache = lookup_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def lookup_cache_keys(model, request):
+    """Return the ``(etag, cache key)`` of a lookup list response."""
+    version = get_lookup_version(model)
+    query = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    etag = f'"{model._meta.model_name}-{version}-{query[:12]}"'
+    return etag, f'lookup:{model._meta.label_lower}:{version}:{query}'
+
+
+class CachedLookupMixin:
+    """
+    Serve a lookup list from the ``lookups`` cache, keyed by the model's
+    version counter and the request's query string. The version is bumped by
+    signals whenever a row is saved or deleted, which orphans every cached
+    page for that model at once. Responses carry an ETag built from the same
+    values, so a matching ``If-None-Match`` is answered with a 304 without
+    touching the database or the serializer.
+    """
+    cache_timeout = 60 * 60 * 24
+
+    def list(self, request, *args, **kwargs):
+        etag, key = lookup_cache_keys(self.queryset.model, request)
+
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache = lookup_cache()
+            data = cache.get(key)
+            if data is None:
+                data = super().list(request, *args, **kwargs).data
+                cache.set(key, data, self.cache_timeout)
+            response = Response(data)
+
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
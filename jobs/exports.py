@@ -0,0 +1,100 @@
+import csv
+import itertools
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .models import Job, Application
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+JOB_EXPORT_FIELDS = (
+    'id', 'title', 'location', 'min_salary', 'max_salary', 'experience_level',
+    'category__name', 'job_type__name', 'education_level__name', 'date_posted', 'active',
+)
+JOB_EXPORT_HEADER = (
+    'id', 'title', 'location', 'min_salary', 'max_salary', 'experience_level',
+    'category', 'job_type', 'education_level', 'date_posted', 'active', 'skills',
+)
+
+APPLICANT_EXPORT_FIELDS = (
+    'id', 'application_date', 'status', 'jobseeker_id', 'jobseeker__jobseeker_profile_id',
+    'jobseeker__user__first_name', 'jobseeker__user__last_name', 'jobseeker__user__email',
+)
+APPLICANT_EXPORT_HEADER = (
+    'id', 'application_date', 'status', 'jobseeker_id', 'jobseeker_profile_id',
+    'first_name', 'last_name', 'email',
+)
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def job_rows(employer_id):
+    # Stream from a server-side iterator and attach skills with one query
+    # per chunk; prefetch_related does not apply to iterator().
+    queryset = Job.objects.filter(employer_id=employer_id).order_by('-date_posted', '-id').values_list(*JOB_EXPORT_FIELDS)
+    through = Job.skills.through.objects
+    for chunk in _chunks(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE), EXPORT_CHUNK_SIZE):
+        skills = {}
+        for job_id, name in through.filter(job_id__in=[row[0] for row in chunk]).values_list('job_id', 'skill__name'):
+            skills.setdefault(job_id, []).append(name)
+        for row in chunk:
+            yield row + (skills.get(row[0], []),)
+
+
+def applicant_rows(job):
+    queryset = Application.objects.filter(job=job).order_by('-application_date', '-id').values_list(*APPLICANT_EXPORT_FIELDS)
+    return queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _csv_cell(value):
+    if isinstance(value, list):
+        value = ';'.join(value)
+    # Spreadsheets run a cell starting with one of these as a formula; the
+    # quote makes them show it as text.
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        value = "'" + value
+    return value
+
+
+def _csv_stream(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def _ndjson_stream(header, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', _csv_stream),
+    'ndjson': ('application/x-ndjson', _ndjson_stream),
+}
+
+
+def export_response(header, rows, output, filename):
+    content_type, stream = EXPORT_FORMATS[output]
+    response = StreamingHttpResponse(stream(header, rows), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    return response
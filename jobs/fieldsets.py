@@ -0,0 +1,57 @@
+import hashlib
+
+from rest_framework.exceptions import ValidationError
+
+
+JOB_CARD_FIELDS = ('id', 'title', 'location', 'min_salary', 'max_salary', 'company_name')
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def select_fields(params, available, default):
+    """
+    Resolve ``?fields=`` and ``?omit=`` against the ``available`` serializer
+    fields. Without ``fields`` the selection starts from ``default``. Returns
+    a tuple in ``available`` order; unknown names are a ValidationError.
+    """
+    requested = _names(params.get('fields', ''))
+    omitted = _names(params.get('omit', ''))
+    unknown = [name for name in requested + omitted if name not in available]
+    if unknown:
+        raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}."})
+    selected = set(requested or default) - set(omitted)
+    return tuple(name for name in available if name in selected)
+
+
+class FieldSelectionMixin:
+    """
+    Serve the fields picked by ``?fields=`` / ``?omit=``, or
+    ``default_fields`` (all of them if None). The selection is passed to the
+    serializer, which must accept a ``fields`` argument, and is available to
+    ``get_queryset()`` to narrow what gets loaded.
+    """
+    default_fields = None
+
+    def get_available_fields(self):
+        return tuple(self.get_serializer_class().Meta.fields)
+
+    def get_selected_fields(self):
+        if not hasattr(self, '_selected_fields'):
+            available = self.get_available_fields()
+            self._selected_fields = select_fields(
+                self.request.query_params, available, self.default_fields or available,
+            )
+        return self._selected_fields
+
+    def get_fields_key(self):
+        """Short key that tells selections apart, empty for the default one."""
+        selected = self.get_selected_fields()
+        if selected == select_fields({}, self.get_available_fields(), self.default_fields or self.get_available_fields()):
+            return ''
+        return hashlib.md5(','.join(selected).encode()).hexdigest()[:8]
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_selected_fields())
+        return super().get_serializer(*args, **kwargs)
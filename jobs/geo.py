@@ -0,0 +1,219 @@
+"""
+Offline geocoding of free-text locations, and radius search over the
+geocoded job coordinates.
+
+Locations are resolved against the bundled gazetteer in
+``data/gazetteer.csv`` (Canadian cities, most populous first). Accepted
+forms are "Calgary", "Calgary, AB", "Calgary AB", "Calgary, Alberta" and the
+same followed by ", Canada"; accents, case and "St."/"Saint" spellings do
+not matter. Anything else geocodes to None.
+"""
+import csv
+import functools
+import math
+import re
+import unicodedata
+from pathlib import Path
+
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import Cos
+from rest_framework.exceptions import ValidationError
+
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+PROVINCES = {
+    'AB': 'Alberta',
+    'BC': 'British Columbia',
+    'MB': 'Manitoba',
+    'NB': 'New Brunswick',
+    'NL': 'Newfoundland and Labrador',
+    'NS': 'Nova Scotia',
+    'NT': 'Northwest Territories',
+    'NU': 'Nunavut',
+    'ON': 'Ontario',
+    'PE': 'Prince Edward Island',
+    'QC': 'Quebec',
+    'SK': 'Saskatchewan',
+    'YT': 'Yukon',
+}
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+RADIANS_PER_DEGREE = math.pi / 180
+
+DEFAULT_RADIUS_KM = 25
+
+# Distances are returned rounded to 10 m. Rounded, none is small enough
+# for orjson to write it with an exponent (see FastJSONRenderer).
+DISTANCE_PLACES = 2
+MAX_RADIUS_KM = 500
+
+
+def normalize(value):
+    """Lowercase, drop accents and punctuation, and spell "Saint" as "st"."""
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char)).lower()
+    value = re.sub(r"['’]", '', value)
+    words = re.sub(r'[^a-z0-9]+', ' ', value).split()
+    return ' '.join({'saint': 'st', 'sainte': 'ste'}.get(word, word) for word in words)
+
+
+PROVINCE_CODES = {normalize(code): code for code in PROVINCES}
+PROVINCE_CODES.update({normalize(name): code for code, name in PROVINCES.items()})
+PROVINCE_CODES.update({'pei': 'PE', 'nfld': 'NL', 'newfoundland': 'NL', 'que': 'QC', 'yukon territory': 'YT'})
+
+
+@functools.lru_cache(maxsize=None)
+def gazetteer():
+    """
+    ``(city, province code) -> (lat, lon)`` and ``city -> (lat, lon)`` for a
+    city given alone, which resolves to its most populous namesake.
+    """
+    places = {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            coordinates = (float(row['latitude']), float(row['longitude']))
+            city = normalize(row['name'])
+            places.setdefault((city, row['province']), coordinates)
+            places.setdefault(city, coordinates)
+    return places
+
+
+def geocode(location):
+    """Return ``(latitude, longitude)`` for a location string, or None."""
+    if not location:
+        return None
+    parts = [normalize(part) for part in location.split(',')]
+    parts = [part for part in parts if part]
+    if len(parts) > 1 and parts[-1] == 'canada':
+        parts.pop()
+    if not parts or len(parts) > 2:
+        return None
+
+    places = gazetteer()
+    if len(parts) == 2:
+        province = PROVINCE_CODES.get(parts[1])
+        return places.get((parts[0], province)) if province else None
+    if parts[0] in places:
+        return places[parts[0]]
+    # "Calgary AB" / "Calgary Alberta": a trailing province without a comma.
+    words = parts[0].split()
+    for size in range(len(words) - 1, 0, -1):
+        province = PROVINCE_CODES.get(' '.join(words[size:]))
+        if province:
+            return places.get((' '.join(words[:size]), province))
+    return None
+
+
+def locate(instance):
+    """Set ``latitude`` and ``longitude`` from ``instance.location``; return it."""
+    instance.latitude, instance.longitude = geocode(instance.location) or (None, None)
+    return instance
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    ``(min_lat, max_lat, min_lon, max_lon)`` around the circle. The longitude
+    span is taken at the band's latitude furthest from the equator, and is
+    the whole globe when the circle reaches a pole.
+    """
+    lat_span = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = latitude - lat_span, latitude + lat_span
+    widest = max(abs(min_lat), abs(max_lat))
+    if widest >= 90:
+        return max(min_lat, -90), min(max_lat, 90), -180, 180
+    lon_span = min(180, lat_span / math.cos(math.radians(widest)))
+    return min_lat, max_lat, longitude - lon_span, longitude + lon_span
+
+
+# Keyset ordering of radius searches; see within_radius().
+NEARBY_ORDERING = ('distance_key', 'id')
+
+
+def parse_near(params):
+    """
+    ``(latitude, longitude, radius_km)`` from the ``near`` and ``radius``
+    parameters, or None without ``near``. ``near`` is "lat,lon" or a place
+    the gazetteer knows; ``radius`` is in kilometres.
+    """
+    near = params.get('near', '').strip()
+    if not near:
+        return None
+    try:
+        latitude, longitude = (float(part) for part in near.split(','))
+    except ValueError:
+        coordinates = geocode(near)
+        if coordinates is None:
+            raise ValidationError({'near': f'Unknown place "{near}".'})
+        latitude, longitude = coordinates
+    else:
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({'near': 'Latitude must be within [-90, 90] and longitude within [-180, 180].'})
+
+    try:
+        radius = float(params.get('radius') or DEFAULT_RADIUS_KM)
+    except ValueError:
+        raise ValidationError({'radius': 'Expected a number of kilometres.'})
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise ValidationError({'radius': f'Expected a radius greater than 0 and at most {MAX_RADIUS_KM} km.'})
+    return latitude, longitude, radius
+
+
+def distance_key(latitude, longitude):
+    """
+    An expression that orders jobs by their great-circle distance from
+    ``(latitude, longitude)``: ``1 - cos(d / R)``, twice the haversine term.
+    It takes three cosines per row and no inverse functions.
+    """
+    job_latitude = F('latitude') * RADIANS_PER_DEGREE
+    return ExpressionWrapper(
+        1.0 - Cos(job_latitude - math.radians(latitude))
+        + math.cos(math.radians(latitude)) * Cos(job_latitude)
+        * (1.0 - Cos(F('longitude') * RADIANS_PER_DEGREE - math.radians(longitude))),
+        output_field=FloatField(),
+    )
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """
+    The jobs of ``queryset`` within ``radius_km``, annotated with their
+    ``distance_key``. The bounding box is a range scan of the (latitude,
+    longitude) index; only the rows inside it have their distance computed.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    # Pass the whole range when the box crosses the antimeridian.
+    if min_lon < -180 or max_lon > 180:
+        min_lon, max_lon = -180, 180
+    return queryset.filter(
+        latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon),
+    ).annotate(
+        distance_key=distance_key(latitude, longitude),
+    ).filter(distance_key__lte=1 - math.cos(radius_km / EARTH_RADIUS_KM))
+
+
+def nearby_rows(serializer, queryset, latitude, longitude, radius_km):
+    """
+    ``serializer.rows()`` (a JobRowSerializer) of the jobs of ``queryset``
+    within ``radius_km``, nearest first, with their coordinates.
+    """
+    serializer.column('latitude')
+    serializer.column('longitude')
+    return serializer.rows(within_radius(queryset, latitude, longitude, radius_km).order_by(*NEARBY_ORDERING))
+
+
+def nearby_representation(serializer, page, latitude, longitude):
+    """
+    A page of ``nearby_rows()`` serialized with ``serializer``, each with
+    its ``distance_km`` from ``(latitude, longitude)``, rounded to 10 m.
+    """
+    data = serializer.to_representation(page)
+    for item, row in zip(data, page):
+        item['distance_km'] = round(haversine_km(latitude, longitude, row.latitude, row.longitude), DISTANCE_PLACES)
+    return data
@@ -0,0 +1,182 @@
+import csv
+import json
+
+from django.db import transaction
+from django.db.models import Q
+
+from .autocomplete import autocomplete_index
+from .bulk import bulk_create_with_ids
+from .geo import locate
+from .models import Job, Category, JobType, Skill, EducationLevel
+from .recommendations import job_skill_index
+from .search import MAX_ID, reindex_jobs
+from .serializers import JobImportRowSerializer
+
+
+CSV_SKILL_SEPARATOR = ';'
+
+RELATED_FIELDS = {
+    'category': Category,
+    'job_type': JobType,
+    'education_level': EducationLevel,
+}
+
+
+class UnreadableRow(str):
+    """Stands in for a row that could not be read; the string says why."""
+
+
+def _decoded_lines(stream):
+    # The request body is read line by line as it arrives; it is never
+    # buffered whole.
+    for line in stream:
+        yield line.decode('utf-8-sig')
+
+
+def read_csv_rows(stream):
+    """
+    ``(line, row)`` pairs from a CSV body. A record that cannot be read ends
+    the import there: it is yielded as an UnreadableRow, after the rows
+    before it.
+    """
+    reader = csv.DictReader(_decoded_lines(stream))
+    try:
+        for row in reader:
+            row = {key.strip(): (value or '').strip() for key, value in row.items() if key}
+            skills = row.get('skills', '')
+            row['skills'] = [skill.strip() for skill in skills.split(CSV_SKILL_SEPARATOR) if skill.strip()]
+            yield reader.line_num, row
+    except UnicodeDecodeError:
+        yield reader.line_num + 1, UnreadableRow('Line is not valid UTF-8; the rest of the file was not read.')
+    except csv.Error as e:
+        yield reader.line_num, UnreadableRow(f'Malformed CSV: {e}; the rest of the file was not read.')
+
+
+def read_ndjson_rows(stream):
+    for line_number, line in enumerate(stream, start=1):
+        try:
+            line = line.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            yield line_number, UnreadableRow('Line is not valid UTF-8.')
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, UnreadableRow('Line is not valid JSON.')
+            continue
+        if isinstance(row, dict) and isinstance(row.get('skills'), (str, int)):
+            row['skills'] = [row['skills']]
+        yield line_number, row
+
+
+def _as_id(reference):
+    # Too large for an id column: can only be a name.
+    reference = str(reference)
+    if reference.isdecimal() and int(reference) <= MAX_ID:
+        return int(reference)
+    return None
+
+
+def _resolve(model, references):
+    # One query per model per chunk: references may be ids or exact names.
+    ids = {_as_id(ref) for ref in references} - {None}
+    names = {str(ref) for ref in references if _as_id(ref) is None}
+    found = {}
+    for obj in model.objects.filter(Q(id__in=ids) | Q(name__in=names)).only('id', 'name'):
+        found[str(obj.id)] = obj.id
+        found.setdefault(obj.name, obj.id)
+    return found
+
+
+def import_chunk(employer_id, chunk):
+    """Validate and insert one chunk of ``(line, row)`` pairs; return errors."""
+    errors = []
+    valid = []
+    for line, row in chunk:
+        if isinstance(row, UnreadableRow):
+            errors.append({'line': line, 'errors': {'non_field_errors': [str(row)]}})
+            continue
+        if not isinstance(row, dict):
+            errors.append({'line': line, 'errors': {'non_field_errors': ['Row is not a JSON object.']}})
+            continue
+        serializer = JobImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((line, serializer.validated_data))
+        else:
+            errors.append({'line': line, 'errors': serializer.errors})
+
+    lookups = {
+        field: _resolve(model, {str(data[field]) for _, data in valid})
+        for field, model in RELATED_FIELDS.items()
+    }
+    skill_ids = _resolve(Skill, {str(skill) for _, data in valid for skill in data['skills']})
+
+    jobs, job_skills = [], []
+    for line, data in valid:
+        row_errors = {}
+        related = {}
+        for field in RELATED_FIELDS:
+            related[field] = lookups[field].get(str(data[field]))
+            if related[field] is None:
+                row_errors[field] = [f'Unknown {field.replace("_", " ")} "{data[field]}".']
+        unknown_skills = [skill for skill in data['skills'] if str(skill) not in skill_ids]
+        if unknown_skills:
+            row_errors['skills'] = [f'Unknown skills: {", ".join(map(str, unknown_skills))}.']
+        if row_errors:
+            errors.append({'line': line, 'errors': row_errors})
+            continue
+
+        jobs.append(locate(Job(
+            employer_id=employer_id,
+            title=data['title'],
+            description=data['description'],
+            location=data['location'],
+            min_salary=data['min_salary'],
+            max_salary=data['max_salary'],
+            experience_level=data['experience_level'],
+            category_id=related['category'],
+            job_type_id=related['job_type'],
+            education_level_id=related['education_level'],
+        )))
+        job_skills.append({skill_ids[str(skill)] for skill in data['skills']})
+
+    if jobs:
+        with transaction.atomic():
+            bulk_create_with_ids(Job, jobs)
+            Through = Job.skills.through
+            Through.objects.bulk_create([
+                Through(job_id=job.id, skill_id=skill_id)
+                for job, skill_ids_for_job in zip(jobs, job_skills)
+                for skill_id in skill_ids_for_job
+            ])
+            # bulk_create sends no signals; bring the derived indexes up to date.
+            reindex_jobs([job.id for job in jobs])
+        if job_skill_index.is_built:
+            for job, skill_ids_for_job in zip(jobs, job_skills):
+                job_skill_index.update_job(job, skill_ids_for_job)
+        if autocomplete_index.is_built:
+            for job, skill_ids_for_job in zip(jobs, job_skills):
+                autocomplete_index.update_job(job, skill_ids_for_job)
+
+    errors.sort(key=lambda error: error['line'])
+    return len(jobs), errors
+
+
+def import_jobs(employer_id, rows, chunk_size=500):
+    created = 0
+    errors = []
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            chunk_created, chunk_errors = import_chunk(employer_id, chunk)
+            created += chunk_created
+            errors.extend(chunk_errors)
+            chunk = []
+    if chunk:
+        chunk_created, chunk_errors = import_chunk(employer_id, chunk)
+        created += chunk_created
+        errors.extend(chunk_errors)
+    return {'created': created, 'errors': errors}
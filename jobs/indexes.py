@@ -0,0 +1,71 @@
+"""
+Build and refresh cycle shared by the in-process indexes
+(jobs.recommendations.JobSkillIndex, jobs.autocomplete.AutocompleteIndex).
+"""
+import logging
+import threading
+import time
+
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshingIndex:
+    """
+    Base class for an index held in memory and built from the database by
+    ``rebuild()``, which subclasses implement and which must set
+    ``_built_at`` under ``_lock`` when it swaps the new data in.
+
+    The server entry points build the indexes at startup with
+    ``warm_indexes()``; a request that needs one before it is ready waits
+    for that build instead of starting another. From then on signals keep
+    the index current for writes made in this process, and once it is
+    ``rebuild_interval`` seconds old a rebuild in a background thread picks
+    up writes from other workers. Requests go on using the current data in
+    the meantime, so none waits for a rebuild after the first.
+    """
+    rebuild_interval = 300
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+        # Held while a rebuild runs, by whichever thread started it.
+        self._rebuilding = threading.Lock()
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def ensure_built(self):
+        if self._built_at is None:
+            with self._rebuilding:
+                if self._built_at is None:
+                    self.rebuild()
+        elif time.monotonic() - self._built_at > self.rebuild_interval:
+            self.rebuild_in_background()
+
+    def rebuild_in_background(self):
+        """Start a rebuild in a new thread, unless one is already running."""
+        if self._rebuilding.acquire(blocking=False):
+            threading.Thread(target=self._background_rebuild, daemon=True).start()
+
+    def _background_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Rebuilding %s failed', type(self).__name__)
+        finally:
+            self._rebuilding.release()
+            # The thread's own connection; nothing else will close it.
+            connection.close()
+
+
+def warm_indexes():
+    """Build every in-process index in the background."""
+    from .autocomplete import autocomplete_index
+    from .recommendations import job_skill_index
+
+    for index in (job_skill_index, autocomplete_index):
+        index.rebuild_in_background()
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Employer, JobSeeker, Job
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the sync and async versions of the public read endpoints under '
+        'concurrent load, served by one in-process ASGI handler (as one ASGI worker '
+        'would). Sync views share a single thread there; async views overlap their '
+        'queries.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, action='append',
+                            help='Concurrent clients (repeatable; default 1, 10 and 50).')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per route and concurrency level.')
+        parser.add_argument('--db-latency', type=float, default=0.0,
+                            help='Milliseconds added to every query, to simulate a database '
+                                 'server across the network.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        employer = Employer.objects.filter(company_profile__isnull=False).first()
+        jobseeker = JobSeeker.objects.filter(jobseeker_profile__isnull=False).first()
+        job = Job.objects.filter(skills__isnull=False).first()
+        if employer is None or jobseeker is None or job is None:
+            raise CommandError('No data to benchmark against; run seed_data first.')
+
+        routes = {
+            'job-detail': ({'pk': job.pk}, ''),
+            'search-jobs': ({}, 'q=developer&facets=category,salary'),
+            'skill-list': ({}, ''),
+            'employer-profile-id': ({'id': employer.company_profile_id}, ''),
+            'candidate-profile-id': ({'id': jobseeker.jobseeker_profile_id}, ''),
+        }
+        if options['db_latency']:
+            self.add_db_latency(options['db_latency'] / 1000)
+
+        # Queued requests are slow by design here; keep the slow request log quiet.
+        logging.getLogger('newcomers_job_app.timing').setLevel(logging.ERROR)
+        results = {}
+        for concurrency in options['concurrency'] or [1, 10, 50]:
+            for name, (kwargs, query) in routes.items():
+                for variant in ('sync', 'async'):
+                    url = reverse(name if variant == 'sync' else f'async-{name}', kwargs=kwargs)
+                    url += f'?{query}' if query else ''
+                    result = asyncio.run(self.run_load(url, concurrency, options['requests']))
+                    results.setdefault(name, {}).setdefault(variant, {})[concurrency] = result
+                    self.stdout.write(
+                        f"{name:22} {variant:5} c={concurrency:<4} {result['rps']:9.1f} req/s "
+                        f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms"
+                    )
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'requests': options['requests'],
+            'db_latency_ms': options['db_latency'],
+            'database_vendor': connection.vendor,
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def add_db_latency(self, seconds):
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(connection, **kwargs):
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        # Connections are per thread; cover the ones opened by worker threads.
+        connection_created.connect(install, weak=False)
+        for conn in connections.all():
+            install(conn)
+
+    async def run_load(self, url, concurrency, total):
+        client = AsyncClient()
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+        timings, statuses = [], set()
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+                statuses.add(response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        percentiles = statistics.quantiles(timings, n=100, method='inclusive') if len(timings) > 1 else timings * 99
+        return {
+            'path': url,
+            'status': sorted(statuses),
+            'rps': round(total / elapsed, 1),
+            'p50_ms': round(percentiles[49], 3),
+            'p95_ms': round(percentiles[94], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+        }
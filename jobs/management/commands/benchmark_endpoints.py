@@ -0,0 +1,176 @@
+import json
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Employer, JobSeeker, Job, Application
+from jobs.tokens import RefreshToken
+from jobs.urls import urlpatterns
+
+
+class Rollback(Exception):
+    pass
+
+
+def timed_queries(response):
+    """The query count RequestTimingMiddleware reports in ``Server-Timing``."""
+    match = re.search(r'desc="Queries: (\d+)"', response.get('Server-Timing', ''))
+    return int(match.group(1)) if match else 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure latency percentiles and query counts for every route in jobs/urls.py '
+        'against the current database, using the Django test client. Requests that '
+        'write are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--route', action='append', dest='routes',
+                            help='Only benchmark the named route (repeatable).')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        employer = Employer.objects.filter(jobs__applications__isnull=False).select_related('user').first()
+        jobseeker = JobSeeker.objects.filter(applications__isnull=False, resume__isnull=False).select_related('user').first()
+        if employer is None or jobseeker is None:
+            raise CommandError('No data to benchmark against; run seed_data first.')
+
+        job = employer.jobs.filter(applications__isnull=False).first()
+        application = Application.objects.filter(job__employer=employer).first()
+        other_job = Job.objects.exclude(applications__jobseeker=jobseeker).first()
+        specs = self.route_specs(employer, jobseeker, job, application, other_job)
+
+        names = [pattern.name for pattern in urlpatterns]
+        selected = options['routes'] or names
+        results = {}
+        for name in selected:
+            if name not in specs:
+                self.stdout.write(self.style.WARNING(f'{name}: no benchmark spec, skipped'))
+                continue
+            results[name] = self.benchmark(name, specs[name], options['iterations'], options['warmup'])
+            result = results[name]
+            self.stdout.write(
+                f"{name:32} {result['method']:6} {result['status']:>3} "
+                f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+                f"p99={result['p99_ms']:8.2f}ms queries={result['queries']}"
+            )
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'iterations': options['iterations'],
+            'database_vendor': connection.vendor,
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def route_specs(self, employer, jobseeker, job, application, other_job):
+        # name -> (method, url kwargs, body, user, query string). A body is
+        # sent as JSON unless given as a (content type, text) pair.
+        as_employer, as_jobseeker, anonymous = employer.user, jobseeker.user, None
+        job_body = {
+            'title': 'Benchmark job', 'description': 'Benchmark', 'location': 'Calgary, AB',
+            'min_salary': '50000.00', 'max_salary': '60000.00', 'experience_level': 'Junior',
+            'category': job.category_id, 'job_type': job.job_type_id,
+            'education_level': job.education_level_id, 'skills': list(job.skills.values_list('id', flat=True)),
+        }
+        refresh = str(RefreshToken.for_user(as_jobseeker))
+        specs = {
+            'register': ('post', {}, {'email': 'bench@example.com', 'password': 'Secret-pass-123',
+                                      'first_name': 'Bench', 'last_name': 'Mark', 'user_type': 'jobseeker'}, anonymous, ''),
+            'token_obtain_pair': ('post', {}, {'username': as_jobseeker.username, 'password': 'password123'}, anonymous, ''),
+            'token_refresh': ('post', {}, {'refresh': refresh}, anonymous, ''),
+            'logout': ('post', {}, {'refresh': refresh}, as_jobseeker, ''),
+            'UserTypeProfile': ('get', {}, None, as_jobseeker, ''),
+            'category-list': ('get', {}, None, anonymous, ''),
+            'jobtype-list': ('get', {}, None, anonymous, ''),
+            'skill-list': ('get', {}, None, anonymous, ''),
+            'educationlevel-list': ('get', {}, None, anonymous, ''),
+            'job-detail': ('get', {'pk': job.pk}, None, anonymous, ''),
+            'create_job': ('post', {}, job_body, as_employer, ''),
+            'import-jobs': ('post', {}, ('application/x-ndjson', json.dumps({**job_body, 'skills': job_body['skills'][:1]}) + '\n'), as_employer, ''),
+            'edit-job': ('put', {'pk': job.pk}, job_body, as_employer, ''),
+            'employer-jobs': ('get', {}, None, as_employer, ''),
+            'employer-jobs-export': ('get', {}, None, as_employer, ''),
+            'job-delete': ('delete', {'pk': job.pk}, None, as_employer, ''),
+            'search-jobs': ('get', {}, None, anonymous, 'q=developer'),
+            'autocomplete': ('get', {}, None, anonymous, 'q=dev'),
+            'employer-profile': ('get', {}, None, as_employer, ''),
+            'employer-profile-id': ('get', {'id': employer.company_profile_id}, None, anonymous, ''),
+            'candidate-profile': ('get', {}, None, as_jobseeker, ''),
+            'candidate-profile-id': ('get', {'id': jobseeker.jobseeker_profile_id}, None, anonymous, ''),
+            'resume': ('get', {}, None, as_jobseeker, ''),
+            'resume-id': ('get', {'id': jobseeker.jobseeker_profile_id}, None, anonymous, ''),
+            'job_applications_list': ('get', {}, None, as_jobseeker, ''),
+            'update_application_status': ('patch', {'pk': application.pk}, {'status': 'Under Review'}, as_employer, ''),
+            'bulk_update_application_status': ('patch', {}, {'filter': {'job': job.pk}, 'status': 'Under Review'}, as_employer, ''),
+            'job-applicants': ('get', {'job_id': job.pk}, None, as_employer, ''),
+            'job-applicants-export': ('get', {'job_id': job.pk}, None, as_employer, ''),
+            'create-application': ('post', {}, {'job': other_job.pk if other_job else job.pk}, as_jobseeker, ''),
+            'recommended-jobs': ('get', {}, None, as_jobseeker, ''),
+        }
+        for name in ('category-list', 'jobtype-list', 'skill-list', 'educationlevel-list', 'job-detail',
+                     'search-jobs', 'employer-profile-id', 'candidate-profile-id'):
+            specs[f'async-{name}'] = specs[name]
+        return specs
+
+    def request(self, client, method, url, body, headers):
+        if body is None:
+            return getattr(client, method)(url, **headers)
+        content_type, data = body if isinstance(body, tuple) else ('application/json', json.dumps(body))
+        return getattr(client, method)(url, data=data, content_type=content_type, **headers)
+
+    def benchmark(self, name, spec, iterations, warmup):
+        method, kwargs, body, user, query = spec
+        url = reverse(name, kwargs=kwargs) + (f'?{query}' if query else '')
+        headers = {}
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        client = Client()
+
+        timings, queries, status = [], [], None
+        for iteration in range(warmup + iterations):
+            try:
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as captured:
+                        start = time.perf_counter()
+                        response = self.request(client, method, url, body, headers)
+                        if response.streaming:
+                            for _ in response.streaming_content:
+                                pass
+                        elapsed = time.perf_counter() - start
+                    if method != 'get':
+                        raise Rollback
+            except Rollback:
+                pass
+            if iteration >= warmup:
+                timings.append(elapsed * 1000)
+                # The middleware counts queries on every connection, including
+                # those of the async views' worker threads; the capture also
+                # sees queries made while a streaming response is consumed.
+                queries.append(max(len(captured), timed_queries(response)))
+                status = response.status_code
+
+        percentiles = statistics.quantiles(timings, n=100, method='inclusive') if len(timings) > 1 else timings * 99
+        return {
+            'method': method.upper(),
+            'path': url,
+            'status': status,
+            'p50_ms': round(percentiles[49], 3),
+            'p95_ms': round(percentiles[94], 3),
+            'p99_ms': round(percentiles[98], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': max(queries),
+        }
@@ -0,0 +1,90 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from jobs.fieldsets import JOB_CARD_FIELDS
+from jobs.models import Job, Application
+from jobs.renderers import FastJSONRenderer
+from jobs.rows import JobRowSerializer, ApplicationRowSerializer
+from jobs.serializers import JobSerializer, ApplicationSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows per second for loading, serializing and rendering jobs and '
+        'applications with the DRF serializers and with the row serializers in '
+        'jobs.rows, and check that both produce the same bytes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per run.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the best is reported.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        count = options['rows']
+        job_ids = list(Job.objects.order_by('-date_posted', '-id').values_list('id', flat=True)[:count])
+        application_ids = list(Application.objects.order_by('-id').values_list('id', flat=True)[:count])
+        if not job_ids or not application_ids:
+            raise CommandError('No data to benchmark against; run seed_data first.')
+
+        jobs = Job.objects.filter(id__in=job_ids).order_by('-date_posted', '-id')
+        applications = Application.objects.filter(id__in=application_ids).order_by('-application_date', '-id')
+
+        def drf_jobs(fields):
+            return lambda: JobSerializer(jobs.for_serializer(fields), many=True, fields=fields).data
+
+        def row_jobs(fields):
+            def run():
+                serializer = JobRowSerializer(fields)
+                return serializer.to_representation(list(serializer.rows(jobs)))
+            return run
+
+        def drf_applications():
+            queryset = applications.select_related('job__employer', 'jobseeker__user')
+            return ApplicationSerializer(queryset, many=True).data
+
+        def row_applications():
+            serializer = ApplicationRowSerializer()
+            return serializer.to_representation(list(serializer.rows(applications)))
+
+        cases = [
+            ('jobs (full)', drf_jobs(None), row_jobs(None), len(job_ids)),
+            ('jobs (card)', drf_jobs(JOB_CARD_FIELDS), row_jobs(JOB_CARD_FIELDS), len(job_ids)),
+            ('applications', drf_applications, row_applications, len(application_ids)),
+        ]
+        results = {}
+        for name, drf, rows, size in cases:
+            drf_bytes = JSONRenderer().render(drf())
+            fast_bytes = FastJSONRenderer().render(rows())
+            if drf_bytes != fast_bytes:
+                raise CommandError(f'{name}: row serializer output differs from the DRF serializer.')
+
+            result = {
+                'rows': size,
+                'drf': self.rate(lambda: JSONRenderer().render(drf()), size, options['repeat']),
+                'rows_json': self.rate(lambda: JSONRenderer().render(rows()), size, options['repeat']),
+                'rows_orjson': self.rate(lambda: FastJSONRenderer().render(rows()), size, options['repeat']),
+            }
+            result['speedup'] = round(result['rows_orjson'] / result['drf'], 2)
+            results[name] = result
+            self.stdout.write(
+                f"{name:14} drf={result['drf']:>9,.0f} rows/s  rows+json={result['rows_json']:>9,.0f} rows/s  "
+                f"rows+orjson={result['rows_orjson']:>9,.0f} rows/s  x{result['speedup']}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+    def rate(self, run, size, repeat):
+        best = min(self.elapsed(run) for _ in range(repeat))
+        return size / best
+
+    @staticmethod
+    def elapsed(run):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
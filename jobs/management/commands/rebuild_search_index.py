@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index used by the search-jobs endpoint.'
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Job search index rebuilt.'))
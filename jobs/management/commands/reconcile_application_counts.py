@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs.applications import reconcile_status_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount applications per job and status and correct the denormalized '
+        'JobStatusCount rows, e.g. after bulk inserts or a failed deploy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Jobs recounted per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it.')
+
+    def handle(self, *args, **options):
+        fixed = reconcile_status_counts(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'Would fix' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {fixed} application counters.'))
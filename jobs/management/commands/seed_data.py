@@ -0,0 +1,263 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.applications import reconcile_status_counts
+from jobs.bulk import bulk_create_with_ids
+from jobs.cache import bump_lookup_version
+from jobs.geo import locate
+from jobs.models import (
+    User, JobSeeker, JobSeekerProfile, Resume, CandidateSkill, Education, Experience,
+    Employer, CompanyProfile, Category, JobType, Skill, EducationLevel, Job, Application,
+)
+from jobs.search import rebuild_index
+
+
+CATEGORIES = [
+    'Information Technology', 'Healthcare', 'Construction', 'Hospitality', 'Retail',
+    'Finance', 'Education', 'Manufacturing', 'Transportation', 'Customer Service',
+]
+JOB_TYPES = ['Full-time', 'Part-time', 'Contract', 'Temporary', 'Internship']
+EDUCATION_LEVELS = ['High School', 'College Diploma', 'Bachelor', 'Master', 'Doctorate']
+SKILLS = [
+    'Python', 'Django', 'JavaScript', 'React', 'SQL', 'Excel', 'Customer Service', 'Forklift',
+    'Welding', 'Carpentry', 'First Aid', 'Nursing', 'Bookkeeping', 'Sales', 'Cooking',
+    'French', 'Spanish', 'Project Management', 'Driving', 'Cleaning', 'Inventory',
+    'Data Analysis', 'AWS', 'Docker', 'Java', 'C#', 'Accounting', 'Teaching', 'Childcare',
+    'Electrical', 'Plumbing', 'Marketing', 'Graphic Design', 'Photoshop', 'Linux',
+]
+TITLES = [
+    'Developer', 'Analyst', 'Nurse', 'Cook', 'Cashier', 'Driver', 'Accountant', 'Teacher',
+    'Welder', 'Electrician', 'Sales Associate', 'Warehouse Associate', 'Receptionist',
+    'Project Coordinator', 'Customer Service Representative', 'Carpenter', 'Cleaner',
+]
+SENIORITY = ['Junior', 'Intermediate', 'Senior', 'Lead']
+CITIES = [
+    'Calgary, AB', 'Edmonton, AB', 'Toronto, ON', 'Ottawa, ON', 'Vancouver, BC', 'Victoria, BC',
+    'Montreal, QC', 'Quebec City, QC', 'Winnipeg, MB', 'Halifax, NS', 'Saskatoon, SK', 'Regina, SK',
+]
+FIRST_NAMES = ['Ana', 'Luis', 'Maria', 'Ahmed', 'Priya', 'Chen', 'Olga', 'Kofi', 'Sara', 'Diego', 'Fatima', 'Ivan']
+LAST_NAMES = ['Garcia', 'Singh', 'Nguyen', 'Okafor', 'Kim', 'Silva', 'Hassan', 'Petrov', 'Lopez', 'Wong']
+COMPANY_WORDS = ['Northern', 'Maple', 'Prairie', 'Coastal', 'Summit', 'Aurora', 'Granite', 'Harbour', 'Cedar']
+COMPANY_SUFFIXES = ['Solutions', 'Health', 'Builders', 'Foods', 'Logistics', 'Group', 'Technologies', 'Services']
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a synthetic dataset using bulk inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employers', type=int, default=100)
+        parser.add_argument('--jobs', type=int, default=5000)
+        parser.add_argument('--jobseekers', type=int, default=2000)
+        parser.add_argument('--applications', type=int, default=20000)
+        parser.add_argument('--skills', type=int, default=len(SKILLS),
+                            help='Number of skills; names beyond the built-in list get a numeric suffix.')
+        parser.add_argument('--resume-items', type=int, default=4,
+                            help='Skills, educations and experiences per resume (upper bound).')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.password = make_password('password123')
+        self.run_id = timezone.now().strftime('%Y%m%d%H%M%S')
+
+        with transaction.atomic():
+            lookups = self.create_lookups(options['skills'])
+            employers = self.create_employers(options['employers'], lookups['categories'])
+            jobs = self.create_jobs(options['jobs'], employers, lookups)
+            jobseekers = self.create_jobseekers(options['jobseekers'], options['resume_items'], lookups)
+            applications = self.create_applications(options['applications'], jobseekers, jobs)
+
+        # Bulk inserts send no signals; refresh what the signals maintain.
+        rebuild_index()
+        reconcile_status_counts(batch_size=self.batch_size)
+        for model in (Category, JobType, Skill, EducationLevel):
+            bump_lookup_version(model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(employers)} employers, {len(jobs)} jobs, '
+            f'{len(jobseekers)} job seekers and {applications} applications.'
+        ))
+
+    def bulk(self, model, objs):
+        return bulk_create_with_ids(model, objs, batch_size=self.batch_size)
+
+    def bulk_through(self, through, rows):
+        through.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def spread_dates(self, model, field, objs, days=365):
+        # auto_now_add stamps every bulk-inserted row with the same time, so
+        # back-date contiguous id ranges to spread rows over the past year.
+        if not objs:
+            return
+        now = timezone.now()
+        step = max(len(objs) // days, 1)
+        for day, start in enumerate(range(0, len(objs), step)):
+            chunk = objs[start:start + step]
+            model.objects.filter(id__gte=chunk[0].id, id__lte=chunk[-1].id).update(
+                **{field: now - datetime.timedelta(days=day, seconds=self.random.randint(0, 86399))}
+            )
+
+    def create_lookups(self, skill_count):
+        def existing_or_new(model, names):
+            existing = {obj.name: obj for obj in model.objects.filter(name__in=names)}
+            created = self.bulk(model, [model(name=name) for name in names if name not in existing])
+            return list(existing.values()) + created
+
+        skill_names = [
+            SKILLS[index] if index < len(SKILLS) else f'{SKILLS[index % len(SKILLS)]} {index // len(SKILLS)}'
+            for index in range(skill_count)
+        ]
+        return {
+            'categories': existing_or_new(Category, CATEGORIES),
+            'job_types': existing_or_new(JobType, JOB_TYPES),
+            'education_levels': existing_or_new(EducationLevel, EDUCATION_LEVELS),
+            'skills': existing_or_new(Skill, skill_names),
+        }
+
+    def create_users(self, count, user_type, prefix):
+        users = []
+        for index in range(count):
+            first_name = self.random.choice(FIRST_NAMES)
+            last_name = self.random.choice(LAST_NAMES)
+            email = f'{prefix}{index}.{self.run_id}@example.com'
+            users.append(User(
+                username=email, email=email, password=self.password,
+                first_name=first_name, last_name=last_name, user_type=user_type,
+            ))
+        return self.bulk(User, users)
+
+    def create_employers(self, count, categories):
+        users = self.create_users(count, 'employer', 'employer')
+        profiles = self.bulk(CompanyProfile, [
+            locate(CompanyProfile(
+                profile_description='We are hiring newcomers across Canada.',
+                location=self.random.choice(CITIES),
+                category=self.random.choice(categories),
+            ))
+            for _ in users
+        ])
+        return self.bulk(Employer, [
+            Employer(
+                user=user,
+                company_name=f'{self.random.choice(COMPANY_WORDS)} {self.random.choice(COMPANY_SUFFIXES)}',
+                company_profile=profile,
+            )
+            for user, profile in zip(users, profiles)
+        ])
+
+    def create_jobs(self, count, employers, lookups):
+        if not employers:
+            return []
+        jobs = []
+        for _ in range(count):
+            min_salary = self.random.randrange(30000, 120000, 500)
+            seniority = self.random.choice(SENIORITY)
+            jobs.append(locate(Job(
+                employer=self.random.choice(employers),
+                title=f'{seniority} {self.random.choice(TITLES)}',
+                description='Join our team. ' * self.random.randint(5, 30),
+                location=self.random.choice(CITIES),
+                min_salary=Decimal(min_salary),
+                max_salary=Decimal(min_salary + self.random.randrange(0, 40000, 500)),
+                experience_level=seniority,
+                active=self.random.random() < 0.9,
+                category=self.random.choice(lookups['categories']),
+                job_type=self.random.choice(lookups['job_types']),
+                education_level=self.random.choice(lookups['education_levels']),
+            )))
+        jobs = self.bulk(Job, jobs)
+        self.spread_dates(Job, 'date_posted', jobs)
+
+        Through = Job.skills.through
+        skills = lookups['skills']
+        self.bulk_through(Through, [
+            Through(job_id=job.id, skill_id=skill.id)
+            for job in jobs
+            for skill in self.random.sample(skills, min(len(skills), self.random.randint(1, 6)))
+        ])
+        return jobs
+
+    def create_jobseekers(self, count, resume_items, lookups):
+        users = self.create_users(count, 'jobseeker', 'jobseeker')
+        profiles = self.bulk(JobSeekerProfile, [
+            JobSeekerProfile(
+                profile_description='Motivated newcomer looking for work.',
+                email=user.email,
+                location=self.random.choice(CITIES),
+            )
+            for user in users
+        ])
+        # Rows with no columns besides the id are inserted as a compound
+        # SELECT, which SQLite caps at 500 terms.
+        resumes = bulk_create_with_ids(Resume, [Resume() for _ in users], batch_size=min(self.batch_size, 500))
+
+        candidate_skills, educations, experiences = [], [], []
+        resume_skills, resume_educations, resume_experiences = [], [], []
+        today = datetime.date.today()
+        for resume in resumes:
+            for skill in self.random.sample(lookups['skills'], min(len(lookups['skills']), self.random.randint(1, resume_items))):
+                candidate_skills.append(CandidateSkill(
+                    name=skill.name,
+                    proficiency=self.random.choice(['basic', 'intermediate', 'advanced']),
+                ))
+                resume_skills.append(resume.id)
+            for _ in range(self.random.randint(1, resume_items)):
+                start = today - datetime.timedelta(days=self.random.randint(365, 365 * 15))
+                educations.append(Education(
+                    level=self.random.choice(lookups['education_levels']),
+                    school=f'{self.random.choice(COMPANY_WORDS)} College',
+                    start_date=start,
+                    end_date=start + datetime.timedelta(days=self.random.randint(180, 365 * 4)),
+                ))
+                resume_educations.append(resume.id)
+            for _ in range(self.random.randint(0, resume_items)):
+                start = today - datetime.timedelta(days=self.random.randint(90, 365 * 10))
+                experiences.append(Experience(
+                    company=f'{self.random.choice(COMPANY_WORDS)} {self.random.choice(COMPANY_SUFFIXES)}',
+                    position=self.random.choice(TITLES),
+                    start_date=start,
+                    end_date=min(today, start + datetime.timedelta(days=self.random.randint(90, 365 * 5))),
+                ))
+                resume_experiences.append(resume.id)
+
+        for model, objs, owners, field in (
+            (CandidateSkill, candidate_skills, resume_skills, 'candidate_skills'),
+            (Education, educations, resume_educations, 'educations'),
+            (Experience, experiences, resume_experiences, 'experiences'),
+        ):
+            objs = self.bulk(model, objs)
+            Through = getattr(Resume, field).through
+            target = model._meta.model_name + '_id'
+            self.bulk_through(Through, [
+                Through(**{'resume_id': resume_id, target: obj.id})
+                for resume_id, obj in zip(owners, objs)
+            ])
+
+        return self.bulk(JobSeeker, [
+            JobSeeker(user=user, jobseeker_profile=profile, resume=resume)
+            for user, profile, resume in zip(users, profiles, resumes)
+        ])
+
+    def create_applications(self, count, jobseekers, jobs):
+        if not jobseekers or not jobs:
+            return 0
+        count = min(count, len(jobseekers) * len(jobs))
+        pairs = set()
+        while len(pairs) < count:
+            pairs.add((self.random.choice(jobseekers).id, self.random.choice(jobs).id))
+        statuses = Application.StatusChoices.values
+        applications = [
+            Application(jobseeker_id=jobseeker_id, job_id=job_id, status=self.random.choice(statuses))
+            for jobseeker_id, job_id in pairs
+        ]
+        applications = self.bulk(Application, applications)
+        self.spread_dates(Application, 'application_date', applications)
+        return len(applications)
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts USING fts5("
+        "title, description, location, min_salary, max_salary, experience_level, "
+        "first_name, last_name, category, job_type, skills, education_level, "
+        "tokenize='trigram')"
+    )
+    schema_editor.execute(
+        """
+        INSERT INTO jobs_job_fts (rowid, title, description, location, min_salary, max_salary,
+                                  experience_level, first_name, last_name, category, job_type,
+                                  skills, education_level)
+        SELECT j.id, j.title, j.description, j.location,
+               CAST(j.min_salary AS TEXT), CAST(j.max_salary AS TEXT),
+               j.experience_level, u.first_name, u.last_name,
+               c.name, t.name,
+               (SELECT group_concat(s.name, char(10))
+                  FROM jobs_job_skills js
+                  JOIN jobs_skill s ON s.id = js.skill_id
+                 WHERE js.job_id = j.id),
+               e.name
+          FROM jobs_job j
+          JOIN jobs_employer emp ON emp.id = j.employer_id
+          JOIN jobs_user u ON u.id = emp.user_id
+          LEFT JOIN jobs_category c ON c.id = j.category_id
+          LEFT JOIN jobs_jobtype t ON t.id = j.job_type_id
+          LEFT JOIN jobs_educationlevel e ON e.id = j.education_level_id
+        """
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS jobs_job_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_application'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', 'status', 'application_date'], name='application_job_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['jobseeker', 'application_date'], name='application_seeker_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['employer', 'date_posted'], name='job_employer_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['active', 'date_posted'], name='job_active_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['min_salary', 'max_salary'], name='job_salary_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_applications(apps, schema_editor):
+    Application = apps.get_model('jobs', 'Application')
+    JobStatusCount = apps.get_model('jobs', 'JobStatusCount')
+    rows = Application.objects.values_list('job_id', 'status').annotate(count=models.Count('id')).order_by()
+    JobStatusCount.objects.bulk_create(
+        [JobStatusCount(job_id=job_id, status=status, count=count) for job_id, status, count in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Applied', 'Applied'), ('Under Review', 'Under Review'), ('Interviewing', 'Interviewing'), ('Shortlisted', 'Shortlisted'), ('Hired', 'Hired')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_counts', to='jobs.job')),
+            ],
+            options={
+                'unique_together': {('job', 'status')},
+            },
+        ),
+        migrations.RunPython(count_applications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_application_status_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,223 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:51
+
+import csv
+import io
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# A frozen copy of jobs/data/gazetteer.csv and of jobs.geo.geocode() as of
+# this migration, so that later changes to either do not change what it does.
+GAZETTEER_CSV = """\
+name,province,latitude,longitude
+Toronto,ON,43.6532,-79.3832
+Montreal,QC,45.5017,-73.5673
+Calgary,AB,51.0447,-114.0719
+Ottawa,ON,45.4215,-75.6972
+Edmonton,AB,53.5461,-113.4938
+Winnipeg,MB,49.8951,-97.1384
+Mississauga,ON,43.5890,-79.6441
+Vancouver,BC,49.2827,-123.1207
+Brampton,ON,43.7315,-79.7624
+Hamilton,ON,43.2557,-79.8711
+Surrey,BC,49.1913,-122.8490
+Quebec City,QC,46.8139,-71.2080
+Quebec,QC,46.8139,-71.2080
+Halifax,NS,44.6488,-63.5752
+Laval,QC,45.6066,-73.7124
+London,ON,42.9849,-81.2453
+Markham,ON,43.8561,-79.3370
+Vaughan,ON,43.8361,-79.4983
+Gatineau,QC,45.4765,-75.7013
+Saskatoon,SK,52.1332,-106.6700
+Kitchener,ON,43.4516,-80.4925
+Longueuil,QC,45.5312,-73.5185
+Burnaby,BC,49.2488,-122.9805
+Windsor,ON,42.3149,-83.0364
+Regina,SK,50.4452,-104.6189
+Oakville,ON,43.4675,-79.6877
+Richmond,BC,49.1666,-123.1336
+Richmond Hill,ON,43.8828,-79.4403
+Burlington,ON,43.3255,-79.7990
+Oshawa,ON,43.8971,-78.8658
+Sherbrooke,QC,45.4042,-71.8929
+Sudbury,ON,46.4917,-80.9930
+Abbotsford,BC,49.0504,-122.3045
+Levis,QC,46.8033,-71.1779
+Coquitlam,BC,49.2838,-122.7932
+Barrie,ON,44.3894,-79.6903
+Saguenay,QC,48.4280,-71.0686
+Kelowna,BC,49.8880,-119.4960
+Guelph,ON,43.5448,-80.2482
+Trois-Rivieres,QC,46.3432,-72.5421
+Whitby,ON,43.8975,-78.9429
+Cambridge,ON,43.3616,-80.3144
+St. Catharines,ON,43.1594,-79.2469
+Milton,ON,43.5183,-79.8774
+Langley,BC,49.1044,-122.6600
+Kingston,ON,44.2312,-76.4860
+Ajax,ON,43.8509,-79.0204
+Waterloo,ON,43.4643,-80.5204
+Terrebonne,QC,45.6927,-73.6333
+Saanich,BC,48.4840,-123.3816
+St. John's,NL,47.5615,-52.7126
+Thunder Bay,ON,48.3809,-89.2477
+Delta,BC,49.0847,-123.0587
+Brantford,ON,43.1394,-80.2644
+Chatham,ON,42.4048,-82.1910
+Red Deer,AB,52.2681,-113.8112
+Kamloops,BC,50.6745,-120.3273
+Lethbridge,AB,49.6956,-112.8451
+Nanaimo,BC,49.1659,-123.9401
+Moncton,NB,46.0878,-64.7782
+Saint John,NB,45.2733,-66.0633
+Fredericton,NB,45.9636,-66.6431
+Victoria,BC,48.4284,-123.3656
+Charlottetown,PE,46.2382,-63.1311
+Sydney,NS,46.1368,-60.1942
+Peterborough,ON,44.3091,-78.3197
+Sault Ste. Marie,ON,46.5219,-84.3461
+Medicine Hat,AB,50.0405,-110.6766
+Grande Prairie,AB,55.1707,-118.7947
+Fort McMurray,AB,56.7267,-111.3810
+Airdrie,AB,51.2917,-114.0144
+Prince George,BC,53.9171,-122.7497
+Brandon,MB,49.8485,-99.9501
+Prince Albert,SK,53.2033,-105.7531
+Moose Jaw,SK,50.3934,-105.5519
+Whitehorse,YT,60.7212,-135.0568
+Yellowknife,NT,62.4540,-114.3718
+Iqaluit,NU,63.7467,-68.5170
+Drummondville,QC,45.8838,-72.4843
+Granby,QC,45.4000,-72.7333
+Rimouski,QC,48.4489,-68.5230
+North Vancouver,BC,49.3200,-123.0724
+Niagara Falls,ON,43.0896,-79.0849
+Dartmouth,NS,44.6713,-63.5772
+Truro,NS,45.3650,-63.2800
+Corner Brook,NL,48.9500,-57.9500
+Cornwall,ON,45.0213,-74.7303
+Belleville,ON,44.1628,-77.3832
+North Bay,ON,46.3091,-79.4608
+Timmins,ON,48.4758,-81.3305
+Chilliwack,BC,49.1579,-121.9515
+Vernon,BC,50.2670,-119.2720
+Penticton,BC,49.4991,-119.5937
+St. Albert,AB,53.6305,-113.6256
+Sherwood Park,AB,53.5413,-113.2958
+Steinbach,MB,49.5258,-96.6839
+Repentigny,QC,45.7422,-73.4500
+Brossard,QC,45.4590,-73.4657
+Saint-Jean-sur-Richelieu,QC,45.3071,-73.2629
+"""
+
+PROVINCES = {
+    'AB': 'Alberta',
+    'BC': 'British Columbia',
+    'MB': 'Manitoba',
+    'NB': 'New Brunswick',
+    'NL': 'Newfoundland and Labrador',
+    'NS': 'Nova Scotia',
+    'NT': 'Northwest Territories',
+    'NU': 'Nunavut',
+    'ON': 'Ontario',
+    'PE': 'Prince Edward Island',
+    'QC': 'Quebec',
+    'SK': 'Saskatchewan',
+    'YT': 'Yukon',
+}
+
+
+def normalize(value):
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char)).lower()
+    value = re.sub(r"['’]", '', value)
+    words = re.sub(r'[^a-z0-9]+', ' ', value).split()
+    return ' '.join({'saint': 'st', 'sainte': 'ste'}.get(word, word) for word in words)
+
+
+def province_codes():
+    codes = {normalize(code): code for code in PROVINCES}
+    codes.update({normalize(name): code for code, name in PROVINCES.items()})
+    codes.update({'pei': 'PE', 'nfld': 'NL', 'newfoundland': 'NL', 'que': 'QC', 'yukon territory': 'YT'})
+    return codes
+
+
+def gazetteer():
+    places = {}
+    for row in csv.DictReader(io.StringIO(GAZETTEER_CSV)):
+        coordinates = (float(row['latitude']), float(row['longitude']))
+        city = normalize(row['name'])
+        places.setdefault((city, row['province']), coordinates)
+        places.setdefault(city, coordinates)
+    return places
+
+
+def geocode(location, places, codes):
+    if not location:
+        return None
+    parts = [normalize(part) for part in location.split(',')]
+    parts = [part for part in parts if part]
+    if len(parts) > 1 and parts[-1] == 'canada':
+        parts.pop()
+    if not parts or len(parts) > 2:
+        return None
+
+    if len(parts) == 2:
+        province = codes.get(parts[1])
+        return places.get((parts[0], province)) if province else None
+    if parts[0] in places:
+        return places[parts[0]]
+    words = parts[0].split()
+    for size in range(len(words) - 1, 0, -1):
+        province = codes.get(' '.join(words[size:]))
+        if province:
+            return places.get((' '.join(words[:size]), province))
+    return None
+
+
+def geocode_locations(apps, schema_editor):
+    places, codes = gazetteer(), province_codes()
+    for name in ('Job', 'CompanyProfile'):
+        model = apps.get_model('jobs', name)
+        for location in model.objects.values_list('location', flat=True).distinct().order_by():
+            coordinates = geocode(location, places, codes)
+            if coordinates:
+                model.objects.filter(location=location).update(latitude=coordinates[0], longitude=coordinates[1])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyprofile',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='companyprofile',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['latitude', 'longitude'], name='job_lat_lon_idx'),
+        ),
+        migrations.RunPython(geocode_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_geocoded_locations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['max_salary'], name='job_max_salary_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import AbstractUser
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 # Custom user model extending Django's AbstractUser
@@ -9,7 +10,19 @@ class User(AbstractUser):
         ('employer', 'Employer'),
     )
     user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES)
-    
+
+    # Same interface as jobs.authentication.TokenUser, which reads these
+    # from the token's claims.
+    @cached_property
+    def employer_id(self):
+        employer = getattr(self, 'employer', None)
+        return employer.id if employer else None
+
+    @cached_property
+    def jobseeker_id(self):
+        jobseeker = getattr(self, 'jobseeker', None)
+        return jobseeker.id if jobseeker else None
+
 
 class JobSeeker(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)    
@@ -28,15 +41,28 @@ class JobSeekerProfile(models.Model):
     website = models.URLField(blank=True)
     linkedin = models.URLField(blank=True)
     location = models.CharField(max_length=255, blank=True)    
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Profile {self.id}"
 
 
+class ResumeQuerySet(models.QuerySet):
+    def for_serializer(self):
+        return self.prefetch_related(
+            'candidate_skills',
+            models.Prefetch('educations', queryset=Education.objects.select_related('level')),
+            'experiences',
+        )
+
+
 class Resume(models.Model):
     candidate_skills = models.ManyToManyField('CandidateSkill', blank=True, related_name='resumes')  
     educations = models.ManyToManyField('Education', blank=True, related_name='resumes')  
     experiences = models.ManyToManyField('Experience', blank=True, related_name='resumes')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ResumeQuerySet.as_manager()
 
     def __str__(self):
         return f"Resume for {self.jobseeker_resume.user.username}"
@@ -102,7 +128,11 @@ class CompanyProfile(models.Model):
     linkedin = models.URLField(blank=True)
     tiktok = models.URLField(blank=True)
     location = models.CharField(max_length=255, blank=True)
+    # Geocoded from location on save; see jobs.geo.
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     category = models.ForeignKey('Category', on_delete=models.SET_NULL, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Profile {self.id}"
@@ -130,11 +160,50 @@ class Skill(models.Model):
         return self.name
 
 
+class JobQuerySet(models.QuerySet):
+    def for_serializer(self, fields=None):
+        # Everything JobSerializer touches, in a fixed number of queries:
+        # one for jobs with employer and company profile joined in, one
+        # for the skill ids. Category, job type and education level are
+        # rendered from their FK columns and need no join.
+        #
+        # Given the serializer fields to be rendered, load only their
+        # columns, joins and prefetches instead.
+        if fields is None:
+            return self.select_related('employer__company_profile').prefetch_related(
+                models.Prefetch('skills', queryset=Skill.objects.only('id'))
+            )
+
+        # Keyset pagination seeks on date_posted and id.
+        columns = {'id', 'date_posted'}
+        concrete = {field.name for field in self.model._meta.concrete_fields}
+        related = set()
+        queryset = self
+        for name in fields:
+            if name == 'skills':
+                queryset = queryset.prefetch_related(models.Prefetch('skills', queryset=Skill.objects.only('id')))
+            elif name == 'employer_profile':
+                related.add('employer__company_profile')
+                columns.add('employer__company_name')
+                columns.update(f'employer__company_profile__{field.name}' for field in CompanyProfile._meta.concrete_fields)
+            elif name == 'company_name':
+                related.add('employer')
+                columns.add('employer__company_name')
+            elif name in concrete:
+                columns.add(name)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+
+
 class Job(models.Model):
     employer = models.ForeignKey(Employer, on_delete=models.CASCADE, related_name="jobs")
     title = models.CharField(max_length=255)
     description = models.TextField()
     location = models.CharField(max_length=255)
+    # Geocoded from location on save; see jobs.geo.
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     min_salary = models.DecimalField(max_digits=10, decimal_places=2)
     max_salary = models.DecimalField(max_digits=10, decimal_places=2)
     experience_level = models.CharField(max_length=50)
@@ -144,6 +213,18 @@ class Job(models.Model):
     job_type = models.ForeignKey(JobType, on_delete=models.SET_NULL, null=True)
     skills = models.ManyToManyField(Skill, blank=True)
     education_level = models.ForeignKey(EducationLevel, on_delete=models.SET_NULL, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employer', 'date_posted'], name='job_employer_posted_idx'),
+            models.Index(fields=['active', 'date_posted'], name='job_active_posted_idx'),
+            models.Index(fields=['min_salary', 'max_salary'], name='job_salary_idx'),
+            models.Index(fields=['max_salary'], name='job_max_salary_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='job_lat_lon_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -171,5 +252,71 @@ class Application(models.Model):
         return f'{self.jobseeker} applied to {self.job}'
 
     class Meta:
-        unique_together = ('jobseeker', 'job') 
+        unique_together = ('jobseeker', 'job')
+        indexes = [
+            models.Index(fields=['job', 'status', 'application_date'], name='application_job_status_idx'),
+            models.Index(fields=['jobseeker', 'application_date'], name='application_seeker_date_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'job_id' in instance.__dict__ and 'status' in instance.__dict__:
+            instance._counted = (instance.job_id, instance.status)
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Move this application between JobStatusCount rows in the same
+        # transaction as the write. Deletes are counted by a post_delete
+        # receiver and queryset updates by jobs.applications.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'job', 'job_id', 'status'} & set(update_fields):
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            if self._state.adding:
+                previous = None
+            elif hasattr(self, '_counted'):
+                previous = self._counted
+            else:
+                previous = Application.objects.filter(pk=self.pk).values_list('job_id', 'status').first()
+            super().save(*args, **kwargs)
+            current = (self.job_id, self.status)
+            if previous != current:
+                deltas = {current: 1}
+                if previous is not None:
+                    deltas[previous] = -1
+                JobStatusCount.objects.adjust(deltas)
+            self._counted = current
+
+
+class JobStatusCountQuerySet(models.QuerySet):
+    def adjust(self, deltas):
+        """Add ``{(job id, status): delta}`` to the counters, creating missing rows."""
+        for (job_id, status), delta in deltas.items():
+            if not delta:
+                continue
+            counter = self.filter(job_id=job_id, status=status)
+            if counter.update(count=models.F('count') + delta) or delta < 0:
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(job_id=job_id, status=status, count=delta)
+            except IntegrityError:
+                # Created concurrently since the UPDATE above.
+                counter.update(count=models.F('count') + delta)
+
+
+class JobStatusCount(models.Model):
+    """Number of applications to a job in each status, kept in step with Application."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='status_counts')
+    status = models.CharField(max_length=50, choices=Application.StatusChoices.choices)
+    count = models.IntegerField(default=0)
+
+    objects = JobStatusCountQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('job', 'status')
+
+    def __str__(self):
+        return f'{self.job}: {self.count} {self.status}'
 
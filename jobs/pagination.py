@@ -0,0 +1,235 @@
+import base64
+import datetime
+import decimal
+import json
+import math
+
+from django.core.exceptions import FieldDoesNotExist, FieldError, ValidationError
+from django.db.models import Field, Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+MIN_INTEGER, MAX_INTEGER = -2 ** 63, 2 ** 63 - 1
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on the full ordering key of the last row
+    seen, e.g. ``(date_posted, id)``, instead of using OFFSET. Every page
+    costs the same index range scan however deep the client has scrolled,
+    and no COUNT(*) is issued.
+
+    The ordering comes from the queryset if it is already ordered, otherwise
+    from ``view.ordering`` or ``self.ordering``. ``id`` is appended as a tie
+    breaker when the ordering does not include it.
+
+    A list of objects (e.g. rows scored in Python) may be passed instead of
+    a queryset; it is sorted and seeked in memory with the same cursors.
+
+    Cursor values are converted with the ``to_python()`` of the model field
+    they belong to; values of computed orderings (search rank, scores,
+    distances) must be numbers. A cursor that does not convert is answered
+    with 404, as a malformed one is.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+
+        position, reverse = self.decode_cursor(request, queryset)
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._flip(field) for field in ordering)
+
+        if isinstance(queryset, QuerySet):
+            queryset = queryset.order_by(*ordering)
+            if position is not None:
+                queryset = queryset.filter(self._seek_filter(ordering, position))
+            rows = list(queryset[:self.page_size + 1])
+        else:
+            rows = self._seek_list(queryset, ordering, position)[:self.page_size + 1]
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        ordering = ()
+        if isinstance(queryset, QuerySet):
+            ordering = tuple(queryset.query.order_by)
+        ordering = ordering or getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, row, reverse):
+        position = [self._encode_value(getattr(row, field.lstrip('-'))) for field in self.ordering]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, queryset=None):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                self._decode_value(self._ordering_field(queryset, field.lstrip('-')), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, OverflowError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def _ordering_field(queryset, name):
+        """The model field or annotation ordered on as ``name``, if known."""
+        if isinstance(queryset, QuerySet):
+            model = queryset.model
+            annotation = queryset.query.annotations.get(name)
+            if annotation is not None:
+                try:
+                    field = annotation.output_field
+                except FieldError:
+                    return None
+                # A bare Field (e.g. RawSQL's default) converts nothing.
+                return None if type(field) is Field else field
+        elif queryset and isinstance(queryset[0], Model):
+            model = type(queryset[0])
+        else:
+            return None
+        try:
+            return model._meta.get_field('id' if name == 'pk' else name)
+        except FieldDoesNotExist:
+            return None
+
+    @staticmethod
+    def _decode_value(field, value):
+        if field is not None:
+            value = field.to_python(value)
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(value)
+        if value is None or isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(value)
+        # Database integers are 64-bit; a larger one fails when bound.
+        if isinstance(value, int) and not MIN_INTEGER <= value <= MAX_INTEGER:
+            raise ValueError(value)
+        return value
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if isinstance(value, decimal.Decimal):
+            return str(value)
+        if hasattr(value, 'pk'):
+            return value.pk
+        return value
+
+    def _seek_list(self, rows, ordering, position):
+        rows = list(rows)
+        for field in reversed(ordering):
+            name = field.lstrip('-')
+            rows.sort(key=lambda row: getattr(row, name), reverse=field.startswith('-'))
+        if position is None:
+            return rows
+        for index, row in enumerate(rows):
+            if self._is_after(row, ordering, position):
+                return rows[index:]
+        return []
+
+    @staticmethod
+    def _is_after(row, ordering, position):
+        for field, value in zip(ordering, position):
+            current = getattr(row, field.lstrip('-'))
+            current = getattr(current, 'pk', current)
+            if current != value:
+                return current < value if field.startswith('-') else current > value
+        return False
+
+    @staticmethod
+    def _seek_filter(ordering, position):
+        # (a, b, c) > (x, y, z)  ==  a > x  OR  (a = x AND b > y)  OR  ...
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = '__lt' if field.startswith('-') else '__gt'
+            condition |= Q(**equal, **{name + lookup: value})
+            equal[name] = value
+        return condition
@@ -0,0 +1,197 @@
+import heapq
+import time
+
+from .indexes import RefreshingIndex
+from .models import Job, Skill, Resume
+
+
+PROFICIENCY_WEIGHTS = {
+    'basic': 1.0,
+    'intermediate': 2.0,
+    'advanced': 3.0,
+}
+MAX_PROFICIENCY_WEIGHT = max(PROFICIENCY_WEIGHTS.values())
+
+# Added to the score of a job whose education level matches one of the
+# candidate's educations.
+EDUCATION_WEIGHT = 0.25
+
+# Applicant ranking also credits work experience, up to EXPERIENCE_WEIGHT
+# once the candidate has EXPERIENCE_YEARS_CAP years.
+EXPERIENCE_WEIGHT = 0.25
+EXPERIENCE_YEARS_CAP = 5
+
+
+class JobSkillIndex(RefreshingIndex):
+    """
+    In-memory sparse job x skill matrix over active jobs, stored as posting
+    lists (skill id -> job ids) so a candidate's score vector is accumulated
+    by walking only the postings of the skills they have.
+
+    Built at startup and kept current as described in RefreshingIndex.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._job_skills = {}
+        self._job_education = {}
+        self._skill_jobs = {}
+        self._skill_ids_by_name = {}
+
+    def rebuild(self):
+        job_skills = {}
+        job_education = {}
+        for job_id, education_level_id in Job.objects.filter(active=True).values_list('id', 'education_level_id'):
+            job_skills[job_id] = set()
+            job_education[job_id] = education_level_id
+
+        skill_jobs = {}
+        through = Job.skills.through.objects.filter(job__active=True).values_list('job_id', 'skill_id')
+        for job_id, skill_id in through.iterator():
+            job_skills[job_id].add(skill_id)
+            skill_jobs.setdefault(skill_id, set()).add(job_id)
+
+        skill_ids_by_name = {}
+        for skill_id, name in Skill.objects.values_list('id', 'name'):
+            skill_ids_by_name.setdefault(name.casefold(), set()).add(skill_id)
+
+        with self._lock:
+            self._job_skills = job_skills
+            self._job_education = job_education
+            self._skill_jobs = skill_jobs
+            self._skill_ids_by_name = skill_ids_by_name
+            self._built_at = time.monotonic()
+
+    def update_job(self, job, skill_ids=None):
+        with self._lock:
+            if not job.active:
+                self.remove_job(job.pk)
+                return
+            if job.pk not in self._job_skills:
+                self._job_skills[job.pk] = set()
+                if skill_ids is None:
+                    skill_ids = job.skills.values_list('id', flat=True)
+                self.add_job_skills(job.pk, skill_ids)
+            self._job_education[job.pk] = job.education_level_id
+
+    def remove_job(self, job_id):
+        with self._lock:
+            for skill_id in self._job_skills.pop(job_id, ()):
+                self._skill_jobs.get(skill_id, set()).discard(job_id)
+            self._job_education.pop(job_id, None)
+
+    def add_job_skills(self, job_id, skill_ids):
+        with self._lock:
+            if job_id not in self._job_skills:
+                return
+            self._job_skills[job_id].update(skill_ids)
+            for skill_id in skill_ids:
+                self._skill_jobs.setdefault(skill_id, set()).add(job_id)
+
+    def remove_job_skills(self, job_id, skill_ids=None):
+        with self._lock:
+            current = self._job_skills.get(job_id)
+            if current is None:
+                return
+            skill_ids = set(current) if skill_ids is None else set(skill_ids)
+            current.difference_update(skill_ids)
+            for skill_id in skill_ids:
+                self._skill_jobs.get(skill_id, set()).discard(job_id)
+
+    def update_skill(self, skill):
+        with self._lock:
+            self.remove_skill(skill.pk, keep_postings=True)
+            self._skill_ids_by_name.setdefault(skill.name.casefold(), set()).add(skill.pk)
+
+    def remove_skill(self, skill_id, keep_postings=False):
+        with self._lock:
+            for ids in self._skill_ids_by_name.values():
+                ids.discard(skill_id)
+            if not keep_postings:
+                for job_id in self._skill_jobs.pop(skill_id, ()):
+                    self._job_skills.get(job_id, set()).discard(skill_id)
+
+    def skill_weights(self, candidate_skills):
+        """Map ``(name, proficiency)`` pairs onto skill ids and weights."""
+        self.ensure_built()
+        weights = {}
+        with self._lock:
+            for name, proficiency in candidate_skills:
+                weight = PROFICIENCY_WEIGHTS.get(proficiency, 1.0)
+                for skill_id in self._skill_ids_by_name.get(name.strip().casefold(), ()):
+                    weights[skill_id] = max(weights.get(skill_id, 0.0), weight)
+        return weights
+
+    def recommend(self, skill_weights, education_level_ids=(), exclude=(), limit=20):
+        """
+        Return up to ``limit`` ``(job_id, score)`` pairs, best first.
+
+        Only jobs sharing at least one skill with the candidate are scored.
+        The score is the proficiency-weighted share of the job's skills the
+        candidate has, in [0, 1], plus EDUCATION_WEIGHT when the job's
+        education level matches one of the candidate's.
+        """
+        self.ensure_built()
+        scores = {}
+        with self._lock:
+            for skill_id, weight in skill_weights.items():
+                for job_id in self._skill_jobs.get(skill_id, ()):
+                    scores[job_id] = scores.get(job_id, 0.0) + weight
+            education_level_ids = set(education_level_ids) - {None}
+            for job_id, total in scores.items():
+                score = total / (MAX_PROFICIENCY_WEIGHT * len(self._job_skills[job_id]))
+                if self._job_education.get(job_id) in education_level_ids:
+                    score += EDUCATION_WEIGHT
+                scores[job_id] = score
+
+        for job_id in exclude:
+            scores.pop(job_id, None)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return [(job_id, round(score, 4)) for job_id, score in best]
+
+
+job_skill_index = JobSkillIndex()
+
+
+def score_applications(job, applications):
+    """
+    Set ``match_score`` on each application for ``job`` and return them.
+
+    Resume data for all applicants is loaded in three queries (skills,
+    education levels, experiences) regardless of how many there are.
+    """
+    applications = list(applications)
+    resume_ids = {application.jobseeker.resume_id for application in applications} - {None}
+    job_skills = {name.casefold() for name in job.skills.values_list('name', flat=True)}
+
+    skill_weights = {}
+    skills = Resume.candidate_skills.through.objects.filter(resume_id__in=resume_ids).values_list(
+        'resume_id', 'candidateskill__name', 'candidateskill__proficiency')
+    for resume_id, name, proficiency in skills:
+        name = name.strip().casefold()
+        if name in job_skills:
+            weights = skill_weights.setdefault(resume_id, {})
+            weights[name] = max(weights.get(name, 0.0), PROFICIENCY_WEIGHTS.get(proficiency, 1.0))
+
+    education_matches = set(Resume.educations.through.objects.filter(
+        resume_id__in=resume_ids, education__level_id=job.education_level_id,
+    ).values_list('resume_id', flat=True)) if job.education_level_id else set()
+
+    experience_days = {}
+    experiences = Resume.experiences.through.objects.filter(resume_id__in=resume_ids).values_list(
+        'resume_id', 'experience__start_date', 'experience__end_date')
+    for resume_id, start_date, end_date in experiences:
+        days = max((end_date - start_date).days, 0)
+        experience_days[resume_id] = experience_days.get(resume_id, 0) + days
+
+    for application in applications:
+        resume_id = application.jobseeker.resume_id
+        score = 0.0
+        if job_skills:
+            score += sum(skill_weights.get(resume_id, {}).values()) / (MAX_PROFICIENCY_WEIGHT * len(job_skills))
+        if resume_id in education_matches:
+            score += EDUCATION_WEIGHT
+        years = experience_days.get(resume_id, 0) / 365.25
+        score += EXPERIENCE_WEIGHT * min(years / EXPERIENCE_YEARS_CAP, 1.0)
+        application.match_score = round(score, 4)
+    return applications
@@ -0,0 +1,32 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    For the plain dicts, lists, strings, numbers and booleans the serializers
+    produce, the output is byte for byte what JSONRenderer writes: compact
+    separators, UTF-8 rather than \\u escapes, and U+2028/U+2029 escaped.
+    Anything orjson would encode differently (datetimes, Decimals, lazy
+    strings, non-string keys, indented output) goes through JSONRenderer.
+    Floats are the exception: both write the shortest repr, but below 1e-4
+    or from 1e16 up orjson writes ``1e-05`` as ``1e-5``. Only use this
+    renderer for data whose floats are rounded to at most four places
+    (``distance_km``, ``match_score``) and are below 1e16.
+    """
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, option=self.options)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
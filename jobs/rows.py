@@ -0,0 +1,176 @@
+"""
+Read-only serializers over ``values_list()`` rows.
+
+DRF's ModelSerializer resolves every field through ``get_attribute`` and
+``to_representation`` on a model instance, per row. For the hot list
+endpoints, the serializers here select only the needed columns as tuples,
+and build each dict with a field -> (tuple index, converter) table compiled
+once per request. The output matches JobSerializer and ApplicationSerializer
+key for key and value for value, so the rendered bytes are identical.
+"""
+import decimal
+
+from django.utils import timezone
+
+from .models import Job, Skill, CompanyProfile
+from .serializers import JobSerializer, CompanyProfileSerializer
+
+
+def decimal_string(places):
+    """DRF DecimalField output: quantized and formatted without an exponent."""
+    exponent = decimal.Decimal(1).scaleb(-places)
+
+    def convert(value):
+        return f'{value.quantize(exponent):f}'
+    return convert
+
+
+def datetime_format(fmt):
+    """DRF DateTimeField output with ``format=fmt``, in the current time zone."""
+    def convert(value):
+        return timezone.localtime(value).strftime(fmt)
+    return convert
+
+
+def datetime_iso(value):
+    """DRF DateTimeField output with the default ISO 8601 format."""
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def compile_row(table):
+    """
+    Return a function turning a row tuple into a dict, from a list of
+    ``(key, index, converter)``. As with DRF, None is never converted.
+    """
+    def to_dict(row):
+        result = {}
+        for key, index, convert in table:
+            value = row[index]
+            result[key] = value if convert is None or value is None else convert(value)
+        return result
+    return to_dict
+
+
+class RowSerializer:
+    """
+    Base class. Subclasses add columns with ``column()`` in ``__init__``
+    and implement ``to_representation(rows)``.
+    """
+
+    def __init__(self):
+        self.columns = []
+
+    def column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return self.columns.index(path)
+
+    def rows(self, queryset, ordering=()):
+        """
+        ``queryset`` as named row tuples. The columns of its ordering, or of
+        ``ordering`` if it has none yet, are included for keyset pagination.
+        """
+        for field in queryset.query.order_by or ordering:
+            self.column(field.lstrip('-'))
+        return queryset.values_list(*self.columns, named=True)
+
+
+JOB_DATE_FORMAT = JobSerializer._declared_fields['date_posted'].format
+JOB_PLAIN_FIELDS = {'id', 'title', 'description', 'experience_level', 'location', 'active'}
+JOB_RELATED_FIELDS = {'category', 'job_type', 'education_level'}
+JOB_DECIMAL_FIELDS = {'min_salary', 'max_salary'}
+
+
+class JobRowSerializer(RowSerializer):
+    """Same output as ``JobSerializer(fields=fields)``."""
+
+    def __init__(self, fields=None):
+        super().__init__()
+        # In declaration order, as the serializer renders them.
+        self.fields = tuple(name for name in JobSerializer.Meta.fields if fields is None or name in fields)
+        table = []
+        self.profile = None
+        for name in self.fields:
+            if name in JOB_PLAIN_FIELDS or name in JOB_RELATED_FIELDS:
+                table.append((name, self.column(name), None))
+            elif name in JOB_DECIMAL_FIELDS:
+                places = Job._meta.get_field(name).decimal_places
+                table.append((name, self.column(name), decimal_string(places)))
+            elif name == 'date_posted':
+                table.append((name, self.column(name), datetime_format(JOB_DATE_FORMAT)))
+            elif name == 'company_name':
+                table.append((name, self.column('employer__company_name'), None))
+            elif name in ('skills', 'employer_profile'):
+                # Filled in per page by to_representation().
+                table.append((name, self.column('id'), None))
+        self.id_index = self.column('id')
+        if 'employer_profile' in self.fields:
+            self.profile_id_index = self.column('employer__company_profile__id')
+            self.profile = compile_row(self._profile_table())
+        self.to_dict = compile_row(table)
+
+    def _profile_table(self):
+        table = []
+        for name in CompanyProfileSerializer.Meta.fields:
+            if name == 'company_name':
+                table.append((name, self.column('employer__company_name'), None))
+            else:
+                field = CompanyProfile._meta.get_field(name)
+                path = f'employer__company_profile__{field.name}'
+                table.append((name, self.column(path), None))
+        return table
+
+    def to_representation(self, rows):
+        data = [self.to_dict(row) for row in rows]
+        if 'skills' in self.fields and rows:
+            # Same query, and so the same order, as the skills prefetch in
+            # Job.objects.for_serializer().
+            skills = {row[self.id_index]: [] for row in rows}
+            pairs = Skill.objects.filter(job__in=list(skills)).values_list('job__id', 'id')
+            for job_id, skill_id in pairs:
+                skills[job_id].append(skill_id)
+            for item, row in zip(data, rows):
+                item['skills'] = skills[row[self.id_index]]
+        if self.profile is not None:
+            for item, row in zip(data, rows):
+                item['employer_profile'] = None if row[self.profile_id_index] is None else self.profile(row)
+        return data
+
+
+class ApplicationRowSerializer(RowSerializer):
+    """Same output as ``ApplicationSerializer``."""
+
+    def __init__(self):
+        super().__init__()
+        job = compile_row([
+            ('id', self.column('job__id'), None),
+            ('title', self.column('job__title'), None),
+            ('location', self.column('job__location'), None),
+            ('company_name', self.column('job__employer__company_name'), None),
+        ])
+        user = compile_row([
+            ('first_name', self.column('jobseeker__user__first_name'), None),
+            ('last_name', self.column('jobseeker__user__last_name'), None),
+        ])
+        row_dict = compile_row([
+            ('id', self.column('id'), None),
+            ('job', self.column('id'), None),
+            ('jobseeker', self.column('id'), None),
+            ('jobseeker_profile_id', self.column('jobseeker__jobseeker_profile'), None),
+            ('application_date', self.column('application_date'), datetime_iso),
+            ('status', self.column('status'), None),
+        ])
+        jobseeker_index = self.column('jobseeker__id')
+
+        def to_dict(row):
+            item = row_dict(row)
+            item['job'] = job(row)
+            item['jobseeker'] = {'id': row[jobseeker_index], 'user': user(row)}
+            return item
+        self.to_dict = to_dict
+
+    def to_representation(self, rows):
+        return [self.to_dict(row) for row in rows]
@@ -0,0 +1,339 @@
+import decimal
+
+from django.db import connection
+from django.db.models import Q, Case, When, Value, CharField, Count, Exists, FloatField, OuterRef
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+
+from .geo import parse_near, nearby_rows, nearby_representation, within_radius
+from .models import Job, Employer, User, Category, JobType, Skill, EducationLevel
+
+
+FTS_TABLE = 'jobs_job_fts'
+
+# The trigram tokenizer can only match terms of at least three characters.
+MIN_FTS_TERM_LENGTH = 3
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def _index_select_sql():
+    job = Job._meta.db_table
+    through = Job.skills.through._meta.db_table
+    return f"""
+        SELECT j.id, j.title, j.description, j.location,
+               CAST(j.min_salary AS TEXT), CAST(j.max_salary AS TEXT),
+               j.experience_level, u.first_name, u.last_name,
+               c.name, t.name,
+               (SELECT group_concat(s.name, char(10))
+                  FROM {through} js
+                  JOIN {Skill._meta.db_table} s ON s.id = js.skill_id
+                 WHERE js.job_id = j.id),
+               e.name
+          FROM {job} j
+          JOIN {Employer._meta.db_table} emp ON emp.id = j.employer_id
+          JOIN {User._meta.db_table} u ON u.id = emp.user_id
+          LEFT JOIN {Category._meta.db_table} c ON c.id = j.category_id
+          LEFT JOIN {JobType._meta.db_table} t ON t.id = j.job_type_id
+          LEFT JOIN {EducationLevel._meta.db_table} e ON e.id = j.education_level_id
+    """
+
+
+INSERT_SQL = f"""
+    INSERT INTO {FTS_TABLE} (rowid, title, description, location, min_salary, max_salary,
+                             experience_level, first_name, last_name, category, job_type,
+                             skills, education_level)
+"""
+
+
+def reindex_jobs(job_ids):
+    """Refresh the search index rows for the given job ids."""
+    job_ids = list(set(job_ids))
+    if not job_ids or not fts_enabled():
+        return
+    placeholders = ', '.join(['%s'] * len(job_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", job_ids)
+        cursor.execute(
+            INSERT_SQL + _index_select_sql() + f" WHERE j.id IN ({placeholders})",
+            job_ids,
+        )
+
+
+def remove_jobs(job_ids):
+    job_ids = list(set(job_ids))
+    if not job_ids or not fts_enabled():
+        return
+    placeholders = ', '.join(['%s'] * len(job_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", job_ids)
+
+
+def rebuild_index():
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(INSERT_SQL + _index_select_sql())
+
+
+# Index columns a text search matches. The salaries are indexed too but left
+# out: as text, "50" would match 150000.50. Use salary_min/salary_max.
+MATCH_COLUMNS = (
+    'title', 'description', 'location', 'experience_level', 'first_name', 'last_name',
+    'category', 'job_type', 'skills', 'education_level',
+)
+
+
+def _match_expression(search_term):
+    return '{{{}}} : "{}"'.format(' '.join(MATCH_COLUMNS), search_term.replace('"', '""'))
+
+
+def legacy_search_filter(search_term):
+    return (
+        Q(title__icontains=search_term) |
+        Q(description__icontains=search_term) |
+        Q(location__icontains=search_term) |
+        Q(experience_level__icontains=search_term) |
+        Q(employer__user__first_name__icontains=search_term) |
+        Q(employer__user__last_name__icontains=search_term) |
+        Q(category__name__icontains=search_term) |
+        Q(job_type__name__icontains=search_term) |
+        # EXISTS rather than a join on skills, which would repeat a job once
+        # per matching skill and need DISTINCT.
+        Q(Exists(Skill.objects.filter(job=OuterRef('pk'), name__icontains=search_term))) |
+        Q(education_level__name__icontains=search_term)
+    )
+
+
+def search_jobs(queryset, search_term):
+    """
+    Filter ``queryset`` down to jobs matching ``search_term``.
+
+    On SQLite the lookup goes through the FTS5 trigram index, which matches
+    substrings case-insensitively like the ``icontains`` filters it replaces,
+    and annotates each job with a ``search_rank`` (lower is more relevant).
+    Other backends, and terms too short for trigrams, use the plain filters.
+    """
+    if not fts_enabled() or len(search_term) < MIN_FTS_TERM_LENGTH:
+        return queryset.filter(legacy_search_filter(search_term))
+
+    # Join the index rather than filtering with IN (...) and ranking with a
+    # correlated subquery: the subquery re-runs MATCH for every row.
+    match = _match_expression(search_term)
+    job_table = Job._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {job_table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    ).annotate(
+        search_rank=RawSQL(f'{FTS_TABLE}.rank', (), output_field=FloatField()),
+    ).order_by('search_rank', '-id')
+
+
+SALARY_BUCKETS = (0, 30000, 50000, 75000, 100000, 150000)
+
+
+def _salary_bucket_labels():
+    labels = []
+    for low, high in zip(SALARY_BUCKETS, SALARY_BUCKETS[1:]):
+        labels.append((low, high, f'{low}-{high}'))
+    labels.append((SALARY_BUCKETS[-1], None, f'{SALARY_BUCKETS[-1]}+'))
+    return labels
+
+
+SALARY_BUCKET_RANGES = {label: (low, high) for low, high, label in _salary_bucket_labels()}
+
+
+def salary_bucket_expression():
+    whens = [
+        When(min_salary__lt=high, then=Value(label))
+        for low, high, label in _salary_bucket_labels() if high is not None
+    ]
+    return Case(*whens, default=Value(f'{SALARY_BUCKETS[-1]}+'), output_field=CharField())
+
+
+# Facet name -> column grouped on. Salary is bucketed on min_salary using
+# SALARY_BUCKETS.
+FACET_FIELDS = {
+    'category': 'category_id',
+    'job_type': 'job_type_id',
+    'education_level': 'education_level_id',
+    'experience_level': 'experience_level',
+    'salary': 'salary_bucket',
+}
+
+ID_FILTERS = ('category', 'job_type', 'education_level')
+
+SKILL_MATCH_MODES = ('any', 'all')
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+# Ids are 64-bit integers in the database; SQLite cannot bind larger ones.
+MIN_ID, MAX_ID = -2 ** 63, 2 ** 63 - 1
+
+
+def _ids(params, name):
+    try:
+        ids = [int(item) for item in _split(params[name])]
+    except ValueError:
+        ids = None
+    if ids is None or not all(MIN_ID <= value <= MAX_ID for value in ids):
+        raise ValidationError({name: 'Expected a comma separated list of ids.'})
+    return ids
+
+
+def _amount(params, name):
+    try:
+        value = decimal.Decimal(params[name])
+    except decimal.InvalidOperation:
+        raise ValidationError({name: 'Expected a number.'})
+    if not value.is_finite() or value < 0:
+        raise ValidationError({name: 'Expected a number of at least 0.'})
+    return value
+
+
+def skills_filter(skill_ids, match='any'):
+    """
+    Jobs with any (or all) of ``skill_ids``, as EXISTS subqueries on the
+    job/skill table's (job_id, skill_id) unique index. Unlike a join, they
+    never return a job twice, so no DISTINCT is needed.
+    """
+    Through = Job.skills.through
+    if match == 'all':
+        condition = Q()
+        for skill_id in set(skill_ids):
+            condition &= Q(Exists(Through.objects.filter(job_id=OuterRef('pk'), skill_id=skill_id)))
+        return condition
+    return Q(Exists(Through.objects.filter(job_id=OuterRef('pk'), skill_id__in=skill_ids)))
+
+
+def filter_jobs(queryset, params):
+    """
+    Apply the structured filter parameters of the search-jobs endpoint.
+
+    Each one compiles to a predicate on an indexed column: foreign key ids,
+    salary ranges on (min_salary, max_salary) and max_salary, and skills as
+    EXISTS on the job/skill table.
+    """
+    for name in ID_FILTERS:
+        if params.get(name):
+            queryset = queryset.filter(**{f'{name}_id__in': _ids(params, name)})
+
+    if params.get('skills'):
+        match = params.get('skills_match') or 'any'
+        if match not in SKILL_MATCH_MODES:
+            raise ValidationError({'skills_match': 'Expected any or all.'})
+        queryset = queryset.filter(skills_filter(_ids(params, 'skills'), match))
+
+    # Jobs whose advertised range overlaps [salary_min, salary_max].
+    salary_min = _amount(params, 'salary_min') if params.get('salary_min') else None
+    salary_max = _amount(params, 'salary_max') if params.get('salary_max') else None
+    if salary_min is not None and salary_max is not None and salary_min > salary_max:
+        raise ValidationError({'salary_max': 'Must not be less than salary_min.'})
+    if salary_max is not None:
+        queryset = queryset.filter(min_salary__lte=salary_max)
+    if salary_min is not None:
+        queryset = queryset.filter(max_salary__gte=salary_min)
+
+    if params.get('active'):
+        value = params['active'].lower()
+        if value not in ('true', 'false'):
+            raise ValidationError({'active': 'Expected true or false.'})
+        # active=True compiles to a bare "WHERE active" on SQLite, which
+        # cannot use the (active, date_posted) index; IN (1) can.
+        queryset = queryset.filter(active__in=[value == 'true'])
+
+    if params.get('experience_level'):
+        queryset = queryset.filter(experience_level__in=_split(params['experience_level']))
+
+    if params.get('salary'):
+        condition = Q()
+        for label in _split(params['salary']):
+            if label not in SALARY_BUCKET_RANGES:
+                raise ValidationError({'salary': f'Unknown salary bucket "{label}".'})
+            low, high = SALARY_BUCKET_RANGES[label]
+            bucket = Q(min_salary__gte=low)
+            if high is not None:
+                bucket &= Q(min_salary__lt=high)
+            condition |= bucket
+        queryset = queryset.filter(condition)
+
+    return queryset
+
+
+def parse_facets(value):
+    names = list(dict.fromkeys(_split(value)))
+    unknown = [name for name in names if name not in FACET_FIELDS]
+    if unknown:
+        raise ValidationError({'facets': f'Unknown facets: {", ".join(unknown)}.'})
+    return names
+
+
+def job_facets(queryset, names):
+    """
+    Count jobs per value of each requested facet in a single query.
+
+    The query groups on the combination of all requested columns; each
+    facet's counts are then summed out of those rows. Every job falls into
+    exactly one combination, so the sums are exact.
+    """
+    if not names:
+        return {}
+    columns = [FACET_FIELDS[name] for name in names]
+    queryset = queryset.order_by()
+    if 'salary' in names:
+        queryset = queryset.annotate(salary_bucket=salary_bucket_expression())
+    rows = queryset.values(*columns).annotate(total=Count('id', distinct=True))
+
+    counts = {name: {} for name in names}
+    for row in rows:
+        for name, column in zip(names, columns):
+            value = row[column]
+            counts[name][value] = counts[name].get(value, 0) + row['total']
+
+    return {
+        name: [
+            {'value': value, 'count': count}
+            for value, count in sorted(values.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+        for name, values in counts.items()
+    }
+
+
+class JobSearch:
+    """
+    One request to the search-jobs endpoints, shared by the sync and async
+    views. The filter, ``q``, ``near`` and ``facets`` parameters are parsed
+    up front, without queries; ``page()`` and ``facet_counts()`` then run
+    their own queries, so the async view can await them together.
+    """
+    ordering = ('-date_posted', '-id')
+
+    def __init__(self, params):
+        self.facets = parse_facets(params.get('facets', ''))
+        self.near = parse_near(params)
+        queryset = filter_jobs(Job.objects.order_by(*self.ordering), params)
+        if params.get('q'):
+            queryset = search_jobs(queryset, params['q'])
+        self.queryset = queryset
+
+    def page(self, paginator, request, serializer):
+        """The current page, serialized by ``serializer`` (a JobRowSerializer)."""
+        if self.near:
+            # Nearest first, whatever the search would order by otherwise.
+            page = paginator.paginate_queryset(nearby_rows(serializer, self.queryset, *self.near), request)
+            return nearby_representation(serializer, page, *self.near[:2])
+        page = paginator.paginate_queryset(serializer.rows(self.queryset), request)
+        return serializer.to_representation(page)
+
+    def facet_counts(self):
+        queryset = self.queryset
+        if self.near:
+            queryset = within_radius(queryset, *self.near)
+        return job_facets(queryset, self.facets)
@@ -1,8 +1,22 @@
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from django.db import models, transaction
+from django.utils import timezone
 from .models import User, JobSeeker, Employer, Job, Category, JobType, Skill, EducationLevel, CompanyProfile, JobSeekerProfile, Resume, CandidateSkill, Education, Experience, Application
+from .bulk import bulk_create_with_ids
+from .cache import bump_lookup_version
+from .tokens import RefreshToken
 import logging
 
 
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     company_name = serializers.CharField(allow_blank=True, required=False)
 
@@ -100,11 +114,23 @@ class CompanyProfileSerializer(serializers.ModelSerializer):
 
 
     def get_company_name(self, obj):
-        employer = Employer.objects.filter(company_profile=obj).first()
+        # Reverse one-to-one; already cached when the profile was loaded
+        # through employer__company_profile.
+        employer = getattr(obj, 'employer', None)
         return employer.company_name if employer else None
 
 
-class JobSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Render only the fields named in ``fields``, if given."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class JobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
     job_type = serializers.PrimaryKeyRelatedField(queryset=JobType.objects.all())
     skills = serializers.PrimaryKeyRelatedField(many=True, queryset=Skill.objects.all())
@@ -113,10 +139,11 @@ class JobSerializer(serializers.ModelSerializer):
     active = serializers.BooleanField(read_only=True)
     id = serializers.ReadOnlyField()
     employer_profile = CompanyProfileSerializer(source='employer.company_profile', read_only=True)
+    company_name = serializers.CharField(source='employer.company_name', read_only=True)
 
     class Meta:
         model = Job
-        fields = ['id','title', 'description', 'experience_level', 'min_salary', 'max_salary', 'location', 'category', 'job_type', 'skills', 'education_level','date_posted','active','employer_profile']
+        fields = ['id','title', 'description', 'experience_level', 'min_salary', 'max_salary', 'location', 'category', 'job_type', 'skills', 'education_level','date_posted','active','employer_profile','company_name']
 
     def validate(self, data):
         if data['min_salary'] > data['max_salary']:
@@ -126,12 +153,49 @@ class JobSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         skills_data = validated_data.pop('skills', [])
         request = self.context.get('request', None)
-        employer = Employer.objects.get(user=request.user)
-        job = Job.objects.create(employer=employer, **validated_data)
+        employer_id = getattr(request.user, 'employer_id', None)
+        if employer_id is None:
+            raise serializers.ValidationError("Only employers can create jobs.")
+        job = Job.objects.create(employer_id=employer_id, **validated_data)
         job.skills.set(skills_data)
         return job
 
 
+class EmployerJobSerializer(JobSerializer):
+    # Read from the prefetched JobStatusCount rows; statuses with no
+    # applications are reported as 0.
+    applicant_counts = serializers.SerializerMethodField()
+
+    class Meta(JobSerializer.Meta):
+        fields = JobSerializer.Meta.fields + ['applicant_counts']
+
+    def get_applicant_counts(self, obj):
+        counts = dict.fromkeys(Application.StatusChoices.values, 0)
+        for counter in obj.status_counts.all():
+            counts[counter.status] = counter.count
+        return counts
+
+
+class JobImportRowSerializer(serializers.Serializer):
+    # One row of a bulk job import. Related objects are given by id or name
+    # and resolved per chunk by jobs.imports, not per row here.
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField()
+    location = serializers.CharField(max_length=255)
+    min_salary = serializers.DecimalField(max_digits=10, decimal_places=2)
+    max_salary = serializers.DecimalField(max_digits=10, decimal_places=2)
+    experience_level = serializers.CharField(max_length=50)
+    category = serializers.CharField()
+    job_type = serializers.CharField()
+    education_level = serializers.CharField()
+    skills = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+
+    def validate(self, data):
+        if data['min_salary'] > data['max_salary']:
+            raise serializers.ValidationError("Minimum salary can't be greater than maximum salary")
+        return data
+
+
 class JobseekerSerializer(serializers.ModelSerializer):
     user = serializers.SerializerMethodField()
 
@@ -196,72 +260,97 @@ class ResumeSerializer(serializers.ModelSerializer):
         fields = ['id', 'candidate_skills', 'educations', 'experiences']
 
     def update(self, instance, validated_data):
-
-        # Handle candidate_skills
-        candidate_skills_data = validated_data.pop('candidate_skills', [])
-        instance.candidate_skills.clear()
-
-        for skill_data in candidate_skills_data:
-            skill_id = skill_data.get('id')
-            if skill_id:
-                
-                skill = CandidateSkill.objects.get(id=skill_id)
-                for attr, value in skill_data.items():
-                    setattr(skill, attr, value)
-                skill.save()
-                instance.candidate_skills.add(skill)
-            else:
-                
-                skill = CandidateSkill.objects.create(**skill_data)
-                instance.candidate_skills.add(skill)
-
-        # Handle educations
-        educations_data = validated_data.pop('educations', [])
-        instance.educations.clear()
+        with transaction.atomic():
+            self._sync_items(instance.candidate_skills, CandidateSkill,
+                             validated_data.pop('candidate_skills', []))
+
+            educations_data = validated_data.pop('educations', [])
+            self._resolve_education_levels(educations_data)
+            self._sync_items(instance.educations, Education, educations_data)
+
+            self._sync_items(instance.experiences, Experience,
+                             validated_data.pop('experiences', []))
+            # The items live in other tables; mark the resume itself changed
+            # for conditional GETs.
+            Resume.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+
+        return Resume.objects.for_serializer().get(pk=instance.pk)
+
+    def _sync_items(self, manager, model, items_data):
+        # Diff the incoming rows against the ones linked to this resume:
+        # changed rows are written with one bulk_update, new rows with one
+        # bulk_create, and links are added or removed in bulk. Ids that are
+        # not linked to this resume are treated as new rows.
+        existing = {item.id: item for item in manager.all()}
+        keep_ids = set()
+        changed, created, changed_fields = [], [], set()
+
+        for item_data in items_data:
+            item_data = dict(item_data)
+            item = existing.get(item_data.pop('id', None))
+            if item is None:
+                created.append(model(**item_data))
+                continue
+            keep_ids.add(item.id)
+            item_changed = False
+            for attr, value in item_data.items():
+                if self._field_value(item, attr) != self._field_value(value):
+                    setattr(item, attr, value)
+                    changed_fields.add(attr)
+                    item_changed = True
+            if item_changed:
+                changed.append(item)
+
+        if changed:
+            model.objects.bulk_update(changed, changed_fields)
+        removed_ids = set(existing) - keep_ids
+        if removed_ids:
+            manager.remove(*removed_ids)
+        if created:
+            bulk_create_with_ids(model, created)
+            manager.add(*created)
+
+    @staticmethod
+    def _field_value(obj, attr=None):
+        # Compare foreign keys by id so diffing never loads related rows.
+        if attr is None:
+            return obj.pk if isinstance(obj, models.Model) else obj
+        field = obj._meta.get_field(attr)
+        return getattr(obj, field.attname if field.is_relation else attr)
+
+    def _resolve_education_levels(self, educations_data):
+        # Replaces each nested level dict with an EducationLevel instance,
+        # matching by id or else get_or_create semantics on its fields, in
+        # a fixed number of queries.
+        levels_data = [data['level'] for data in educations_data if data.get('level')]
+        level_ids = {level['id'] for level in levels_data if level.get('id')}
+        by_id = EducationLevel.objects.in_bulk(level_ids)
+        missing = level_ids - set(by_id)
+        if missing:
+            raise serializers.ValidationError({'educations': f'Unknown education level ids: {sorted(missing)}'})
+
+        def key(level):
+            return level.get('name'), level.get('description', '')
+
+        lookups = {key(level) for level in levels_data if not level.get('id')}
+        by_fields = {}
+        if lookups:
+            for level in EducationLevel.objects.filter(name__in={name for name, _ in lookups}).order_by('id'):
+                by_fields.setdefault((level.name, level.description), level)
+            new_levels = [EducationLevel(name=name, description=description)
+                          for name, description in lookups if (name, description) not in by_fields]
+            for level in bulk_create_with_ids(EducationLevel, new_levels):
+                by_fields[(level.name, level.description)] = level
+            if new_levels:
+                bump_lookup_version(EducationLevel)
 
         for education_data in educations_data:
-            education_id = education_data.get('id')
-           
-            # Handle level
             level_data = education_data.pop('level', None)
             if level_data:
-                level_id = level_data.get('id')
-                
-                if level_id:
-                    level_instance = EducationLevel.objects.get(id=level_id)
+                if level_data.get('id'):
+                    education_data['level'] = by_id[level_data['id']]
                 else:
-                    level_instance, _ = EducationLevel.objects.get_or_create(**level_data)
-                education_data['level'] = level_instance
-
-            if education_id:
-                education = Education.objects.get(id=education_id)
-                for attr, value in education_data.items():
-                    setattr(education, attr, value)
-                education.save()
-                instance.educations.add(education)
-            else:
-                education = Education.objects.create(**education_data)
-                instance.educations.add(education)
-
-        # Handle experiences
-        experiences_data = validated_data.pop('experiences', [])
-        instance.experiences.clear()
-
-        for experience_data in experiences_data:
-            experience_id = experience_data.get('id')
-            if experience_id:
-                experience = Experience.objects.get(id=experience_id)
-                for attr, value in experience_data.items():
-                    setattr(experience, attr, value)
-                experience.save()
-                instance.experiences.add(experience)
-            else:
-                experience = Experience.objects.create(**experience_data)
-                instance.experiences.add(experience)
-
-        instance.save()
-
-        return instance
+                    education_data['level'] = by_fields[key(level_data)]
 
 
 class ApplicationSerializer(serializers.ModelSerializer):
@@ -282,11 +371,33 @@ class ApplicationSerializer(serializers.ModelSerializer):
         }
 
     def get_jobseeker_profile_id(self, obj):
-        try:
-            return obj.jobseeker.jobseeker_profile.id
-        except AttributeError:
-            return None
+        return obj.jobseeker.jobseeker_profile_id
+
+
+class ApplicationStatusChangeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Application.StatusChoices.choices)
 
 
+class ApplicationFilterSerializer(serializers.Serializer):
+    job = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Application.StatusChoices.choices, required=False)
 
 
+class ApplicationBulkStatusSerializer(serializers.Serializer):
+    # Either explicit (id, status) pairs, or a filter plus the status to move
+    # every matching application to.
+    updates = ApplicationStatusChangeSerializer(many=True, required=False, max_length=1000)
+    filter = ApplicationFilterSerializer(required=False)
+    status = serializers.ChoiceField(choices=Application.StatusChoices.choices, required=False)
+
+    def validate(self, data):
+        if 'updates' in data:
+            if 'filter' in data or 'status' in data:
+                raise serializers.ValidationError("Send either updates, or a filter and a status.")
+            ids = [item['id'] for item in data['updates']]
+            if len(ids) != len(set(ids)):
+                raise serializers.ValidationError("Each application may appear only once in updates.")
+        elif 'status' not in data:
+            raise serializers.ValidationError("Send either updates, or a filter and a status.")
+        return data
@@ -0,0 +1,290 @@
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .models import (
+    Job, User, Category, JobType, Skill, EducationLevel, Application, JobStatusCount,
+    Employer, JobSeeker, CompanyProfile, JobSeekerProfile, Resume,
+)
+from . import search
+from .autocomplete import autocomplete_index
+from .cache import bump_lookup_version
+from .geo import locate
+from .recommendations import job_skill_index
+from .tokens import revoked_tokens
+
+
+# Keep the job search index in sync with the fields it covers.
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, **kwargs):
+    search.reindex_jobs([instance.pk])
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    search.remove_jobs([instance.pk])
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def index_job_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        search.reindex_jobs([instance.pk])
+    elif action == 'pre_clear':
+        instance._search_job_ids = list(instance.job_set.values_list('id', flat=True))
+    elif action == 'post_clear':
+        search.reindex_jobs(getattr(instance, '_search_job_ids', []))
+    else:
+        search.reindex_jobs(pk_set or [])
+
+
+INDEXED_RELATED_FIELDS = {'name', 'first_name', 'last_name'}
+
+
+def _related_job_ids(instance):
+    if isinstance(instance, User):
+        return Job.objects.filter(employer__user=instance).values_list('id', flat=True)
+    return instance.job_set.values_list('id', flat=True)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=JobType)
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=EducationLevel)
+def index_related_jobs(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields and not INDEXED_RELATED_FIELDS & set(update_fields):
+        return
+    search.reindex_jobs(_related_job_ids(instance))
+
+
+# Deleting a lookup row nulls out or drops the link before post_delete fires,
+# so remember the affected jobs while the link still exists.
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=JobType)
+@receiver(pre_delete, sender=Skill)
+@receiver(pre_delete, sender=EducationLevel)
+def remember_related_jobs(sender, instance, **kwargs):
+    instance._search_job_ids = list(_related_job_ids(instance))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=JobType)
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=EducationLevel)
+def reindex_related_jobs(sender, instance, **kwargs):
+    search.reindex_jobs(getattr(instance, '_search_job_ids', []))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=JobType)
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=EducationLevel)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=JobType)
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=EducationLevel)
+def invalidate_lookup_cache(sender, **kwargs):
+    bump_lookup_version(sender)
+
+
+# Keep the in-memory job x skill index used for recommendations current.
+# Nothing to do until a request has built it.
+
+@receiver(post_save, sender=Job)
+def update_recommendation_job(sender, instance, **kwargs):
+    if job_skill_index.is_built:
+        job_skill_index.update_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_recommendation_job(sender, instance, **kwargs):
+    if job_skill_index.is_built:
+        job_skill_index.remove_job(instance.pk)
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def update_recommendation_job_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if not job_skill_index.is_built:
+        return
+    if action == 'post_add':
+        if reverse:
+            for job_id in pk_set:
+                job_skill_index.add_job_skills(job_id, [instance.pk])
+        else:
+            job_skill_index.add_job_skills(instance.pk, pk_set)
+    elif action == 'post_remove':
+        if reverse:
+            for job_id in pk_set:
+                job_skill_index.remove_job_skills(job_id, [instance.pk])
+        else:
+            job_skill_index.remove_job_skills(instance.pk, pk_set)
+    elif action == 'post_clear':
+        if reverse:
+            job_skill_index.remove_skill(instance.pk)
+            job_skill_index.update_skill(instance)
+        else:
+            job_skill_index.remove_job_skills(instance.pk)
+
+
+@receiver(post_save, sender=Skill)
+def update_recommendation_skill(sender, instance, **kwargs):
+    if job_skill_index.is_built:
+        job_skill_index.update_skill(instance)
+
+
+@receiver(post_delete, sender=Skill)
+def remove_recommendation_skill(sender, instance, **kwargs):
+    if job_skill_index.is_built:
+        job_skill_index.remove_skill(instance.pk)
+
+
+# Geocode locations on save. Saves limited with update_fields leave the
+# coordinates alone unless they include location, in which case they should
+# include latitude and longitude too.
+
+def _saves_location(instance, update_fields):
+    if update_fields is not None:
+        return 'location' in update_fields
+    return 'location' not in instance.get_deferred_fields()
+
+
+@receiver(pre_save, sender=Job)
+@receiver(pre_save, sender=CompanyProfile)
+def geocode_location(sender, instance, update_fields=None, **kwargs):
+    if _saves_location(instance, update_fields):
+        locate(instance)
+
+
+# Keep the in-memory autocomplete index current once a request has built it.
+
+@receiver(post_save, sender=Job)
+def update_autocomplete_job(sender, instance, **kwargs):
+    if autocomplete_index.is_built:
+        autocomplete_index.update_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_autocomplete_job(sender, instance, **kwargs):
+    if autocomplete_index.is_built:
+        autocomplete_index.remove_job(instance.pk)
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def update_autocomplete_job_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if not autocomplete_index.is_built:
+        return
+    if action == 'post_add':
+        if reverse:
+            for job_id in pk_set:
+                autocomplete_index.add_job_skills(job_id, [instance.pk])
+        else:
+            autocomplete_index.add_job_skills(instance.pk, pk_set)
+    elif action == 'post_remove':
+        if reverse:
+            for job_id in pk_set:
+                autocomplete_index.remove_job_skills(job_id, [instance.pk])
+        else:
+            autocomplete_index.remove_job_skills(instance.pk, pk_set)
+    elif action == 'pre_clear' and reverse:
+        instance._autocomplete_job_ids = list(instance.job_set.values_list('id', flat=True))
+    elif action == 'post_clear':
+        if reverse:
+            for job_id in getattr(instance, '_autocomplete_job_ids', []):
+                autocomplete_index.remove_job_skills(job_id, [instance.pk])
+        else:
+            autocomplete_index.remove_job_skills(instance.pk)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=Category)
+def update_autocomplete_lookup(sender, instance, **kwargs):
+    if autocomplete_index.is_built:
+        autocomplete_index.update_lookup(instance)
+
+
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=Category)
+def remove_autocomplete_lookup(sender, instance, **kwargs):
+    if autocomplete_index.is_built:
+        autocomplete_index.remove_lookup(instance)
+
+
+# Keep the in-process token blacklist current. Deletes are picked up by its
+# periodic rebuild; a delete receiver would also stop prune_tokens from
+# deleting in bulk.
+
+@receiver(post_save, sender=BlacklistedToken)
+def revoke_token(sender, instance, created, **kwargs):
+    if created:
+        revoked_tokens.revoke(instance.token.jti)
+
+
+# Application.save() keeps JobStatusCount current; deletes, including
+# cascades from Job and JobSeeker, run inside the collector's transaction.
+
+@receiver(post_delete, sender=Application)
+def uncount_application(sender, instance, **kwargs):
+    JobStatusCount.objects.adjust({(instance.job_id, instance.status): -1})
+
+
+# Conditional GETs compare updated_at columns (see jobs.conditional). Bump
+# them when something outside the row changes the serialized body: job
+# skills, lookups deleted from under a job, the employer or job seeker
+# shown on a profile, or an education level shown on a resume.
+
+def touch(queryset):
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def touch_job_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+    if not reverse:
+        if action != 'pre_clear':
+            touch(Job.objects.filter(pk=instance.pk))
+    elif action == 'pre_clear':
+        touch(instance.job_set.all())
+    elif action != 'post_clear':
+        touch(Job.objects.filter(pk__in=pk_set or []))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=JobType)
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=EducationLevel)
+def touch_related_jobs(sender, instance, **kwargs):
+    touch(Job.objects.filter(pk__in=getattr(instance, '_search_job_ids', [])))
+
+
+@receiver(post_save, sender=Employer)
+def touch_company_profile(sender, instance, **kwargs):
+    if instance.company_profile_id:
+        touch(CompanyProfile.objects.filter(pk=instance.company_profile_id))
+
+
+@receiver(post_save, sender=JobSeeker)
+def touch_jobseeker_profile(sender, instance, **kwargs):
+    if instance.jobseeker_profile_id:
+        touch(JobSeekerProfile.objects.filter(pk=instance.jobseeker_profile_id))
+
+
+@receiver(post_save, sender=User)
+def touch_user_profiles(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and not {'first_name', 'last_name'} & set(update_fields)):
+        return
+    touch(JobSeekerProfile.objects.filter(jobseeker__user=instance))
+
+
+@receiver(post_save, sender=EducationLevel)
+@receiver(pre_delete, sender=EducationLevel)
+def touch_resumes(sender, instance, created=False, **kwargs):
+    if not created:
+        touch(Resume.objects.filter(educations__level=instance))
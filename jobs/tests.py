@@ -1,3 +1,1142 @@
-from django.test import TestCase
+import base64
+import collections
+import csv
+import datetime
+import gzip
+import io
+import json
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+import brotli
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .autocomplete import autocomplete_index
+from .bloom import BloomFilter
+from .exports import JOB_EXPORT_HEADER
+from .applications import update_statuses, update_matching_statuses, reconcile_status_counts
+from .fieldsets import JOB_CARD_FIELDS
+from .geo import bounding_box, geocode, haversine_km
+from .pagination import KeysetPagination
+from .recommendations import job_skill_index, score_applications
+from .renderers import FastJSONRenderer
+from .rows import JobRowSerializer, ApplicationRowSerializer
+from .search import FTS_TABLE, fts_enabled, legacy_search_filter, search_jobs
+from .serializers import JobSerializer, ApplicationSerializer, ResumeSerializer
+from .tokens import RefreshToken, RevokedTokens
+from .views import JobImportAPIView
+from .models import (
+    User, Employer, CompanyProfile, Category, JobType, Skill, EducationLevel, Job, JobSeeker, Application,
+    JobStatusCount, Resume, CandidateSkill, Experience,
+)
+
+
+def create_employer(username='employer@example.com', company_name='Acme'):
+    user = User.objects.create_user(username=username, password='secret', user_type='employer')
+    profile = CompanyProfile.objects.create(location='Calgary, AB')
+    return Employer.objects.create(user=user, company_name=company_name, company_profile=profile)
+
+
+def create_jobseeker(username='jobseeker@example.com'):
+    user = User.objects.create_user(username=username, password='secret', user_type='jobseeker')
+    return JobSeeker.objects.create(user=user)
+
+
+def create_job(employer, **kwargs):
+    fields = {
+        'title': 'Python Developer',
+        'description': 'Build APIs',
+        'location': 'Calgary, AB',
+        'min_salary': 50000,
+        'max_salary': 80000,
+        'experience_level': 'Junior',
+    }
+    fields.update(kwargs)
+    return Job.objects.create(employer=employer, **fields)
+
+
+class JobQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+        self.category = Category.objects.create(name='Engineering')
+        self.job_type = JobType.objects.create(name='Full-time')
+        self.level = EducationLevel.objects.create(name='Bachelor')
+        self.skills = [Skill.objects.create(name=name) for name in ('Python', 'Django', 'SQL')]
+
+    def add_jobs(self, count):
+        for _ in range(count):
+            job = create_job(self.employer, category=self.category, job_type=self.job_type,
+                             education_level=self.level)
+            job.skills.set(self.skills)
+
+    def test_search_query_count_does_not_grow_with_results(self):
+        params = {'page_size': 50, 'fields': 'id,title,skills,employer_profile'}
+        self.add_jobs(2)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/search-jobs/', params)
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.add_jobs(20)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/search-jobs/', params)
+        self.assertEqual(len(response.data['results']), 22)
+        self.assertEqual(response.data['results'][0]['employer_profile']['company_name'], 'Acme')
+
+    def test_search_defaults_to_job_cards(self):
+        self.add_jobs(3)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/search-jobs/', {'omit': 'location'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'min_salary', 'max_salary', 'company_name'])
+        self.assertEqual(response.data['results'][0]['company_name'], 'Acme')
+
+        response = self.client.get('/api/search-jobs/', {'fields': 'id,salary'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_job_detail_query_count(self):
+        self.add_jobs(1)
+        job = Job.objects.get()
+        # Version lookup, job with its employer profile, skill ids.
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/job/{job.id}/')
+        self.assertEqual(response.data['skills'], [skill.id for skill in self.skills])
+
+        # Repeat views are answered from the version lookup alone.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(f'/api/job/{job.id}/').data, response.data)
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(f'/api/job/{job.id}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        job.skills.remove(self.skills[0])
+        response = self.client.get(f'/api/job/{job.id}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.data['skills'], [skill.id for skill in self.skills[1:]])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        employer = create_employer()
+        self.jobs = [create_job(employer, title=f'Job {i}') for i in range(7)]
+        # Ties on date_posted, broken by id.
+        posted = timezone.now()
+        Job.objects.filter(id__in=[job.id for job in self.jobs[:4]]).update(date_posted=posted)
+        Job.objects.filter(id__in=[job.id for job in self.jobs[4:]]).update(date_posted=posted - datetime.timedelta(days=1))
+        self.expected = [job.id for job in self.jobs[3::-1] + self.jobs[:3:-1]]
+
+    def pages(self, url, params, link='next'):
+        ids = []
+        while url:
+            data = self.client.get(url, params).json()
+            ids.append([job['id'] for job in data['results']])
+            url, params = data[link], None
+        return ids
+
+    def test_pages_forward_and_back(self):
+        pages = self.pages('/api/search-jobs/', {'page_size': 3})
+        self.assertEqual(pages, [self.expected[:3], self.expected[3:6], self.expected[6:]])
+
+        last = self.client.get('/api/search-jobs/', {'page_size': 3}).json()
+        while last['next']:
+            last = self.client.get(last['next']).json()
+        self.assertEqual(self.pages(last['previous'], None, 'previous'), [self.expected[3:6], self.expected[:3]])
+
+    def test_pages_lists_in_memory(self):
+        Row = collections.namedtuple('Row', ['id', 'score'])
+        rows = [Row(job_id, score) for job_id, score in zip(range(1, 6), (1.5, 0.5, 0.5, 2.0, 1.5))]
+        paginator = KeysetPagination()
+        paginator.ordering = ('score', 'id')
+        factory = APIRequestFactory()
+        request = Request(factory.get('/', {'page_size': 2}))
+        seen = []
+        while request:
+            seen += [row.id for row in paginator.paginate_queryset(rows, request)]
+            link = paginator.get_next_link()
+            request = link and Request(factory.get(link))
+        self.assertEqual(seen, [2, 3, 1, 5, 4])
+
+    def test_invalid_cursors_are_not_found(self):
+        def cursor(position, reverse=0):
+            payload = json.dumps({'p': position, 'r': reverse}).encode()
+            return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+        posted = self.jobs[0].date_posted.isoformat()
+        for value in ('bogus', cursor([posted]), cursor(['yesterday', 1]), cursor([posted, 'one']),
+                      cursor([posted, None]), cursor([posted, [1]]), cursor({'p': 1}),
+                      cursor([posted, 99999999999999999999999]), cursor([posted, 1e999])):
+            response = self.client.get('/api/search-jobs/', {'cursor': value})
+            self.assertEqual((response.status_code, response.json()), (404, {'detail': 'Invalid cursor'}), value)
+        for value in (cursor(['high', 1]), cursor([{}, 1]), cursor([float('inf'), 1]), cursor([1.5, 2 ** 63])):
+            response = self.client.get('/api/search-jobs/', {'q': 'developer', 'cursor': value})
+            self.assertEqual(response.status_code, 404, value)
+        self.assertEqual(self.client.get('/api/search-jobs/', {'cursor': cursor([posted, self.jobs[0].id])}).status_code, 200)
+
+
+class IndexUsageTests(TestCase):
+    """Check from EXPLAIN QUERY PLAN that the views' queries use the composite indexes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+        self.jobseeker = create_jobseeker()
+        self.jobs = [create_job(self.employer, min_salary=40000 + i * 10000) for i in range(5)]
+        for job in self.jobs:
+            Application.objects.create(jobseeker=self.jobseeker, job=job)
+
+    def query_plan(self, url, table, user=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        sql = next(query['sql'] for query in captured
+                   if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def assertUsesIndex(self, plan, index):
+        self.assertIn(f'INDEX {index}', plan)
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_employer_jobs_use_employer_date_index(self):
+        plan = self.query_plan('/api/employer-jobs/', 'jobs_job', user=self.employer.user)
+        self.assertUsesIndex(plan, 'job_employer_posted_idx')
+
+    def test_active_job_search_uses_active_date_index(self):
+        plan = self.query_plan('/api/search-jobs/?active=true', 'jobs_job')
+        self.assertUsesIndex(plan, 'job_active_posted_idx')
+
+    def test_salary_filter_uses_salary_index(self):
+        plan = self.query_plan('/api/search-jobs/?salary=50000-75000', 'jobs_job')
+        self.assertIn('INDEX job_salary_idx', plan)
+
+    def test_typed_salary_filters_use_salary_indexes(self):
+        plan = self.query_plan('/api/search-jobs/?salary_max=55000', 'jobs_job')
+        self.assertIn('INDEX job_salary_idx', plan)
+        plan = self.query_plan('/api/search-jobs/?salary_min=85000', 'jobs_job')
+        self.assertIn('INDEX job_max_salary_idx', plan)
+
+    def test_applicants_by_status_use_job_status_index(self):
+        url = f'/api/job-applicants/{self.jobs[0].id}/?status=Applied'
+        plan = self.query_plan(url, 'jobs_application', user=self.employer.user)
+        self.assertUsesIndex(plan, 'application_job_status_idx')
+
+    def test_jobseeker_applications_use_jobseeker_date_index(self):
+        plan = self.query_plan('/api/applications/', 'jobs_application', user=self.jobseeker.user)
+        self.assertUsesIndex(plan, 'application_seeker_date_idx')
+
+
+class SearchIndexTests(TestCase):
+    TERMS = ('python', 'PYTHON', 'gary', 'Engin', 'full-t', 'bachelor', 'Smith', 'senior', 'sql',
+             'ops 50%', 'say "hi"', 'nothing')
+
+    def setUp(self):
+        employer = create_employer()
+        employer.user.first_name, employer.user.last_name = 'Jane', 'Smith'
+        employer.user.save()
+        self.category = Category.objects.create(name='Engineering')
+        self.skill = Skill.objects.create(name='PostgreSQL')
+        self.job = create_job(employer, title='Python Developer', category=self.category,
+                              job_type=JobType.objects.create(name='Full-time'))
+        self.job.skills.add(self.skill)
+        create_job(employer, title='Dev ops 50% remote', location='Calgary', experience_level='Senior',
+                   education_level=EducationLevel.objects.create(name='Bachelor'))
+        create_job(create_employer('other@example.com'), title='Designer', description='Say "hi" to Figma')
+
+    def assertParity(self):
+        for term in self.TERMS:
+            fts = set(search_jobs(Job.objects.all(), term).values_list('id', flat=True))
+            legacy = set(Job.objects.filter(legacy_search_filter(term)).values_list('id', flat=True))
+            self.assertEqual(fts, legacy, term)
+
+    def matches(self, term):
+        return list(search_jobs(Job.objects.all(), term).values_list('id', flat=True))
+
+    def test_index_matches_icontains(self):
+        self.assertTrue(fts_enabled())
+        self.assertParity()
+        self.assertEqual(len(self.matches('dev')), 2)
+
+    def test_index_follows_edits(self):
+        self.job.title = 'Rust Engineer'
+        self.job.save()
+        self.assertEqual(self.matches('rust'), [self.job.id])
+        self.assertEqual(self.matches('python'), [])
+
+        self.skill.name = 'MySQL'
+        self.skill.save()
+        self.assertEqual(self.matches('mysql'), [self.job.id])
+        self.job.skills.remove(self.skill)
+        self.assertEqual(self.matches('mysql'), [])
+        self.skill.job_set.add(self.job)
+        self.assertEqual(self.matches('mysql'), [self.job.id])
+        self.skill.delete()
+        self.assertEqual(self.matches('mysql'), [])
+
+        self.category.name = 'Platform'
+        self.category.save()
+        self.assertEqual(self.matches('platform'), [self.job.id])
+        self.category.delete()
+        self.assertEqual(self.matches('platform'), [])
+        self.assertParity()
+
+        job_id = self.job.id
+        self.job.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE rowid = %s', [job_id])
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        employer = create_employer()
+        self.engineering, self.design = Category.objects.create(name='Engineering'), Category.objects.create(name='Design')
+        for category, min_salary, level in (
+            (self.engineering, 25000, 'Junior'), (self.engineering, 50000, 'Senior'),
+            (self.engineering, 74999.99, 'Senior'), (self.design, 50000, 'Junior'),
+            (self.design, 150000, 'Senior'), (None, 99000, 'Junior'),
+        ):
+            create_job(employer, category=category, min_salary=min_salary, max_salary=200000, experience_level=level)
+
+    def search(self, **params):
+        response = self.client.get('/api/search-jobs/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_counts_every_facet_in_one_query(self):
+        with self.assertNumQueries(2):
+            data = self.search(facets='category,salary,experience_level,category')
+        self.assertEqual(list(data['facets']), ['category', 'salary', 'experience_level'])
+        self.assertEqual(data['facets']['category'], [
+            {'value': self.engineering.id, 'count': 3}, {'value': self.design.id, 'count': 2}, {'value': None, 'count': 1},
+        ])
+        self.assertEqual(data['facets']['salary'], [
+            {'value': '50000-75000', 'count': 3}, {'value': '0-30000', 'count': 1},
+            {'value': '150000+', 'count': 1}, {'value': '75000-100000', 'count': 1},
+        ])
+        self.assertEqual(data['facets']['experience_level'], [
+            {'value': 'Junior', 'count': 3}, {'value': 'Senior', 'count': 3},
+        ])
+        self.assertNotIn('facets', self.search())
+
+    def test_facets_count_the_filtered_jobs(self):
+        data = self.search(category=self.engineering.id, facets='salary,experience_level')
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(data['facets']['salary'], [{'value': '50000-75000', 'count': 2}, {'value': '0-30000', 'count': 1}])
+        self.assertEqual(data['facets']['experience_level'], [{'value': 'Senior', 'count': 2}, {'value': 'Junior', 'count': 1}])
+
+    def test_bucket_filters_match_bucket_counts(self):
+        for bucket in self.search(facets='salary')['facets']['salary']:
+            self.assertEqual(len(self.search(salary=bucket['value'])['results']), bucket['count'], bucket)
+        self.assertEqual(len(self.search(salary='0-30000,150000+')['results']), 2)
+        self.assertEqual(len(self.search(salary='50000-75000', experience_level='Junior,Intern')['results']), 1)
+        self.assertEqual(len(self.search(category=f'{self.engineering.id},{self.design.id}')['results']), 5)
+
+        for params in ({'salary': '1-2'}, {'category': 'design'}, {'facets': 'title'}, {'active': 'yes'},
+                       {'category': '99999999999999999999999'}, {'job_type': f'1,{2 ** 63}'}):
+            self.assertEqual(self.client.get('/api/search-jobs/', params).status_code, 400, params)
+
+
+class JobImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+        self.client.force_authenticate(self.employer.user)
+        self.category = Category.objects.create(name='Engineering')
+        JobType.objects.create(name='Full-time')
+        EducationLevel.objects.create(name='Bachelor')
+        self.skills = [Skill.objects.create(name=name) for name in ('Python', 'SQL')]
+        self.row = {
+            'title': 'Data Engineer', 'description': 'Pipelines', 'location': 'Calgary, AB',
+            'min_salary': '60000', 'max_salary': '90000', 'experience_level': 'Mid',
+            'category': self.category.id, 'job_type': 'Full-time', 'education_level': 'Bachelor',
+            'skills': ['Python', self.skills[1].id],
+        }
+
+    def post(self, lines, content_type='application/x-ndjson'):
+        body = b''.join(line if isinstance(line, bytes) else json.dumps(line).encode() + b'\n' for line in lines)
+        return self.client.generic('POST', '/api/import-jobs/', body, content_type=content_type)
+
+    def test_imports_valid_rows(self):
+        response = self.post([self.row, {**self.row, 'title': 'Analyst', 'skills': 'SQL'}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'created': 2, 'errors': []})
+        job = Job.objects.get(title='Data Engineer')
+        self.assertEqual(set(job.skills.all()), set(self.skills))
+        self.assertIsNotNone(job.latitude)
+
+        csv_body = (
+            'title,description,location,min_salary,max_salary,experience_level,category,job_type,education_level,skills\n'
+            'CSV Engineer,Pipelines,Edmonton,50000,70000,Junior,Engineering,Full-time,Bachelor,Python; SQL\n'
+        )
+        response = self.post([csv_body.encode()], content_type='text/csv')
+        self.assertEqual(response.json(), {'created': 1, 'errors': []})
+        self.assertEqual(Job.objects.get(title='CSV Engineer').skills.count(), 2)
+
+    def test_reports_row_errors(self):
+        response = self.post([
+            self.row,
+            {**self.row, 'category': 'Astrology', 'skills': ['Cobol']},
+            {**self.row, 'min_salary': '99000'},
+            [1, 2],
+            {key: value for key, value in self.row.items() if key != 'title'},
+            {**self.row, 'category': '99999999999999999999999', 'skills': [2 ** 64]},
+        ])
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([error['line'] for error in report['errors']], [2, 3, 4, 5, 6])
+        self.assertEqual(set(report['errors'][0]['errors']), {'category', 'skills'})
+        self.assertEqual(report['errors'][4]['errors'], {
+            'category': ['Unknown category "99999999999999999999999".'],
+            'skills': [f'Unknown skills: {2 ** 64}.'],
+        })
+        self.assertIn('title', report['errors'][3]['errors'])
+
+        response = self.post([{**self.row, 'job_type': 'Gig'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['created'], 0)
+
+    def test_unreadable_lines_mid_stream_are_reported(self):
+        with mock.patch.object(JobImportAPIView, 'chunk_size', 1):
+            response = self.post([self.row, b'{"title": \n', b'\xff\xfe\n', {**self.row, 'title': 'After'}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'created': 2, 'errors': [
+            {'line': 2, 'errors': {'non_field_errors': ['Line is not valid JSON.']}},
+            {'line': 3, 'errors': {'non_field_errors': ['Line is not valid UTF-8.']}},
+        ]})
+
+        header = b'title,description,location,min_salary,max_salary,experience_level,category,job_type,education_level\n'
+        line = b'CSV %s,Pipelines,Calgary,50000,70000,Junior,Engineering,Full-time,Bachelor\n'
+        with mock.patch.object(JobImportAPIView, 'chunk_size', 1):
+            response = self.post([header, line % b'One', b'\xff\n', line % b'Two'], content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'created': 1, 'errors': [
+            {'line': 3, 'errors': {'non_field_errors': ['Line is not valid UTF-8; the rest of the file was not read.']}},
+        ]})
+        self.assertTrue(Job.objects.filter(title='CSV One').exists())
+
+
+class ResumeUpdateTests(TestCase):
+    def setUp(self):
+        self.resume = Resume.objects.create()
+        self.level = EducationLevel.objects.create(name='Bachelor')
+
+    def save(self, data):
+        serializer = ResumeSerializer(self.resume, data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.save()
+
+    def payload(self, count):
+        return {
+            'candidate_skills': [{'name': f'Skill {i}', 'proficiency': 'basic'} for i in range(count)],
+            'educations': [{'level': {'id': self.level.id, 'name': 'Bachelor'}, 'school': f'School {i}',
+                            'start_date': '2015-09-01', 'end_date': '2019-06-01'} for i in range(count)],
+            'experiences': [{'company': f'Company {i}', 'position': 'Developer', 'start_date': '2019-07-01',
+                             'end_date': '2022-01-01', 'short_description': ''} for i in range(count)],
+        }
+
+    def test_edits_keep_ids_and_remove_missing_items(self):
+        data = ResumeSerializer(self.save(self.payload(3))).data
+        skills, experiences = data['candidate_skills'], data['experiences']
+        skills[0]['proficiency'] = 'advanced'
+        experiences[1]['position'] = 'Lead'
+        data['educations'][0]['level'] = {'name': 'Master', 'description': ''}
+        del skills[2], experiences[0]
+        skills.append({'name': 'New skill', 'proficiency': 'intermediate'})
+
+        resume = self.save(data)
+        saved = ResumeSerializer(resume).data
+        self.assertEqual([item['id'] for item in saved['candidate_skills']][:2], [item['id'] for item in skills[:2]])
+        self.assertEqual(CandidateSkill.objects.get(id=skills[0]['id']).proficiency, 'advanced')
+        self.assertEqual([item['name'] for item in saved['candidate_skills']], ['Skill 0', 'Skill 1', 'New skill'])
+        self.assertEqual([item['id'] for item in saved['experiences']], [item['id'] for item in experiences])
+        self.assertEqual(Experience.objects.get(id=experiences[0]['id']).position, 'Lead')
+        self.assertEqual(saved['educations'][0]['level']['name'], 'Master')
+        self.assertEqual(saved['educations'][1]['level']['id'], self.level.id)
+
+        # Ids from another resume are not taken over; they create new rows.
+        other = Resume.objects.create()
+        foreign = CandidateSkill.objects.create(name='Foreign')
+        other.candidate_skills.add(foreign)
+        resume = self.save({**data, 'candidate_skills': [{'id': foreign.id, 'name': 'Mine', 'proficiency': 'basic'}]})
+        self.assertNotEqual(resume.candidate_skills.get().id, foreign.id)
+        self.assertEqual(CandidateSkill.objects.get(id=foreign.id).name, 'Foreign')
+
+    def test_query_count_does_not_grow_with_items(self):
+        def update_queries(count):
+            data = ResumeSerializer(self.save(self.payload(count))).data
+            for key, attr in (('candidate_skills', 'name'), ('educations', 'school'), ('experiences', 'company')):
+                for item in data[key]:
+                    item[attr] += ' (edited)'
+                data[key][0:1] = []
+                data[key].append(self.payload(1)[key][0])
+            with CaptureQueriesContext(connection) as captured:
+                self.save(data)
+            return len(captured)
+
+        self.assertEqual(update_queries(2), update_queries(10))
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        employer = create_employer()
+        self.bachelor = EducationLevel.objects.create(name='Bachelor')
+        python, django, sql = (Skill.objects.create(name=name) for name in ('Python', 'Django', 'SQL'))
+        self.python_django = create_job(employer, title='Django')
+        self.python_django.skills.set([python, django])
+        self.python = create_job(employer, title='Python')
+        self.python.skills.set([python])
+        self.python_sql = create_job(employer, title='Data', education_level=self.bachelor)
+        self.python_sql.skills.set([python, sql])
+        create_job(employer, title='SQL').skills.set([sql])
+        create_job(employer, title='Inactive', active=False).skills.set([python])
+        applied = create_job(employer, title='Applied')
+        applied.skills.set([python])
+
+        self.jobseeker = create_jobseeker()
+        resume = Resume.objects.create()
+        resume.candidate_skills.set([
+            CandidateSkill.objects.create(name=' python', proficiency='advanced'),
+            CandidateSkill.objects.create(name='Django', proficiency='basic'),
+        ])
+        resume.educations.create(level=self.bachelor, school='U', start_date='2010-01-01', end_date='2014-01-01')
+        self.jobseeker.resume = resume
+        self.jobseeker.save()
+        Application.objects.create(jobseeker=self.jobseeker, job=applied)
+        job_skill_index.rebuild()
+        self.client.force_authenticate(self.jobseeker.user)
+
+    def recommended(self, **params):
+        return [(job['id'], job['match_score']) for job in self.client.get('/api/recommended-jobs/', params).json()]
+
+    def test_ranks_by_weighted_skill_share_and_education(self):
+        self.assertEqual(self.recommended(), [
+            (self.python.id, 1.0),
+            (self.python_sql.id, 0.75),
+            (self.python_django.id, 0.6667),
+        ])
+        self.assertEqual(self.recommended(limit=1), [(self.python.id, 1.0)])
+        self.assertEqual(self.client.get('/api/recommended-jobs/', {'limit': 'all'}).status_code, 400)
+
+    def test_follows_job_changes(self):
+        self.python.active = False
+        self.python.save()
+        self.python_django.skills.remove(Skill.objects.get(name='Django'))
+        self.assertEqual(self.recommended(), [(self.python_django.id, 1.0), (self.python_sql.id, 0.75)])
+
+
+class MatchRankingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+        level = EducationLevel.objects.create(name='Bachelor')
+        self.job = create_job(self.employer, education_level=level)
+        self.job.skills.set([Skill.objects.create(name='Python'), Skill.objects.create(name='SQL')])
+
+        def apply(username, skills=(), educations=0, experience_years=0):
+            jobseeker = create_jobseeker(username)
+            if skills or educations or experience_years:
+                resume = Resume.objects.create()
+                for name, proficiency in skills:
+                    resume.candidate_skills.add(CandidateSkill.objects.create(name=name, proficiency=proficiency))
+                for _ in range(educations):
+                    resume.educations.create(level=level, school='U', start_date='2010-01-01', end_date='2014-01-01')
+                if experience_years:
+                    resume.experiences.create(company='Acme', position='Dev', start_date=datetime.date(2010, 1, 1),
+                                              end_date=datetime.date(2010 + experience_years, 1, 1))
+                jobseeker.resume = resume
+                jobseeker.save()
+            return Application.objects.create(job=self.job, jobseeker=jobseeker).id
+
+        self.expert = apply('expert@example.com', [('Python', 'advanced'), ('sql', 'advanced')])
+        self.no_resume = apply('blank@example.com')
+        self.junior = apply('junior@example.com', [('Python', 'basic'), ('Go', 'advanced')], educations=1, experience_years=10)
+        self.tied = apply('tied@example.com')
+        self.client.force_authenticate(self.employer.user)
+
+    def test_orders_by_match_score_across_pages(self):
+        url = f'/api/job-applicants/{self.job.id}/'
+        ranked = []
+        params = {'order': 'match', 'page_size': 2}
+        while url:
+            data = self.client.get(url, params).json()
+            ranked += [(application['id'], application['match_score']) for application in data['results']]
+            url, params = data['next'], None
+        self.assertEqual(ranked, [(self.expert, 1.0), (self.junior, 0.6667), (self.tied, 0.0), (self.no_resume, 0.0)])
+
+        response = self.client.get(f'/api/job-applicants/{self.job.id}/')
+        self.assertNotIn('match_score', response.json()['results'][0])
+        self.assertEqual(self.client.get(f'/api/job-applicants/{self.job.id}/', {'order': 'name'}).status_code, 400)
+
+    def test_only_the_jobs_employer_sees_its_applicants(self):
+        url = f'/api/job-applicants/{self.job.id}/'
+        self.client.force_authenticate(create_employer('other@example.com', 'Other').user)
+        for params in ({}, {'order': 'match'}, {'status': 'Applied'}):
+            self.assertEqual(self.client.get(url, params).status_code, 404, params)
+        self.client.force_authenticate(Application.objects.get(id=self.expert).jobseeker.user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_scoring_queries_do_not_grow_with_applicants(self):
+        applications = Application.objects.filter(job=self.job).select_related('jobseeker')
+        # The applications, the job's skills, then the applicants' resume
+        # skills, education matches and experiences.
+        with self.assertNumQueries(5):
+            scored = score_applications(self.job, applications)
+        self.assertEqual(len(scored), 4)
+
+
+class BulkApplicationStatusTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+        self.job = create_job(self.employer)
+        self.applications = [
+            Application.objects.create(job=self.job, jobseeker=create_jobseeker(f'seeker{i}@example.com'))
+            for i in range(3)
+        ]
+        other_job = create_job(create_employer('other@example.com', 'Other'))
+        self.foreign = Application.objects.create(job=other_job, jobseeker=create_jobseeker())
+        self.client.force_authenticate(self.employer.user)
+
+    def patch(self, data):
+        return self.client.patch('/api/applications/bulk-status/', data, format='json')
+
+    def test_pairs_are_updated_with_one_query_per_status(self):
+        first, second, third = self.applications
+        updates = [{'id': first.id, 'status': 'Shortlisted'}, {'id': second.id, 'status': 'Shortlisted'},
+                   {'id': third.id, 'status': 'Interviewing'}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.patch({'updates': updates})
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertEqual(sum(q['sql'].startswith('UPDATE "jobs_application"') for q in queries.captured_queries), 2)
+        self.assertEqual(Application.objects.get(id=third.id).status, 'Interviewing')
+
+    def test_foreign_application_rejects_whole_batch(self):
+        updates = [{'id': self.applications[0].id, 'status': 'Shortlisted'}, {'id': self.foreign.id, 'status': 'Shortlisted'}]
+        response = self.patch({'updates': updates})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Application.objects.filter(status='Shortlisted').exists())
+
+    def test_filter_moves_matching_applications(self):
+        response = self.patch({'filter': {'job': self.job.id, 'status': 'Applied'}, 'status': 'Under Review'})
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertEqual(Application.objects.get(id=self.foreign.id).status, 'Applied')
+
+    def test_invalid_status_is_rejected(self):
+        response = self.patch({'updates': [{'id': self.applications[0].id, 'status': 'Rejected'}]})
+        self.assertEqual(response.status_code, 400)
+
+
+class ApplicationCountTests(TestCase):
+    def setUp(self):
+        self.employer = create_employer()
+        self.job = create_job(self.employer)
+        self.applications = [
+            Application.objects.create(job=self.job, jobseeker=create_jobseeker(f'seeker{i}@example.com'))
+            for i in range(3)
+        ]
+
+    def counts(self):
+        return dict(JobStatusCount.objects.filter(job=self.job, count__gt=0).values_list('status', 'count'))
+
+    def test_counts_follow_create_update_and_delete(self):
+        application = Application.objects.get(id=self.applications[0].id)
+        application.status = 'Interviewing'
+        application.save()
+        update_statuses(self.employer.id, {self.applications[1].id: 'Hired'})
+        self.applications[2].jobseeker.delete()
+        self.assertEqual(self.counts(), {'Interviewing': 1, 'Hired': 1})
+        self.assertEqual(reconcile_status_counts(), 0)
+
+    def test_status_patch_rejects_unknown_status(self):
+        client = APIClient()
+        client.force_authenticate(self.employer.user)
+        url = f'/api/applications/{self.applications[0].id}/'
+        response = client.patch(url, {'status': 'Bogus'}, format='json')
+        self.assertEqual((response.status_code, response.data), (400, {'error': 'Invalid status.'}))
+        self.assertFalse(JobStatusCount.objects.filter(status='Bogus').exists())
+        self.assertEqual(client.patch(url, {'status': 'Hired'}, format='json').status_code, 200)
+        self.assertEqual(self.counts(), {'Applied': 2, 'Hired': 1})
+
+    def test_employer_job_list_exposes_counts(self):
+        update_matching_statuses(self.employer.id, 'Shortlisted', job_id=self.job.id)
+        client = APIClient()
+        client.force_authenticate(self.employer.user)
+        with self.assertNumQueries(2):
+            response = client.get('/api/employer-jobs/')
+        counts = response.data['results'][0]['applicant_counts']
+        self.assertEqual(counts['Shortlisted'], 3)
+        self.assertEqual(counts['Applied'], 0)
+
+    def test_reconcile_fixes_drift(self):
+        JobStatusCount.objects.filter(job=self.job).update(count=7)
+        self.assertEqual(reconcile_status_counts(), 1)
+        self.assertEqual(self.counts(), {'Applied': 3})
+
+
+class RowSerializerTests(TestCase):
+    def test_rows_render_the_same_bytes_as_the_serializers(self):
+        employer = create_employer(company_name='Café "Ñandú"')
+        skill = Skill.objects.create(name='Python')
+        job = create_job(employer, title='Dev\u2028ops \U0001F600', min_salary='50000.5')
+        job.skills.add(skill)
+        create_job(create_employer('bare@example.com', 'Bare'))
+        Employer.objects.filter(company_name='Bare').update(company_profile=None)
+        Application.objects.create(job=job, jobseeker=create_jobseeker())
+
+        jobs = Job.objects.order_by('id')
+        for fields in (None, JOB_CARD_FIELDS, ('skills', 'employer_profile')):
+            serializer = JobRowSerializer(fields)
+            self.assertEqual(
+                FastJSONRenderer().render(serializer.to_representation(list(serializer.rows(jobs)))),
+                JSONRenderer().render(JobSerializer(jobs.for_serializer(fields), many=True, fields=fields).data),
+            )
+
+        serializer = ApplicationRowSerializer()
+        self.assertEqual(
+            FastJSONRenderer().render(serializer.to_representation(list(serializer.rows(Application.objects.all())))),
+            JSONRenderer().render(ApplicationSerializer(Application.objects.all(), many=True).data),
+        )
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+        category = Category.objects.create(name='Engineering')
+        python, sql = Skill.objects.create(name='Python'), Skill.objects.create(name='SQL')
+        self.jobs = [create_job(self.employer, title=f'Job {i}', category=category) for i in range(5)]
+        self.jobs[0].skills.set([python, sql])
+        create_job(create_employer('other@example.com', 'Other'), title='Not mine')
+        seeker = create_jobseeker()
+        seeker.user.first_name, seeker.user.email = 'Ana', 'ana@example.com'
+        seeker.user.save()
+        Application.objects.create(job=self.jobs[0], jobseeker=seeker)
+        self.client.force_authenticate(self.employer.user)
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_exports_jobs_as_csv_and_ndjson(self):
+        response = self.client.get('/api/employer-jobs/export/')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="jobs.csv"')
+        rows = list(csv.reader(io.StringIO(self.content(response))))
+        self.assertEqual(rows[0], list(JOB_EXPORT_HEADER))
+        self.assertEqual([row[1] for row in rows[1:]], [f'Job {i}' for i in range(4, -1, -1)])
+        self.assertEqual(rows[-1][6], 'Engineering')
+        self.assertEqual(sorted(rows[-1][-1].split(';')), ['Python', 'SQL'])
+
+        response = self.client.get('/api/employer-jobs/export/', {'output': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        jobs = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(jobs[-1]['id'], self.jobs[0].id)
+        self.assertEqual(jobs[-1]['min_salary'], '50000.00')
+        self.assertEqual(sorted(jobs[-1]['skills']), ['Python', 'SQL'])
+        self.assertEqual(jobs[0]['skills'], [])
+
+        self.assertEqual(self.client.get('/api/employer-jobs/export/', {'output': 'xlsx'}).status_code, 400)
+
+    def test_csv_cells_are_not_formulas(self):
+        Job.objects.filter(id=self.jobs[0].id).update(title='=HYPERLINK("http://evil.example","x")', location='-2+3')
+        seeker = Application.objects.get().jobseeker.user
+        seeker.first_name, seeker.last_name = '@SUM(A1)', '\tTab'
+        seeker.save()
+
+        rows = list(csv.reader(io.StringIO(self.content(self.client.get('/api/employer-jobs/export/')))))
+        self.assertEqual(rows[-1][1:3], ['\'=HYPERLINK("http://evil.example","x")', "'-2+3"])
+        self.assertEqual(rows[-1][3], '50000.00')
+        response = self.client.get(f'/api/job-applicants/{self.jobs[0].id}/export/')
+        [applicant] = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual((applicant['first_name'], applicant['last_name']), ("'@SUM(A1)", "'\tTab"))
+        # NDJSON is data, not a spreadsheet, and is left as it is.
+        response = self.client.get('/api/employer-jobs/export/', {'output': 'ndjson'})
+        self.assertEqual(json.loads(self.content(response).splitlines()[-1])['location'], '-2+3')
+
+    def test_streams_skills_one_query_per_chunk(self):
+        with mock.patch('jobs.exports.EXPORT_CHUNK_SIZE', 2):
+            response = self.client.get('/api/employer-jobs/export/', {'output': 'ndjson'})
+            with CaptureQueriesContext(connection) as captured:
+                lines = self.content(response).splitlines()
+        self.assertEqual(len(lines), 5)
+        # The jobs, then the skills of each chunk of two.
+        self.assertEqual(len(captured), 1 + 3)
+
+    def test_exports_applicants_of_own_jobs_only(self):
+        response = self.client.get(f'/api/job-applicants/{self.jobs[0].id}/export/', {'output': 'ndjson'})
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="job-{self.jobs[0].id}-applicants.ndjson"')
+        [applicant] = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual((applicant['first_name'], applicant['email'], applicant['status']), ('Ana', 'ana@example.com', 'Applied'))
+
+        other_job = Job.objects.get(title='Not mine')
+        self.assertEqual(self.client.get(f'/api/job-applicants/{other_job.id}/export/').status_code, 404)
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        employer = create_employer()
+        for _ in range(30):
+            create_job(employer)
+
+    def test_large_responses_are_gzipped(self):
+        plain = self.client.get('/api/search-jobs/', {'page_size': 30})
+        response = self.client.get('/api/search-jobs/', {'page_size': 30}, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        small = self.client.get('/api/search-jobs/', {'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    def test_brotli_is_preferred(self):
+        plain = self.client.get('/api/search-jobs/', {'page_size': 30})
+        response = self.client.get('/api/search-jobs/', {'page_size': 30}, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+
+        response = self.client.get('/api/search-jobs/', {'page_size': 30}, HTTP_ACCEPT_ENCODING='br;q=0.5, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_streaming_responses_are_compressed(self):
+        self.client.force_authenticate(Job.objects.first().employer.user)
+        plain = self.client.get('/api/employer-jobs/export/')
+        response = self.client.get('/api/employer-jobs/export/', HTTP_ACCEPT_ENCODING='br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(b''.join(response.streaming_content)),
+                         b''.join(plain.streaming_content))
+
+    def test_compressed_etag_still_matches(self):
+        for name in range(60):
+            Skill.objects.create(name=f'Skill {name}')
+        response = self.client.get('/api/skills/', {'page_size': 60}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        repeat = self.client.get('/api/skills/', {'page_size': 60}, HTTP_ACCEPT_ENCODING='gzip',
+                                 HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+
+
+class AsyncViewTests(TransactionTestCase):
+    # The async views query from worker threads, on connections of their
+    # own, which cannot see a TestCase's uncommitted data.
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+        self.category = Category.objects.create(name='Engineering')
+        skill = Skill.objects.create(name='Python')
+        for _ in range(3):
+            create_job(self.employer, category=self.category).skills.add(skill)
+
+    def assertSameResponse(self, path, params=None):
+        sync = self.client.get(f'/api/{path}', params)
+        response = self.client.get(f'/api/async/{path}', params)
+        self.assertEqual(response.status_code, sync.status_code)
+        # Page links differ by the path alone.
+        self.assertEqual(response.content.decode().replace('/api/async/', '/api/'), sync.content.decode())
+        return response
+
+    def test_responses_match_sync_views(self):
+        job = Job.objects.first()
+        self.assertSameResponse('search-jobs/', {'page_size': 2, 'facets': 'category'})
+        self.assertSameResponse(f'job/{job.id}/')
+        self.assertSameResponse(f'employer-profile/{self.employer.company_profile_id}/')
+        self.assertSameResponse('categories/')
+
+    def test_errors_match_sync_views(self):
+        self.assertEqual(self.assertSameResponse('search-jobs/', {'cursor': 'bogus'}).status_code, 404)
+        self.assertEqual(self.assertSameResponse('categories/', {'cursor': 'bogus'}).status_code, 404)
+        self.assertEqual(self.assertSameResponse('search-jobs/', {'facets': 'bogus'}).status_code, 400)
+        self.assertEqual(self.assertSameResponse('search-jobs/', {'near': 'Atlantis'}).status_code, 400)
+        self.assertEqual(self.assertSameResponse('job/0/').status_code, 404)
+
+        # Ids and cursor positions too large for a 64-bit column.
+        huge = '99999999999999999999999'
+        for name in ('category', 'job_type', 'education_level', 'skills'):
+            self.assertEqual(self.assertSameResponse('search-jobs/', {name: huge}).status_code, 400, name)
+        cursor = base64.urlsafe_b64encode(json.dumps({'p': ['2026-01-01T00:00:00+00:00', int(huge)]}).encode())
+        self.assertEqual(self.assertSameResponse('search-jobs/', {'cursor': cursor.decode()}).status_code, 404)
+
+
+class GeoSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+        self.calgary = create_job(self.employer, location='Calgary, AB')
+        self.airdrie = create_job(self.employer, location='Airdrie, Alberta, Canada', active=False)
+        self.edmonton = create_job(self.employer, location='Edmonton AB')
+        create_job(self.employer, location='Remote')
+
+    def test_geocode(self):
+        self.assertEqual(geocode('Montréal, Québec'), geocode('montreal'))
+        self.assertEqual(geocode('St. John\'s, NL'), geocode("Saint John's"))
+        self.assertIsNone(geocode('London, UK'))
+        self.assertIsNone(geocode('Remote'))
+        self.assertIsNotNone(self.calgary.latitude)
+
+    def test_near_orders_by_distance(self):
+        response = self.client.get('/api/search-jobs/', {'near': 'Calgary', 'radius': 50})
+        results = response.json()['results']
+        self.assertEqual([job['id'] for job in results], [self.calgary.id, self.airdrie.id])
+        self.assertEqual(results[0]['distance_km'], 0.0)
+        self.assertTrue(25 < results[1]['distance_km'] < 30)
+
+        response = self.client.get('/api/search-jobs/', {'near': '51.0447,-114.0719', 'radius': 300, 'active': 'true'})
+        self.assertEqual([job['id'] for job in response.json()['results']], [self.calgary.id, self.edmonton.id])
+
+        # Moving a job moves it in the index.
+        self.edmonton.location = 'Calgary'
+        self.edmonton.save()
+        response = self.client.get('/api/search-jobs/', {'near': 'Calgary', 'active': 'true'})
+        self.assertEqual([job['id'] for job in response.json()['results']], [self.calgary.id, self.edmonton.id])
+
+    def test_near_pages_and_facets_stay_within_radius(self):
+        pages = []
+        url, params = '/api/search-jobs/', {'near': 'Calgary', 'radius': 300, 'page_size': 1}
+        while url:
+            data = self.client.get(url, params).json()
+            pages.append([job['id'] for job in data['results']])
+            url, params = data['next'], None
+        self.assertEqual(pages, [[self.calgary.id], [self.airdrie.id], [self.edmonton.id]])
+
+        # Airdrie is inside the bounding box of this search but not the circle.
+        latitude, longitude = self.airdrie.latitude - 0.3, self.airdrie.longitude - 0.45
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, 40)
+        self.assertTrue(min_lat < self.airdrie.latitude < max_lat and min_lon < self.airdrie.longitude < max_lon)
+        self.assertGreater(haversine_km(latitude, longitude, self.airdrie.latitude, self.airdrie.longitude), 40)
+        data = self.client.get('/api/search-jobs/', {'near': f'{latitude},{longitude}', 'radius': 40,
+                                                     'facets': 'experience_level'}).json()
+        self.assertEqual([job['id'] for job in data['results']], [self.calgary.id])
+        self.assertEqual(sum(facet['count'] for facet in data['facets']['experience_level']), 1)
+
+    def test_distances_render_the_same_bytes_as_json_renderer(self):
+        # A few centimetres away: unrounded, 1.1e-05 km, which orjson would
+        # write as 1.1e-5.
+        near = f'{self.calgary.latitude + 1e-7},{self.calgary.longitude}'
+        response = self.client.get('/api/search-jobs/', {'near': near, 'radius': 300})
+        self.assertEqual([job['distance_km'] for job in response.data['results']][:1], [0.0])
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_invalid_near(self):
+        self.assertEqual(self.client.get('/api/search-jobs/', {'near': 'Atlantis'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search-jobs/', {'near': 'Calgary', 'radius': 5000}).status_code, 400)
+
+
+class TypedFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        employer = create_employer()
+        self.python, self.django = Skill.objects.create(name='Python'), Skill.objects.create(name='Django')
+        self.low = create_job(employer, min_salary='40000.50', max_salary=50000)
+        self.high = create_job(employer, min_salary=150000, max_salary='150000.50')
+        self.low.skills.set([self.python, self.django])
+        self.high.skills.set([self.python])
+
+    def search(self, **params):
+        response = self.client.get('/api/search-jobs/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [job['id'] for job in response.json()['results']]
+
+    def test_salary_range(self):
+        self.assertEqual(self.search(salary_min=60000), [self.high.id])
+        self.assertEqual(self.search(salary_max='40000.50'), [self.low.id])
+        self.assertEqual(self.search(salary_min=45000, salary_max=200000), [self.high.id, self.low.id])
+        # Salaries are no longer matched as text.
+        self.assertEqual(self.search(q='50'), [])
+        self.assertEqual(self.client.get('/api/search-jobs/', {'salary_min': 2, 'salary_max': 1}).status_code, 400)
+
+    def test_skills_compose_with_text_search_without_duplicates(self):
+        skills = f'{self.python.id},{self.django.id}'
+        self.assertEqual(self.search(skills=skills), [self.high.id, self.low.id])
+        self.assertEqual(self.search(skills=skills, skills_match='all'), [self.low.id])
+        # Short terms use the icontains filters, longer ones the FTS index.
+        for q in ('o', 'Python'):
+            self.assertEqual(self.search(q=q, skills=skills), [self.high.id, self.low.id])
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        employer = create_employer()
+        self.python = Skill.objects.create(name='Python')
+        Skill.objects.create(name='PostgreSQL')
+        self.jobs = [create_job(employer, title=title) for title in ('Python Developer', 'Senior Python Developer', 'Pastry Chef')]
+        for job in self.jobs[:2]:
+            job.skills.add(self.python)
+        autocomplete_index.rebuild()
+
+    def suggest(self, q, types):
+        response = self.client.get('/api/autocomplete/', {'q': q, 'types': types})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(item['value'], item['count']) for item in response.json()[types]]
+
+    def test_suggestions_ranked_by_frequency(self):
+        self.assertEqual(self.suggest('p', 'skills'), [('Python', 2), ('PostgreSQL', 0)])
+        self.assertEqual(self.suggest('DEV', 'titles'), [('Python Developer', 1), ('Senior Python Developer', 1)])
+        self.assertEqual(self.suggest('calg', 'locations'), [('Calgary, AB', 3)])
+        self.assertEqual(self.client.get('/api/autocomplete/', {'q': ''}).status_code, 400)
+
+    def test_index_follows_writes(self):
+        self.jobs[0].active = False
+        self.jobs[0].save()
+        self.jobs[2].skills.add(self.python)
+        self.python.name = 'Python 3'
+        self.python.save()
+        self.assertEqual(self.suggest('py', 'skills'), [('Python 3', 2)])
+        self.assertEqual(self.suggest('py', 'titles'), [('Senior Python Developer', 1)])
+
+
+    def test_stale_index_is_rebuilt_in_the_background(self):
+        autocomplete_index._built_at -= autocomplete_index.rebuild_interval + 1
+        # As another worker would write it: no signal reaches this index.
+        Job.objects.filter(id=self.jobs[2].id).update(title='Python Chef')
+        with mock.patch('jobs.indexes.threading.Thread') as thread:
+            # Answered from the current data, without waiting for a rebuild.
+            self.assertEqual(self.suggest('python', 'titles'), [('Python Developer', 1), ('Senior Python Developer', 1)])
+            self.suggest('python', 'titles')
+        thread.assert_called_once_with(target=autocomplete_index._background_rebuild, daemon=True)
+        thread.return_value.start.assert_called_once_with()
+
+        # Run the thread's work here; it must not close the test's connection.
+        with mock.patch('jobs.indexes.connection'):
+            thread.call_args.kwargs['target']()
+        self.assertEqual(self.suggest('python', 'titles'),
+                         [('Python Chef', 1), ('Python Developer', 1), ('Senior Python Developer', 1)])
+
+
+class TokenAuthTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = create_employer()
+
+    def login(self):
+        response = self.client.post('/api/token/', {'username': 'employer@example.com', 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def get_profile_type(self, access):
+        return self.client.get('/api/userTypeProfile/', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_user_is_built_from_claims(self):
+        tokens = self.login()
+        self.get_profile_type(tokens['access'])
+        # No user row, and the blacklist's MAX(id) was read by the first request.
+        with self.assertNumQueries(0):
+            response = self.get_profile_type(tokens['access'])
+        self.assertEqual(response.data, {'user_type': 'employer'})
+
+    def test_profile_views_use_id_claims(self):
+        tokens = self.login()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/employer-jobs/export/', HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+            b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('"jobs_employer"', tables)
+        self.assertNotIn('"jobs_user"', tables)
+
+    def test_logout_revokes_both_tokens(self):
+        tokens = self.login()
+        response = self.client.post('/api/logout/', {'refresh': tokens['refresh']},
+                                    HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_profile_type(tokens['access']).status_code, 401)
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}).status_code, 401)
+
+    def test_refresh_rotates_and_keeps_claims(self):
+        tokens = self.login()
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+        rotated = RefreshToken(response.data['refresh'])
+        self.assertEqual(rotated['employer_id'], self.employer.id)
+        self.assertEqual(self.get_profile_type(response.data['access']).status_code, 200)
+        # The old refresh token was blacklisted by the rotation.
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}).status_code, 401)
+
+    def test_revocation_is_seen_by_other_processes(self):
+        # A second RevokedTokens stands in for another worker's. Neither the
+        # signal nor a bump of this process's local cache reaches it.
+        other = RevokedTokens()
+        token = RefreshToken.for_user(self.employer.user)
+        self.assertFalse(other.is_revoked(token['jti']))
+        with mock.patch('jobs.tokens.bump_lookup_version'):
+            token.blacklist()
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=token['jti']).exists())
+        # Seen once the version read from the database goes stale.
+        self.assertFalse(other.is_revoked(token['jti']))
+        later = time.monotonic() + other.version_ttl + 1
+        with mock.patch('jobs.tokens.time.monotonic', return_value=later):
+            self.assertTrue(other.is_revoked(token['jti']))
+
+
+class TokenBlacklistFilterTests(TestCase):
+    def setUp(self):
+        self.user = create_employer().user
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f'key-{i}' for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertFalse(bloom.is_full)
+        bloom.add('one too many')
+        self.assertTrue(bloom.is_full)
+
+    def test_false_positive_is_confirmed_in_the_database(self):
+        class TinyRevokedTokens(RevokedTokens):
+            min_capacity = 1
+            error_rate = 0.5
+
+        revoked = TinyRevokedTokens()
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        self.assertTrue(revoked.is_revoked(token['jti']))
+        jti = next(f'jti-{i}' for i in range(10000) if f'jti-{i}' in revoked._filter)
+        # Only the blacklist lookup; the version was read within version_ttl.
+        with self.assertNumQueries(1):
+            self.assertFalse(revoked.is_revoked(jti))
+
+    def test_shared_cache_version_is_bumped_on_commit(self):
+        with tempfile.TemporaryDirectory() as location:
+            shared = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'lookups': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+            }
+            with override_settings(CACHES=shared):
+                other = RevokedTokens()
+                token = RefreshToken.for_user(self.user)
+                self.assertFalse(other.is_revoked(token['jti']))
+                with self.captureOnCommitCallbacks(execute=True):
+                    token.blacklist()
+                with self.assertNumQueries(2):
+                    self.assertTrue(other.is_revoked(token['jti']))
+
+    def test_prune_tokens_deletes_expired_tokens(self):
+        expired = RefreshToken.for_user(self.user)
+        expired.blacklist()
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - datetime.timedelta(minutes=1))
+        current = RefreshToken.for_user(self.user)
+        current.blacklist()
+
+        output = io.StringIO()
+        call_command('prune_tokens', batch_size=1, stdout=output)
+        self.assertIn('Deleted 1 expired outstanding and 1 blacklisted tokens.', output.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [current['jti']])
+        self.assertEqual(list(BlacklistedToken.objects.values_list('token__jti', flat=True)), [current['jti']])
@@ -0,0 +1,152 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import BlacklistMixin, AccessToken as BaseAccessToken, RefreshToken as BaseRefreshToken
+
+from .bloom import BloomFilter
+from .cache import LOOKUP_CACHE_ALIAS, get_lookup_version, bump_lookup_version
+
+
+PROFILE_CLAIMS = ('user_type', 'employer_id', 'jobseeker_id')
+
+# Cache backends whose entries other processes cannot see.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def profile_claims(user):
+    return {claim: getattr(user, claim) for claim in PROFILE_CLAIMS}
+
+
+class RevokedTokens:
+    """
+    Bloom filter over the jtis of blacklisted tokens that have not expired.
+
+    A jti the filter has not seen is answered "not revoked" without a query;
+    that is nearly every check. A hit, true or false positive, is confirmed
+    against the blacklist table. The filter takes about 10 bits per token
+    where a set of jti strings would take over 100 bytes.
+
+    Before each check the filter is brought up to date with a version that
+    every process sees: a counter in the versioned cache (see jobs.cache),
+    bumped when a blacklisting commits, if that cache is shared between
+    processes; otherwise the highest blacklist row id, read from the
+    database at most once every ``version_ttl`` seconds. In that case a
+    token blacklisted by another process can still be accepted here for up
+    to ``version_ttl`` seconds; blacklistings made in this process apply at
+    once. On a new version only the rows created since the last look are
+    added. The filter is rebuilt every ``rebuild_interval`` seconds, or
+    sooner once it exceeds its capacity, which drops expired and deleted
+    entries.
+    """
+    rebuild_interval = 300
+    version_ttl = 5
+    min_capacity = 10000
+    error_rate = 0.01
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(self.min_capacity, self.error_rate)
+        self._last_id = 0
+        self._version = None
+        self._built_at = None
+        self._db_version = 0
+        self._db_version_read_at = None
+
+    def is_revoked(self, jti):
+        # The filter only answers "not revoked" once refresh() has caught
+        # it up with every blacklisting committed so far, in any process.
+        self.refresh()
+        if jti not in self._filter:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    @staticmethod
+    def uses_shared_cache():
+        return settings.CACHES[LOOKUP_CACHE_ALIAS]['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+    def current_version(self):
+        if self.uses_shared_cache():
+            return get_lookup_version(BlacklistedToken)
+        # MAX(id) is a single seek on the primary key, and only changes
+        # once the new row is visible to this connection. Reading it per
+        # request would cost a query on every authenticated request.
+        now = time.monotonic()
+        if self._db_version_read_at is None or now - self._db_version_read_at > self.version_ttl:
+            self._db_version = BlacklistedToken.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+            self._db_version_read_at = now
+        return self._db_version
+
+    def refresh(self):
+        version = self.current_version()
+        if (self._built_at is None or self._filter.is_full
+                or time.monotonic() - self._built_at > self.rebuild_interval):
+            self.rebuild(version)
+        elif version != self._version:
+            self.update(version)
+
+    def rebuild(self, version):
+        queryset = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        # Leave room to grow until the next scheduled rebuild.
+        bloom = BloomFilter(max(queryset.count() * 2, self.min_capacity), self.error_rate)
+        last_id = 0
+        for row_id, jti in queryset.values_list('id', 'token__jti').iterator():
+            bloom.add(jti)
+            last_id = max(last_id, row_id)
+        with self._lock:
+            self._filter = bloom
+            self._last_id = last_id
+            self._version = version
+            self._built_at = time.monotonic()
+
+    def update(self, version):
+        rows = BlacklistedToken.objects.filter(id__gt=self._last_id).values_list('id', 'token__jti')
+        with self._lock:
+            for row_id, jti in rows:
+                self._filter.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            self._version = version
+
+    def revoke(self, jti):
+        with self._lock:
+            self._filter.add(jti)
+        if self.uses_shared_cache():
+            # Other processes fetch the new row when they see the bump, so
+            # it must not happen before the row is visible to them.
+            transaction.on_commit(lambda: bump_lookup_version(BlacklistedToken))
+
+
+revoked_tokens = RevokedTokens()
+
+
+class CachedBlacklistMixin(BlacklistMixin):
+    def check_blacklist(self):
+        if revoked_tokens.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+
+class AccessToken(CachedBlacklistMixin, BaseAccessToken):
+    pass
+
+
+class RefreshToken(CachedBlacklistMixin, BaseRefreshToken):
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        # Access tokens copy these claims from the refresh token, also when
+        # the refresh token is rotated.
+        token = super().for_user(user)
+        for claim, value in profile_claims(user).items():
+            token[claim] = value
+        return token
@@ -10,6 +10,7 @@ from .views import (
     EmployerJobListAPIView, 
     JobDeleteAPIView, 
     JobSearchAPIView, 
+    AutocompleteAPIView,
     EmployerProfileAPIView,
     JobUpdateAPIView, 
     JobDetailAPIView, 
@@ -18,8 +19,22 @@ from .views import (
     JobApplicationsListView,
     JobApplicantsAPIView,
     ApplicationStatusUpdateView,
+    ApplicationBulkStatusUpdateView,
     LogoutAPIView,
-    CreateApplicationAPIView)
+    CreateApplicationAPIView,
+    RecommendedJobsAPIView,
+    JobImportAPIView,
+    EmployerJobExportAPIView,
+    JobApplicantsExportAPIView)
+from .async_views import (
+    AsyncCategoryListView,
+    AsyncJobTypeListView,
+    AsyncSkillListView,
+    AsyncEducationLevelListView,
+    AsyncJobDetailView,
+    AsyncJobSearchView,
+    AsyncEmployerProfileView,
+    AsyncJobSeekerProfileView)
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 urlpatterns = [
@@ -35,10 +50,13 @@ urlpatterns = [
     path('education-levels/', EducationLevelListView.as_view(), name='educationlevel-list'),
     path('job/<int:pk>/', JobDetailAPIView.as_view(), name='job-detail'),
     path('create-job/', JobCreateAPIView.as_view(), name='create_job'),
+    path('import-jobs/', JobImportAPIView.as_view(), name='import-jobs'),
     path('edit-job/<int:pk>/', JobUpdateAPIView.as_view(), name='edit-job'),
     path('employer-jobs/', EmployerJobListAPIView.as_view(), name='employer-jobs'),
+    path('employer-jobs/export/', EmployerJobExportAPIView.as_view(), name='employer-jobs-export'),
     path('delete-job/<int:pk>/', JobDeleteAPIView.as_view(), name='job-delete'),
     path('search-jobs/', JobSearchAPIView.as_view(), name='search-jobs'),
+    path('autocomplete/', AutocompleteAPIView.as_view(), name='autocomplete'),
     path('employer-profile/', EmployerProfileAPIView.as_view(), name='employer-profile'),
     path("employer-profile/<int:id>/", EmployerProfileAPIView.as_view(), name="employer-profile-id"),
     path('candidate-profile/', JobSeekerProfileAPIView.as_view(), name='candidate-profile'),
@@ -47,6 +65,17 @@ urlpatterns = [
     path('resume/<int:id>/', ResumeAPIView.as_view(), name='resume-id'),
     path('applications/', JobApplicationsListView.as_view(), name='job_applications_list'),
     path("applications/<int:pk>/", ApplicationStatusUpdateView.as_view(), name="update_application_status"),
+    path('applications/bulk-status/', ApplicationBulkStatusUpdateView.as_view(), name='bulk_update_application_status'),
     path('job-applicants/<int:job_id>/', JobApplicantsAPIView.as_view(), name='job-applicants'),
+    path('job-applicants/<int:job_id>/export/', JobApplicantsExportAPIView.as_view(), name='job-applicants-export'),
     path('apply/', CreateApplicationAPIView.as_view(), name='create-application'),
+    path('recommended-jobs/', RecommendedJobsAPIView.as_view(), name='recommended-jobs'),
+    path('async/categories/', AsyncCategoryListView.as_view(), name='async-category-list'),
+    path('async/job-types/', AsyncJobTypeListView.as_view(), name='async-jobtype-list'),
+    path('async/skills/', AsyncSkillListView.as_view(), name='async-skill-list'),
+    path('async/education-levels/', AsyncEducationLevelListView.as_view(), name='async-educationlevel-list'),
+    path('async/job/<int:pk>/', AsyncJobDetailView.as_view(), name='async-job-detail'),
+    path('async/search-jobs/', AsyncJobSearchView.as_view(), name='async-search-jobs'),
+    path('async/employer-profile/<int:id>/', AsyncEmployerProfileView.as_view(), name='async-employer-profile-id'),
+    path('async/candidate-profile/<int:id>/', AsyncJobSeekerProfileView.as_view(), name='async-candidate-profile-id'),
 ]
\ No newline at end of file
@@ -1,18 +1,33 @@
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import generics
-from .models import Category, JobType, Skill, EducationLevel, Job, CompanyProfile, Employer, Resume, Application, JobSeekerProfile, JobSeeker
+from .models import Category, JobType, Skill, EducationLevel, Job, CompanyProfile, Employer, Resume, Application, JobSeekerProfile, JobSeeker, CandidateSkill, Education
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from .serializers import RegisterSerializer,CategorySerializer, JobTypeSerializer, SkillSerializer, EducationLevelSerializer, JobSerializer, CompanyProfileSerializer, JobSeekerProfileSerializer, ResumeSerializer, ApplicationSerializer
+from .serializers import RegisterSerializer,CategorySerializer, JobTypeSerializer, SkillSerializer, EducationLevelSerializer, JobSerializer, CompanyProfileSerializer, JobSeekerProfileSerializer, ResumeSerializer, ApplicationSerializer, ApplicationBulkStatusSerializer, EmployerJobSerializer
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db.models import Q
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError, PermissionDenied
 from rest_framework import viewsets, mixins
+from rest_framework.renderers import BrowsableAPIRenderer
 from django.contrib.auth import logout
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import RefreshToken
+from .search import JobSearch
+from .pagination import KeysetPagination
+from .cache import CachedLookupMixin
+from .recommendations import job_skill_index, score_applications
+from .imports import import_jobs, read_csv_rows, read_ndjson_rows
+from .applications import update_statuses, update_matching_statuses
+from .conditional import ConditionalGetMixin
+from .fieldsets import FieldSelectionMixin, JOB_CARD_FIELDS
+from .renderers import FastJSONRenderer
+from .rows import JobRowSerializer, ApplicationRowSerializer
+from .autocomplete import autocomplete_index, AUTOCOMPLETE_TYPES
+from .exports import (
+    EXPORT_FORMATS, JOB_EXPORT_HEADER, APPLICANT_EXPORT_HEADER,
+    job_rows, applicant_rows, export_response,
+)
 
 
 class RegisterView(APIView):
@@ -33,27 +48,35 @@ class UserTypeProfileView(APIView):
         return Response({'user_type': user_type}, status=200)
 
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CachedLookupMixin, generics.ListAPIView):
+    authentication_classes = []
     permission_classes = [AllowAny]
     queryset = Category.objects.all()
+    ordering = ('name', 'id')
     serializer_class = CategorySerializer
 
 
-class JobTypeListView(generics.ListAPIView):
+class JobTypeListView(CachedLookupMixin, generics.ListAPIView):
+    authentication_classes = []
     permission_classes = [AllowAny]
     queryset = JobType.objects.all()
+    ordering = ('name', 'id')
     serializer_class = JobTypeSerializer
 
 
-class SkillListView(generics.ListAPIView):
+class SkillListView(CachedLookupMixin, generics.ListAPIView):
+    authentication_classes = []
     permission_classes = [AllowAny]
     queryset = Skill.objects.all()
+    ordering = ('name', 'id')
     serializer_class = SkillSerializer
 
 
-class EducationLevelListView(generics.ListAPIView):
+class EducationLevelListView(CachedLookupMixin, generics.ListAPIView):
+    authentication_classes = []
     permission_classes = [AllowAny]
     queryset = EducationLevel.objects.all()
+    ordering = ('name', 'id')
     serializer_class = EducationLevelSerializer
 
 
@@ -62,19 +85,35 @@ class JobCreateAPIView(generics.CreateAPIView):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
 
-class JobDetailAPIView(generics.RetrieveAPIView):
+class JobDetailAPIView(FieldSelectionMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     permission_classes = [AllowAny]
-    queryset = Job.objects.all()
     serializer_class = JobSerializer
+    # The nested employer profile changes the body too.
+    last_modified_fields = ('updated_at', 'employer__company_profile__updated_at')
+    body_cache_timeout = 60 * 60
+
+    def get_queryset(self):
+        return Job.objects.for_serializer(self.get_selected_fields())
+
+    def get_last_modified_queryset(self):
+        return Job.objects.filter(pk=self.kwargs['pk'])
+
+    def get_etag_variant(self):
+        return self.get_fields_key()
 
 
-class EmployerJobListAPIView(generics.ListAPIView):
+class EmployerJobListAPIView(FieldSelectionMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
-    serializer_class = JobSerializer
+    serializer_class = EmployerJobSerializer
+    ordering = ('-date_posted', '-id')
+    default_fields = JOB_CARD_FIELDS + ('date_posted', 'active', 'applicant_counts')
 
     def get_queryset(self):
-        employer = self.request.user.employer
-        return Job.objects.filter(employer=employer)
+        fields = self.get_selected_fields()
+        queryset = Job.objects.filter(employer_id=self.request.user.employer_id).for_serializer(fields)
+        if 'applicant_counts' in fields:
+            queryset = queryset.prefetch_related('status_counts')
+        return queryset
 
 
 class JobDeleteAPIView(generics.DestroyAPIView):
@@ -84,7 +123,7 @@ class JobDeleteAPIView(generics.DestroyAPIView):
 
     def delete(self, request, *args, **kwargs):
         job = self.get_object()
-        if job.employer.user == request.user:
+        if job.employer_id == request.user.employer_id:
             job.delete()
             return Response({"message": "Job deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
         else:
@@ -100,42 +139,75 @@ class JobUpdateAPIView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         obj = super().get_object()        
-        if obj.employer.user != self.request.user:
+        if obj.employer_id != self.request.user.employer_id:
             raise PermissionDenied("Failed to update Job")
         return obj
 
 
-class JobSearchAPIView(generics.ListAPIView):
+class JobSearchAPIView(FieldSelectionMixin, generics.ListAPIView):
     permission_classes = [AllowAny]
-    queryset = Job.objects.all()
     serializer_class = JobSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    default_fields = JOB_CARD_FIELDS
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        search_term = self.request.query_params.get('q', None)
-
-        if search_term:
-            queryset = queryset.filter(
-                Q(title__icontains=search_term) |
-                Q(description__icontains=search_term) |
-                Q(location__icontains=search_term) |
-                Q(min_salary__icontains=search_term) |
-                Q(max_salary__icontains=search_term) |
-                Q(experience_level__icontains=search_term) |
-                Q(employer__user__first_name__icontains=search_term) |
-                Q(employer__user__last_name__icontains=search_term) |
-                Q(category__name__icontains=search_term) |
-                Q(job_type__name__icontains=search_term) |
-                Q(skills__name__icontains=search_term) |
-                Q(education_level__name__icontains=search_term)
-            ).distinct()  
-        return queryset
+        return JobSearch(self.request.query_params).queryset
+
+    def list(self, request, *args, **kwargs):
+        # Same output as JobSerializer, built from row tuples.
+        search = JobSearch(request.query_params)
+        page = search.page(self.paginator, request, JobRowSerializer(self.get_selected_fields()))
+        response = self.get_paginated_response(page)
+        if search.facets:
+            response.data['facets'] = search.facet_counts()
+        return response
+
+
+class AutocompleteAPIView(APIView):
+    """
+    Typeahead suggestions for ``?q=``, served from the in-memory
+    autocomplete index: ``{type: [{"value", "count"}]}`` for each of
+    ``?types=`` (all by default), most used first.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    default_limit = 10
+    max_limit = 50
+    max_query_length = 100
+
+    def get(self, request):
+        prefix = request.query_params.get('q', '').strip()
+        if not prefix:
+            return Response({"error": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(prefix) > self.max_query_length:
+            return Response({"error": f"q must be at most {self.max_query_length} characters."}, status=status.HTTP_400_BAD_REQUEST)
+
+        types = [name.strip() for name in request.query_params.get('types', '').split(',') if name.strip()]
+        unknown = [name for name in types if name not in AUTOCOMPLETE_TYPES]
+        if unknown:
+            return Response({"error": f"Unknown types: {', '.join(unknown)}."}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return Response({"error": "Limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.max_limit))
+
+        return Response(autocomplete_index.suggest(prefix, tuple(dict.fromkeys(types)) or AUTOCOMPLETE_TYPES, limit))
 
-class EmployerProfileAPIView(generics.RetrieveUpdateAPIView):
+
+class EmployerProfileAPIView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     permission_classes = [AllowAny]
     serializer_class = CompanyProfileSerializer
 
+    def get_last_modified_queryset(self):
+        profile_id = self.kwargs.get("id", None)
+        if profile_id:
+            return CompanyProfile.objects.filter(id=profile_id)
+        employer_id = getattr(self.request.user, 'employer_id', None)
+        return CompanyProfile.objects.filter(employer__id=employer_id) if employer_id else CompanyProfile.objects.none()
+
     def get_object(self):
 
         profile_id = self.kwargs.get("id", None)
@@ -148,17 +220,25 @@ class EmployerProfileAPIView(generics.RetrieveUpdateAPIView):
                 raise NotFound("Company profile not found for the provided ID.")
 
         
-        employer = getattr(self.request.user, 'employer', None)
-        
-        if not employer or not employer.company_profile:
+        employer_id = getattr(self.request.user, 'employer_id', None)
+        profile = CompanyProfile.objects.filter(employer__id=employer_id).first() if employer_id else None
+
+        if not profile:
             raise NotFound("Company profile not assigned")
-       
-        return employer.company_profile
 
+        return profile
 
-class JobSeekerProfileAPIView(generics.RetrieveUpdateAPIView):
+
+class JobSeekerProfileAPIView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     serializer_class = JobSeekerProfileSerializer
 
+    def get_last_modified_queryset(self):
+        profile_id = self.kwargs.get("id", None)
+        if profile_id:
+            return JobSeekerProfile.objects.filter(id=profile_id)
+        jobseeker_id = getattr(self.request.user, 'jobseeker_id', None)
+        return JobSeekerProfile.objects.filter(jobseeker__id=jobseeker_id) if jobseeker_id else JobSeekerProfile.objects.none()
+
     def get_permissions(self):
         if self.request.method == 'GET' and not self.kwargs.get("id"):
             return [IsAuthenticated()]  # Asegura autenticación para peticiones sin ID
@@ -178,15 +258,16 @@ class JobSeekerProfileAPIView(generics.RetrieveUpdateAPIView):
             except JobSeekerProfile.DoesNotExist:
                 raise NotFound("Candidate profile not found for the provided ID.")
 
-        jobseeker = getattr(self.request.user, 'jobseeker', None)
+        jobseeker_id = getattr(self.request.user, 'jobseeker_id', None)
+        profile = JobSeekerProfile.objects.filter(jobseeker__id=jobseeker_id).first() if jobseeker_id else None
 
-        if not jobseeker or not jobseeker.jobseeker_profile:
+        if not profile:
             raise NotFound("Job seeker profile not assigned.")
-        
-        return jobseeker.jobseeker_profile
+
+        return profile
 
 
-class ResumeAPIView(APIView):
+class ResumeAPIView(ConditionalGetMixin, APIView):
     def get_permissions(self):
         if self.request.method == 'GET' and not self.kwargs.get("id"):
             return [IsAuthenticated()]  # Asegura autenticación para peticiones sin ID
@@ -194,17 +275,26 @@ class ResumeAPIView(APIView):
             return [IsAuthenticated()]
         return [AllowAny()]
 
-    def get(self, request, id=None):
+    def get_last_modified_queryset(self):
+        profile_id = self.kwargs.get("id", None)
+        if profile_id:
+            return Resume.objects.filter(jobseeker_resume__jobseeker_profile_id=profile_id)
+        jobseeker_id = getattr(self.request.user, 'jobseeker_id', None)
+        return Resume.objects.filter(jobseeker_resume__id=jobseeker_id) if jobseeker_id else Resume.objects.none()
+
+    def retrieve(self, request, id=None):
 
         try:
             if id:
                 jobseeker_profile = JobSeekerProfile.objects.get(id=id)
                 jobseeker = jobseeker_profile.jobseeker
-                resume = Resume.objects.get(jobseeker_resume=jobseeker)
+                resume = Resume.objects.for_serializer().get(jobseeker_resume=jobseeker)
             else:
                 if not request.user.is_authenticated:
                     return Response({"detail": "Authentication required for this action."}, status=status.HTTP_401_UNAUTHORIZED)
-                resume = Resume.objects.get(jobseeker_resume__user=request.user)
+                if not request.user.jobseeker_id:
+                    raise Resume.DoesNotExist
+                resume = Resume.objects.for_serializer().get(jobseeker_resume__id=request.user.jobseeker_id)
             
             serializer = ResumeSerializer(resume)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -221,7 +311,9 @@ class ResumeAPIView(APIView):
         print("Datos recibidos en el backend:", request.data)
 
         try:
-            resume = Resume.objects.get(jobseeker_resume__user=request.user)
+            if not request.user.jobseeker_id:
+                raise Resume.DoesNotExist
+            resume = Resume.objects.get(jobseeker_resume__id=request.user.jobseeker_id)
             serializer = ResumeSerializer(resume, data=request.data)
             if serializer.is_valid():
                 serializer.save()
@@ -236,21 +328,48 @@ class ResumeAPIView(APIView):
 
 class JobApplicationsListView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    ordering = ('-application_date', '-id')
 
     def get(self, request):
-        jobseeker = request.user.jobseeker
-        applications = Application.objects.filter(jobseeker=jobseeker).select_related('job', 'job__employer')
-        serializer = ApplicationSerializer(applications, many=True)
-        return Response(serializer.data)
+        # Same output as ApplicationSerializer, built from row tuples.
+        applications = Application.objects.filter(jobseeker_id=request.user.jobseeker_id)
+        serializer = ApplicationRowSerializer()
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(serializer.rows(applications, self.ordering), request, view=self)
+        return paginator.get_paginated_response(serializer.to_representation(page))
 
 
 class JobApplicantsAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    ordering = ('-application_date', '-id')
 
     def get(self, request, job_id):
-        applications = Application.objects.filter(job__id=job_id).select_related('jobseeker__user')
-        serializer = ApplicationSerializer(applications, many=True)
-        return Response(serializer.data)
+        try:
+            job = Job.objects.get(id=job_id, employer_id=request.user.employer_id)
+        except Job.DoesNotExist:
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        applications = Application.objects.filter(job=job).select_related('job__employer', 'jobseeker__user')
+        status_value = request.query_params.get('status')
+        if status_value:
+            if status_value not in Application.StatusChoices.values:
+                return Response({"error": "Invalid status."}, status=status.HTTP_400_BAD_REQUEST)
+            applications = applications.filter(status=status_value)
+        order = request.query_params.get('order')
+        if order == 'match':
+            applications = score_applications(job, applications)
+        elif order:
+            return Response({"error": "Unsupported order."}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPagination()
+        paginator.ordering = ('-match_score', '-id') if order == 'match' else self.ordering
+        page = paginator.paginate_queryset(applications, request)
+        serializer = ApplicationSerializer(page, many=True)
+        data = serializer.data
+        if order == 'match':
+            for item, application in zip(data, page):
+                item['match_score'] = application.match_score
+        return paginator.get_paginated_response(data)
 
 
 class ApplicationStatusUpdateView(APIView):
@@ -261,6 +380,10 @@ class ApplicationStatusUpdateView(APIView):
             application = Application.objects.get(pk=pk)
             status_value = request.data.get("status")
             if status_value:
+                # Checked before the save moves the application between
+                # JobStatusCount rows.
+                if status_value not in Application.StatusChoices.values:
+                    return Response({"error": "Invalid status."}, status=status.HTTP_400_BAD_REQUEST)
                 application.status = status_value
                 application.save()
                 serializer = ApplicationSerializer(application)
@@ -271,6 +394,131 @@ class ApplicationStatusUpdateView(APIView):
             return Response({"error": "Application not found."}, status=status.HTTP_404_NOT_FOUND)
 
 
+class ApplicationBulkStatusUpdateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request):
+        employer_id = request.user.employer_id
+        if not employer_id:
+            return Response({"error": "Only employers can update application statuses."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = ApplicationBulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        if 'updates' in data:
+            changes = {item['id']: item['status'] for item in data['updates']}
+            try:
+                updated = update_statuses(employer_id, changes)
+            except Application.DoesNotExist as e:
+                return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            filters = data.get('filter', {})
+            updated = update_matching_statuses(
+                employer_id, data['status'], job_id=filters.get('job'), current_status=filters.get('status'),
+            )
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+
+class RecommendedJobsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request):
+        jobseeker_id = request.user.jobseeker_id
+        if not jobseeker_id:
+            return Response({"error": "Only jobseekers can get job recommendations."}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response({"error": "Limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+
+        candidate_skills = CandidateSkill.objects.filter(
+            resumes__jobseeker_resume__id=jobseeker_id).values_list('name', 'proficiency')
+        education_level_ids = Education.objects.filter(
+            resumes__jobseeker_resume__id=jobseeker_id).values_list('level_id', flat=True)
+        applied_job_ids = Application.objects.filter(jobseeker_id=jobseeker_id).values_list('job_id', flat=True)
+
+        ranked = job_skill_index.recommend(
+            job_skill_index.skill_weights(candidate_skills),
+            education_level_ids=education_level_ids,
+            exclude=applied_job_ids,
+            limit=limit,
+        )
+        jobs = Job.objects.for_serializer().in_bulk([job_id for job_id, _ in ranked])
+
+        results = []
+        for job_id, score in ranked:
+            if job_id in jobs:
+                data = JobSerializer(jobs[job_id]).data
+                data['match_score'] = score
+                results.append(data)
+        return Response(results)
+
+
+class JobImportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    chunk_size = 500
+
+    def post(self, request):
+        employer_id = request.user.employer_id
+        if not employer_id:
+            return Response({"error": "Only employers can import jobs."}, status=status.HTTP_403_FORBIDDEN)
+
+        # Read the body as a stream; request.data would buffer and parse it whole.
+        content_type = request.content_type.split(';')[0].strip()
+        if content_type in ('text/csv', 'application/csv'):
+            read_rows = read_csv_rows
+        elif content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+            read_rows = read_ndjson_rows
+        else:
+            return Response({"error": "Send the jobs as text/csv or application/x-ndjson."},
+                            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        if request.stream is None:
+            return Response({"error": "No jobs to import."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Unreadable lines are reported with the row errors: the chunks before
+        # them are already committed.
+        report = import_jobs(employer_id, read_rows(request.stream), chunk_size=self.chunk_size)
+        response_status = status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=response_status)
+
+
+class ExportMixin:
+    # ``output`` rather than ``format``, which DRF reserves for renderer selection.
+    def get_output(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"Choose one of: {', '.join(EXPORT_FORMATS)}."})
+        return output
+
+
+class EmployerJobExportAPIView(ExportMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        employer_id = request.user.employer_id
+        if not employer_id:
+            return Response({"error": "Only employers can export jobs."}, status=status.HTTP_403_FORBIDDEN)
+        return export_response(JOB_EXPORT_HEADER, job_rows(employer_id), self.get_output(request), 'jobs')
+
+
+class JobApplicantsExportAPIView(ExportMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        try:
+            job = Job.objects.get(id=job_id, employer_id=request.user.employer_id)
+        except Job.DoesNotExist:
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        output = self.get_output(request)
+        return export_response(APPLICANT_EXPORT_HEADER, applicant_rows(job), output, f'job-{job.id}-applicants')
+
+
 class LogoutAPIView(APIView):
     def post(self, request):
         try:
@@ -279,7 +527,10 @@ class LogoutAPIView(APIView):
                 return Response({"error": "Refresh token missing"}, status=400)
 
             token = RefreshToken(refresh_token)
-            token.blacklist() 
+            token.blacklist()
+            # Authentication no longer loads the user, so also revoke the
+            # access token rather than leave it usable until it expires.
+            request.auth.blacklist()
             return Response({"message": "Logout successful"}, status=200)
         except Exception as e:
             return Response({"error": str(e)}, status=400)
@@ -300,14 +551,14 @@ class CreateApplicationAPIView(APIView):
             except Job.DoesNotExist:
                 return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
 
-            jobseeker = getattr(request.user, 'jobseeker', None)
-            if not jobseeker:
+            jobseeker_id = getattr(request.user, 'jobseeker_id', None)
+            if not jobseeker_id:
                 return Response({"error": "Only jobseekers can apply for jobs."}, status=status.HTTP_403_FORBIDDEN)
 
-            if Application.objects.filter(job=job, jobseeker=jobseeker).exists():
+            if Application.objects.filter(job=job, jobseeker_id=jobseeker_id).exists():
                 return Response({"error": "You have already applied for this job."}, status=status.HTTP_400_BAD_REQUEST)
 
-            application = Application.objects.create(job=job, jobseeker=jobseeker)
+            application = Application.objects.create(job=job, jobseeker_id=jobseeker_id)
             return Response({"message": "Application submitted successfully."}, status=status.HTTP_201_CREATED)
 
         except Exception as e:
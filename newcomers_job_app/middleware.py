@@ -0,0 +1,309 @@
+import asyncio
+import contextvars
+import hashlib
+import heapq
+import json
+import logging
+import threading
+import time
+import zlib
+
+import brotli
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+
+logger = logging.getLogger('newcomers_job_app.timing')
+
+_current_timing = contextvars.ContextVar('request_timing', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    # Installed on every connection, so queries are counted whichever thread
+    # runs them: the request's context (and with it the timing) is copied
+    # into sync_to_async() worker threads.
+    timing = _current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing.record_query(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestTiming:
+    worst_query_count = 5
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view_start = None
+        self.render_start = None
+        self.render_end = None
+        self.query_count = 0
+        self.db_time = 0.0
+        self._worst = []
+        self._lock = threading.Lock()
+
+    def record_query(self, execute, sql, params, many, context):
+        # Works with DEBUG off and costs one perf_counter() pair per query.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self._record(duration, sql)
+
+    def _record(self, duration, sql):
+        self.query_count += 1
+        self.db_time += duration
+        if len(self._worst) < self.worst_query_count:
+            heapq.heappush(self._worst, (duration, self.query_count, sql))
+        elif duration > self._worst[0][0]:
+            heapq.heapreplace(self._worst, (duration, self.query_count, sql))
+
+    def mark_render_start(self):
+        self.render_start = time.perf_counter()
+
+    def mark_render_end(self, response):
+        self.render_end = time.perf_counter()
+
+    def worst_queries(self):
+        return [
+            {'ms': round(duration * 1000, 2), 'sql': sql}
+            for duration, _, sql in sorted(self._worst, reverse=True)
+        ]
+
+    def metrics(self, end):
+        total = end - self.start
+        metrics = {'db': self.db_time, 'total': total}
+        if self.view_start is not None:
+            view_end = self.render_start or end
+            view = view_end - self.view_start
+            # View time outside the database; for DRF views this is mostly
+            # serializer work.
+            metrics['app'] = max(view - self.db_time, 0.0)
+        if self.render_start is not None and self.render_end is not None:
+            metrics['render'] = self.render_end - self.render_start
+        return metrics
+
+
+class RequestTimingMiddleware:
+    """
+    Measure each request's query count, DB time, view time outside the
+    database (serialization), render time and total time. Report them in a
+    ``Server-Timing`` header and log requests slower than
+    ``SLOW_REQUEST_THRESHOLD_MS`` with their slowest queries.
+
+    Supports both sync and async handlers, so async views under ASGI are not
+    forced back through a thread by this middleware.
+    """
+    sync_capable = True
+    async_capable = True
+    descriptions = {
+        'db': 'Database',
+        'app': 'View outside database',
+        'render': 'Render',
+        'total': 'Total',
+    }
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500) / 1000
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Mark the instance as a coroutine function, as MiddlewareMixin does.
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_recorder)
+        for connection in connections.all():
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        timing = RequestTiming()
+        request._timing = timing
+        token = _current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, timing, response)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        request._timing = timing
+        token = _current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, timing, response)
+
+    def finish(self, request, timing, response):
+        metrics = timing.metrics(time.perf_counter())
+        entries = [f'db;desc="Queries: {timing.query_count}";dur={metrics["db"] * 1000:.2f}']
+        entries += [
+            f'{name};desc="{self.descriptions[name]}";dur={metrics[name] * 1000:.2f}'
+            for name in ('app', 'render', 'total') if name in metrics
+        ]
+        response['Server-Timing'] = ', '.join(entries)
+
+        if metrics['total'] >= self.slow_threshold:
+            logger.warning('Slow request %s', json.dumps({
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'queries': timing.query_count,
+                'ms': {name: round(value * 1000, 2) for name, value in metrics.items()},
+                'worst_queries': timing.worst_queries(),
+            }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that too.
+        request._timing.mark_render_start()
+        response.add_post_render_callback(request._timing.mark_render_end)
+        return response
+
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml')
+
+
+def accepted_encodings(header):
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+    encodings = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        encodings[coding.strip().lower()] = q
+    return encodings
+
+
+def choose_encoding(header):
+    """Pick ``br`` or ``gzip`` from an ``Accept-Encoding`` header, or None."""
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get('*', 0.0)
+    candidates = ['br', 'gzip']
+    scored = [(encodings.get(coding, wildcard), -rank, coding) for rank, coding in enumerate(candidates)]
+    q, _, coding = max(scored)
+    return coding if q > 0 else None
+
+
+def compress_bytes(content, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(content, quality=level)
+    if level == 6:
+        return compress_string(content)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(content) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, level):
+    if encoding == 'gzip':
+        yield from compress_sequence(chunks)
+        return
+    compressor = brotli.Compressor(quality=level)
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, whichever ``Accept-Encoding``
+    prefers, as GZipMiddleware does
+    for gzip alone.
+
+    Bodies shorter than ``COMPRESSION_MIN_SIZE`` bytes are sent as they are.
+    Streaming responses (the CSV and NDJSON exports) are compressed chunk by
+    chunk. Responses with an ETag, such as the lookup lists and conditional
+    GET endpoints, always have the same body for the same ETag, so their
+    compressed bodies are cached under it: they are compressed once, at a
+    higher level than on-the-fly responses can afford.
+    """
+    sync_capable = True
+    async_capable = True
+    levels = {'gzip': 6, 'br': 4}
+    cached_levels = {'gzip': 9, 'br': 11}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.cache_alias = getattr(settings, 'COMPRESSION_CACHE_ALIAS', 'default')
+        self.cache_timeout = getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', 60 * 60)
+        if asyncio.iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding, self.levels[encoding])
+            del response['Content-Length']
+        else:
+            content = self.compressed_content(response, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The bytes differ from the uncompressed representation, so a strong
+        # ETag becomes weak (RFC 7232 section 2.1); If-None-Match still
+        # matches it.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def compressed_content(self, response, encoding):
+        etag = response.get('ETag')
+        if not etag or response.status_code != 200 or 'no-store' in response.get('Cache-Control', ''):
+            return compress_bytes(response.content, encoding, self.levels[encoding])
+
+        cache = caches[self.cache_alias]
+        key = f"{encoding}:{response['Content-Type']}:{etag}"
+        key = 'compressed:' + hashlib.md5(key.encode()).hexdigest()
+        content = cache.get(key)
+        if content is None:
+            content = compress_bytes(response.content, encoding, self.cached_levels[encoding])
+            cache.set(key, content, self.cache_timeout)
+        return content
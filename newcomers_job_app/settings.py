@@ -47,11 +47,13 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'jobs.authentication.JWTClaimsAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'jobs.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
 SIMPLE_JWT = {
@@ -62,10 +64,16 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'AUTH_TOKEN_CLASSES': ('jobs.tokens.AccessToken',),
+    'TOKEN_USER_CLASS': 'jobs.authentication.TokenUser',
+    'TOKEN_OBTAIN_SERIALIZER': 'jobs.serializers.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'jobs.serializers.TokenRefreshSerializer',
 }
 
 
 MIDDLEWARE = [
+    'newcomers_job_app.middleware.RequestTimingMiddleware',
+    'newcomers_job_app.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -77,6 +85,35 @@ MIDDLEWARE = [
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ['Server-Timing']
+
+# Requests slower than this are logged with their slowest queries by
+# RequestTimingMiddleware.
+SLOW_REQUEST_THRESHOLD_MS = 500
+
+# CompressionMiddleware leaves smaller bodies uncompressed; below about one
+# packet the CPU and header overhead outweigh the bytes saved. Compressed
+# bodies of responses with an ETag are cached in COMPRESSION_CACHE_ALIAS.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CACHE_ALIAS = 'default'
+COMPRESSION_CACHE_TIMEOUT = 60 * 60
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'newcomers_job_app.timing': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
 
 ROOT_URLCONF = 'newcomers_job_app.urls'
 
@@ -112,6 +149,29 @@ DATABASES = {
 AUTH_USER_MODEL = 'jobs.User'
 
 
+# Caches
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+#
+# 'lookups' holds the category/job type/skill/education level responses.
+# Local memory is per process; switch it to
+# 'django.core.cache.backends.filebased.FileBasedCache' with a LOCATION to
+# share entries and invalidations between workers on one host. The token
+# blacklist's version counter also lives there when it is shared; with a
+# per-process backend, revocation checks read it from the database instead,
+# at most every few seconds, so a token revoked by another worker is still
+# accepted for up to RevokedTokens.version_ttl (see jobs.tokens).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'lookups': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lookups',
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
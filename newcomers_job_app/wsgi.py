@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'newcomers_job_app.settings')
 
 application = get_wsgi_application()
+
+# Build the in-process indexes now, not in the first requests that use them.
+# Management commands and tests do not import this module.
+from jobs.indexes import warm_indexes  # noqa: E402
+
+warm_indexes()